@@ -10,4 +10,19 @@ __all__ = [
     "runner",
     "notifier",
     "metrics",
+    "indicators",
+    "cache",
+    "results",
+    "plots",
+    "history",
+    "download",
+    "bench",
+    "tpe",
+    "portfolio",
+    "resample",
+    "scheduler",
+    "candle_cache",
+    "correlation",
+    "stream",
+    "stream_replay",
 ]
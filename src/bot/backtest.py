@@ -2,18 +2,34 @@
 
 import argparse
 import itertools
+import math
+import os
 from pathlib import Path
 import hashlib
 import time
+from typing import Optional, Tuple
 
+import numpy as np
 import pandas as pd
+from loguru import logger
 
 from .config import AppConfig
-from .strategy import generate_signal
+from .cache import dataset_fingerprint, get_cache
+from .strategy import entry_signals
 from .position import position_size
-from .risk import compute_stop, max_daily_loss_guard, kill_switch
-from .paper import PaperBroker
-from .metrics import cagr, max_drawdown, winrate, profit_factor, expectancy, avg_trade, sharpe
+from .risk import compute_stop, ledger_kill_switch
+from .paper import PaperBroker, resolve_exits
+from .results import (
+    LOWER_IS_BETTER,
+    METRIC_COLUMNS,
+    PRUNE_COLUMNS,
+    EquityWriter,
+    ResultsSink,
+    append_csv,
+    import_legacy_csv,
+    next_run_id,
+)
+from .metrics import OnlineMetrics
 
 
 def _hash_params(params: dict) -> str:
@@ -24,12 +40,11 @@ def _hash_params(params: dict) -> str:
 
 def _default_loader(symbol: str, timeframe: str, years: int):
     # Placeholder: generate synthetic walk for tests; real impl would use ccxt
-    import numpy as np
     n = max(200, years * 365 * 24)
     ts = pd.date_range("2020-01-01", periods=n, freq=timeframe)
     prices = 100 + np.cumsum(np.random.randn(n))
     df = pd.DataFrame({
-        "timestamp": ts.astype(int) // 10**9,
+        "timestamp": (ts - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1),  # ms, like ccxt
         "open": prices,
         "high": prices + 1,
         "low": prices - 1,
@@ -39,112 +54,464 @@ def _default_loader(symbol: str, timeframe: str, years: int):
     return df
 
 
-def run_backtest(symbol: str, timeframe: str, years: int, cfg: AppConfig, param_grid: dict, data_loader=None):
+TF_PERIODS_PER_YEAR = {
+    "1m": 365 * 24 * 60,
+    "5m": 365 * 24 * 12,
+    "15m": 365 * 24 * 4,
+    "1h": 365 * 24,
+    "4h": 365 * 6,
+    "1d": 365,
+}
+
+
+def _simulate_combo(
+    df: pd.DataFrame,
+    symbol: str,
+    years: int,
+    cfg: AppConfig,
+    params: dict,
+    periods_per_year: float,
+    run_id: int,
+    fingerprint: Optional[str] = None,
+    window: Optional[Tuple[int, int]] = None,
+    keep_equity: bool = True,
+) -> dict:
+    """Run one parameter combination over df and return its result record.
+
+    Indicator series are read through the process-wide cache keyed by `fingerprint`.
+    With `window=(lo, hi)` only bars lo..hi-1 are traded while indicators still
+    come from the whole (causal) history, so windows of one dataset share the
+    cached series and keep their true warm-up.
+
+    Metrics are accumulated online while walking; with keep_equity=False the
+    curve itself is never materialized and "equity" is None.
+    """
+    # Override cfg by creating a shallow copy
+    cfg_copy = cfg.copy()
+    for k, v in params.items():
+        setattr(cfg_copy, k, v)
+
+    broker = PaperBroker(cfg_copy, equity=1000.0)
+    online = OnlineMetrics()
+    # Equity as runs of (value, bars); it only changes on fills
+    runs: Optional[list] = [] if keep_equity else None
+
+    def hold(value: float, bars: int) -> None:
+        if bars > 0:
+            online.update_equity_flat(value, bars)
+            if runs is not None:
+                runs.append((value, bars))
+
+    hold(broker.equity, 1)
+
+    # Entry mask computed once; signals[j] refers to closed candle j
+    signals = entry_signals(
+        df[["open", "high", "low", "close", "volume"]], cfg_copy, cache=get_cache(), fingerprint=fingerprint
+    )
+    closes = df["close"].to_numpy(dtype=float)
+    highs = df["high"].to_numpy(dtype=float)
+    lows = df["low"].to_numpy(dtype=float)
+    # Bar timestamps (ms) date the ledger's daily PnL; frames without them book to "now"
+    timestamps = df["timestamp"].to_numpy(dtype=np.int64) if "timestamp" in df.columns else None
+    n = len(df)
+    start = 200
+    if window is not None:
+        start = max(start, int(window[0]))
+        n = min(n, int(window[1]))
+    # Bars i at which an entry is possible (signal on closed candle i - 1)
+    entry_bars = np.flatnonzero(signals[start - 1 : n - 1]) + start if n > start else np.zeros(0, dtype=np.int64)
+
+    # Event-driven walk: equity only changes on fills, so bars between events are
+    # filled in bulk and exits are located by the batched stop/TP kernel.
+    killed = False
+    i = start
+    while i < n:
+        k = int(np.searchsorted(entry_bars, i))
+        if k >= len(entry_bars):
+            hold(broker.equity, n - i)
+            break
+        j = int(entry_bars[k])
+        hold(broker.equity, j - i)
+
+        entry = float(closes[j - 1])  # last closed
+        stop = compute_stop(entry, atr=entry * 0.0 + 1.0, k=cfg_copy.atr_k)
+        rr = float(cfg_copy.risk_rr)
+        tp = entry + (entry - stop) * rr
+        try:
+            qty = position_size(entry, stop, broker.equity, 0.01, step=0.0)
+        except Exception:
+            qty = 0.0
+        if qty <= 0:
+            hold(broker.equity, 1)
+            i = j + 1
+            continue
+
+        ts = None if timestamps is None else int(timestamps[j])
+        trade = broker.buy(symbol, entry, qty, stop, tp, ts=ts, bar=j)
+        ex = resolve_exits(highs[:n], lows[:n], [j], [trade.entry_price], [stop], [tp], [qty], cfg_copy)
+        exit_bar = int(ex.exit_idx[0])
+        if exit_bar < 0:
+            hold(broker.equity, n - j)
+            break
+        hold(broker.equity, exit_bar - j)
+        ts = None if timestamps is None else int(timestamps[exit_bar])
+        closed = broker.sell(symbol, stop if ex.is_stop[0] else tp, qty, ts=ts, bar=exit_bar)
+        online.update_trade(closed.pnl)
+        hold(broker.equity, 1)
+
+        # Realized PnL over all closed trades, from the broker's running ledger
+        if ledger_kill_switch(broker.ledger, 1000.0, 0.2):
+            killed = True
+            break
+        i = exit_bar + 1
+
+    metrics = online.result(max(1, years), periods_per_year)
+    # Metrics use full precision; the curve itself is kept as float32
+    equity = None
+    if runs is not None:
+        values, counts = zip(*runs)
+        equity = np.repeat(np.asarray(values, dtype=np.float32), counts)
+    return {**params, **metrics, "equity": equity, "run_id": run_id, "killed": killed}
+
+
+# ---------- process-pool execution ----------
+# Worker-side globals populated once per process by _init_worker
+_WORKER: dict = {}
+
+
+def _share_frame(df: pd.DataFrame):
+    """Copy df's numeric columns into one shared-memory float64 block.
+
+    Returns (shm, spec) where spec is the small picklable description workers
+    need to attach: block name, shape, column names and original dtypes.
+    """
+    from multiprocessing import shared_memory
+
+    cols = list(df.columns)
+    arr = df.to_numpy(dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    view = np.ndarray(arr.shape, dtype=np.float64, buffer=shm.buf)
+    view[:] = arr
+    spec = {
+        "name": shm.name,
+        "shape": arr.shape,
+        "columns": cols,
+        "dtypes": {c: str(df[c].dtype) for c in cols},
+    }
+    return shm, spec
+
+
+def _attach_frame(spec: dict):
+    """Attach to a block created by `_share_frame` and wrap it as a DataFrame."""
+    from multiprocessing import shared_memory
+
+    # Pool workers share the parent's resource tracker, so the parent's unlink
+    # remains the single point of cleanup for the block.
+    shm = shared_memory.SharedMemory(name=spec["name"])
+    arr = np.ndarray(spec["shape"], dtype=np.float64, buffer=shm.buf)
+    data = {}
+    for j, c in enumerate(spec["columns"]):
+        col = arr[:, j]
+        dtype = spec["dtypes"][c]
+        data[c] = col if dtype == "float64" else col.astype(dtype)
+    return shm, pd.DataFrame(data, copy=False)
+
+
+def _init_worker(
+    spec: dict,
+    symbol: str,
+    years: int,
+    cfg: AppConfig,
+    periods_per_year: float,
+    run_id: int,
+    fingerprint: str,
+    keep_equity: bool = True,
+) -> None:
+    shm, df = _attach_frame(spec)
+    _WORKER.update(
+        shm=shm, df=df, symbol=symbol, years=years, cfg=cfg,
+        periods_per_year=periods_per_year, run_id=run_id, fingerprint=fingerprint, keep_equity=keep_equity,
+    )
+
+
+def _worker_run(params: dict):
+    w = _WORKER
+    t0 = time.perf_counter()
+    rec = _simulate_combo(
+        w["df"], w["symbol"], w["years"], w["cfg"], params, w["periods_per_year"], w["run_id"], w["fingerprint"],
+        keep_equity=w["keep_equity"],
+    )
+    return rec, os.getpid(), time.perf_counter() - t0, get_cache().stats()["hit_rate"]
+
+
+def _run_parallel(
+    df, symbol, years, cfg, combos_params, periods_per_year, run_id, jobs, fingerprint, finalize=None, keep_equity=True
+):
+    """Evaluate combos over a process pool; results come back in submission order."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    shm, spec = _share_frame(df)
+    per_worker: dict = {}
+    t_start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(spec, symbol, years, cfg, periods_per_year, run_id, fingerprint, keep_equity),
+        ) as pool:
+            out = []
+            total = len(combos_params)
+            for done, (rec, pid, elapsed, hit_rate) in enumerate(pool.map(_worker_run, combos_params), start=1):
+                stats = per_worker.setdefault(pid, {"combos": 0, "busy": 0.0})
+                stats["combos"] += 1
+                stats["busy"] += elapsed
+                logger.info(
+                    f"backtest progress {done}/{total} | worker={pid} combos={stats['combos']} "
+                    f"rate={stats['combos'] / max(stats['busy'], 1e-9):.2f}/s cache_hit_rate={hit_rate:.2f}"
+                )
+                if finalize is not None:
+                    finalize(combos_params[done - 1], rec)
+                out.append(rec)
+    finally:
+        shm.close()
+        shm.unlink()
+    wall = time.perf_counter() - t_start
+    logger.info(f"backtest pool done | jobs={jobs} combos={len(combos_params)} throughput={len(combos_params) / max(wall, 1e-9):.2f}/s")
+    return out
+
+
+def _evaluate(
+    df, symbol, years, cfg, combos_params, periods_per_year, run_id, jobs, fingerprint, finalize=None, keep_equity=True
+):
+    """Simulate combos over df, serially or over a process pool, in grid order.
+
+    `finalize(params, rec)` runs on each record as soon as it arrives, so equity
+    curves can be spilled before the next combo is held in memory. With
+    keep_equity=False curves are not built at all (metrics are still exact).
+    """
+    if int(jobs) > 1 and len(combos_params) > 1:
+        return _run_parallel(
+            df, symbol, years, cfg, combos_params, periods_per_year, run_id, int(jobs), fingerprint, finalize,
+            keep_equity,
+        )
+    results = []
+    for params in combos_params:
+        rec = _simulate_combo(
+            df, symbol, years, cfg, params, periods_per_year, run_id, fingerprint, keep_equity=keep_equity
+        )
+        if finalize is not None:
+            finalize(params, rec)
+        results.append(rec)
+    logger.debug(f"indicator cache | {get_cache().stats()}")
+    return results
+
+
+EQUITY_MODES = ("spill", "downsample", "none")
+
+
+def _equity_finalizer(run_id: int, mode: str = "spill", points: Optional[int] = None):
+    """Replace each record's curve with an EquityHandle (or None for mode "none").
+
+    "spill" keeps full resolution, "downsample" stores at most `points` bars; both
+    write float32 arrays under data/artifacts/equity/run_id=<id>/<param_hash>.npy.
+    """
+    if mode not in EQUITY_MODES:
+        raise ValueError(f"Unknown equity mode {mode!r}; expected one of {EQUITY_MODES}")
+
+    if mode == "none":
+        def drop(params: dict, rec: dict) -> None:
+            rec["equity"] = None
+
+        return drop
+
+    writer = EquityWriter(
+        Path("data/artifacts/equity") / f"run_id={run_id}",
+        points=(points or 2000) if mode == "downsample" else None,
+    )
+
+    def spill(params: dict, rec: dict) -> None:
+        rec["equity"] = writer.write(_hash_params(params), rec["equity"])
+
+    return spill
+
+
+def _store_run(run_id, keys, combos_params, results, *, min_trades, extra_rows=None):
+    """Write the result rows of one run, then append them to the legacy CSV.
+
+    `extra_rows` (one dict per combo) adds the pruning columns of a halving sweep.
+    Equity curves are not touched here; they were spilled as records arrived.
+    """
+    artifacts_dir = Path("data/artifacts")
+    results_root = artifacts_dir / "results"
+    # Rows are written from the parent in combo order, so output is deterministic.
+    extra_columns = ["param_hash"] + (PRUNE_COLUMNS if extra_rows is not None else [])
+    csv_path = artifacts_dir / "backtest_results.csv"
+    import_legacy_csv(csv_path, results_root)
+    sink = ResultsSink(run_id, keys, results_root, extra_columns=extra_columns)
+    for i, (params, rec) in enumerate(zip(combos_params, results)):
+        metrics = {k: rec[k] for k in METRIC_COLUMNS}
+        extra = extra_rows[i] if extra_rows is not None else {}
+        sink.append(
+            {
+                **params,
+                **metrics,
+                "param_hash": _hash_params(params),
+                **extra,
+                "valid_row": metrics["n_trades"] >= min_trades,
+                "run_id": run_id,
+            }
+        )
+    sink.close()
+    # Legacy CSV: only this run's rows, under the existing header
+    append_csv(results_root, run_id, csv_path)
+
+
+def run_backtest(
+    symbol: str,
+    timeframe: str,
+    years: int,
+    cfg: AppConfig,
+    param_grid: dict,
+    data_loader=None,
+    jobs: int = 1,
+    *,
+    equity_mode: str = "spill",
+    equity_points: Optional[int] = None,
+):
+    """Grid sweep over param_grid; returns one record per combo in grid order.
+
+    Records hold the metrics and an `EquityHandle` under "equity"; curves are
+    spilled to disk as float32 (optionally downsampled) as each combo finishes.
+    """
     data_loader = data_loader or _default_loader
     base_df = data_loader(symbol, timeframe, years)
 
     # Build parameter combinations
     keys = list(param_grid.keys())
     combos = list(itertools.product(*[param_grid[k] for k in keys]))
-    results = []
-
-    artifacts_dir = Path("data/artifacts")
-    artifacts_dir.mkdir(parents=True, exist_ok=True)
-    csv_path = artifacts_dir / "backtest_results.csv"
+    combos_params = [dict(zip(keys, combo)) for combo in combos]
 
     # CSV hygiene and run metadata
     MIN_TRADES = int(getattr(cfg, "min_trades", 30))
-    run_id = int(time.time())
+    run_id = next_run_id(Path("data/artifacts/results"))
 
     # Map timeframe to bars per year for Sharpe
-    tf_map = {
-        "1m": 365 * 24 * 60,
-        "5m": 365 * 24 * 12,
-        "15m": 365 * 24 * 4,
-        "1h": 365 * 24,
-        "4h": 365 * 6,
-        "1d": 365,
-    }
-    periods_per_year = float(tf_map.get(timeframe, 365 * 24))
-
-    for combo in combos:
-        params = dict(zip(keys, combo))
-        # Override cfg by creating a shallow copy
-        cfg_copy = cfg.copy()
-        for k, v in params.items():
-            setattr(cfg_copy, k, v)
-
-        broker = PaperBroker(cfg_copy, equity=1000.0)
-        equity_curve = [broker.equity]
-
-        df = base_df.copy().reset_index(drop=True)
-        for i in range(200, len(df)):
-            window = df.iloc[: i + 1]
-            sig = generate_signal(window[["open", "high", "low", "close", "volume"]], cfg_copy)
-            if sig == "buy" and cfg.symbol not in broker.open_positions:
-                entry = float(window.iloc[-2]["close"])  # last closed
-                stop = compute_stop(entry, atr=entry * 0.0 + 1.0, k=cfg_copy.atr_k)
-                rr = float(cfg_copy.risk_rr)
-                tp = entry + (entry - stop) * rr
-                try:
-                    qty = position_size(entry, stop, broker.equity, 0.01, step=0.0)
-                except Exception:
-                    qty = 0.0
-                if qty > 0:
-                    broker.buy(symbol, entry, qty, stop, tp)
-
-            # Update with current last candle
-            broker.update_prices(window.tail(1))
-            equity_curve.append(broker.equity)
-
-            realized = [t.pnl for t in broker.trade_log if t.pnl is not None]
-            if kill_switch(realized, 1000.0, 0.2):
-                break
-
-        tr = broker.trade_log
-        n_trades = len(tr)
-        returns = pd.Series(equity_curve).pct_change().dropna().values
-        metrics = {
-            "cagr": cagr(equity_curve, max(1, years)),
-            "max_dd": max_drawdown(equity_curve),
-            "winrate": winrate(tr),
-            "pf": profit_factor(tr),
-            "expectancy": expectancy(tr),
-            "avg_trade": avg_trade(tr),
-            "sharpe": sharpe(returns, periods_per_year=periods_per_year),
-            "n_trades": n_trades,
-        }
-        rec = {**params, **metrics, "equity": equity_curve, "run_id": run_id}
-        results.append(rec)
+    periods_per_year = float(TF_PERIODS_PER_YEAR.get(timeframe, 365 * 24))
 
-        # Append CSV row
-        valid_row = n_trades >= MIN_TRADES
-        row = {**params, **metrics, "valid_row": valid_row, "run_id": run_id}
-        header = not csv_path.exists()
-        import csv
+    df = base_df.reset_index(drop=True)
+    fingerprint = dataset_fingerprint(df)
+    finalize = _equity_finalizer(run_id, equity_mode, equity_points)
+    results = _evaluate(
+        df, symbol, years, cfg, combos_params, periods_per_year, run_id, jobs, fingerprint, finalize,
+        keep_equity=equity_mode != "none",
+    )
+    _store_run(run_id, keys, combos_params, results, min_trades=MIN_TRADES)
+    return results
 
-        with csv_path.open("a", newline="") as f:
-            w = csv.DictWriter(f, fieldnames=list(row.keys()))
-            if header:
-                w.writeheader()
-            w.writerow(row)
 
-        # Save equity plot
-        try:
-            import matplotlib.pyplot as plt
-            import numpy as np
-
-            plt.figure(figsize=(6, 3))
-            plt.plot(equity_curve)
-            plt.title("Equity Curve")
-            plt.tight_layout()
-            plot_path = artifacts_dir / f"equity_{_hash_params(params)}.png"
-            plt.savefig(plot_path)
-            plt.close()
-        except Exception:
-            pass
+def _rung_sizes(n: int, eta: int, rungs: int, warmup: int = 200) -> list:
+    """History lengths (bars) per rung: the post-warmup span shrinks by eta per rung."""
+    if n <= warmup:
+        return [n]
+    sizes = []
+    for k in reversed(range(max(1, int(rungs)))):
+        bars = min(n, warmup + math.ceil((n - warmup) / float(eta) ** k))
+        if not sizes or bars > sizes[-1]:
+            sizes.append(bars)
+    return sizes
 
-    return results
+
+def _rank_key(rec: dict, metric: str) -> float:
+    value = float(rec.get(metric, float("nan")))
+    if value != value:  # NaN ranks last
+        return float("-inf")
+    return -value if metric in LOWER_IS_BETTER else value
+
+
+def run_pruned_backtest(
+    symbol: str,
+    timeframe: str,
+    years: int,
+    cfg: AppConfig,
+    param_grid: dict,
+    data_loader=None,
+    jobs: int = 1,
+    *,
+    eta: int = 3,
+    rungs: int = 3,
+    metric: str = "sharpe",
+    equity_mode: str = "spill",
+    equity_points: Optional[int] = None,
+):
+    """Successive-halving grid sweep.
+
+    Every combo is first simulated on a short prefix of the history; only the top
+    1/eta by `metric` is promoted to the next, eta times longer prefix, and the
+    last rung is the full history. Combos whose kill switch fired are dropped at
+    once: the walk over a prefix is identical to the start of the full walk, so
+    the switch would fire there too. Prefixes keep every indicator causal, so the
+    survivors' records equal those of `run_backtest`.
+
+    Returns one record per combo in grid order; each carries `rung`, `bars`,
+    `pruned` and `prune_reason`, which are also written to the results store.
+    """
+    data_loader = data_loader or _default_loader
+    df = data_loader(symbol, timeframe, years).reset_index(drop=True)
+
+    keys = list(param_grid.keys())
+    combos_params = [dict(zip(keys, c)) for c in itertools.product(*[param_grid[k] for k in keys])]
+    MIN_TRADES = int(getattr(cfg, "min_trades", 30))
+    run_id = next_run_id(Path("data/artifacts/results"))
+    periods_per_year = float(TF_PERIODS_PER_YEAR.get(timeframe, 365 * 24))
+    eta = max(2, int(eta))
+
+    sizes = _rung_sizes(len(df), eta, rungs)
+    records: list = [None] * len(combos_params)
+    extra_rows: list = [None] * len(combos_params)
+    alive = list(range(len(combos_params)))
+    evaluated_bars = 0
+    # Only full-history curves of the last rung are kept
+    drop_rung = _equity_finalizer(run_id, "none")
+    spill_final = _equity_finalizer(run_id, equity_mode, equity_points)
+    for rung, bars in enumerate(sizes):
+        sub = df.iloc[:bars]
+        final = rung == len(sizes) - 1
+        recs = _evaluate(
+            sub, symbol, years, cfg, [combos_params[i] for i in alive],
+            periods_per_year, run_id, jobs, dataset_fingerprint(sub), spill_final if final else drop_rung,
+            keep_equity=final and equity_mode != "none",
+        )
+        evaluated_bars += bars * len(alive)
+        ranked = []
+        for i, rec in zip(alive, recs):
+            records[i] = rec
+            extra_rows[i] = {"rung": rung, "bars": int(bars), "pruned": False, "prune_reason": ""}
+            if rec["killed"] and not final:
+                extra_rows[i].update(pruned=True, prune_reason="kill_switch")
+            else:
+                ranked.append(i)
+        if final:
+            break
+        # Stable sort: ties keep grid order
+        ranked.sort(key=lambda i: _rank_key(records[i], metric), reverse=True)
+        keep = ranked[: max(1, math.ceil(len(alive) / eta))] if ranked else []
+        for i in ranked[len(keep):]:
+            extra_rows[i].update(pruned=True, prune_reason=f"rank:{metric}")
+        logger.info(
+            f"halving rung {rung} | bars={bars} evaluated={len(alive)} promoted={len(keep)} "
+            f"killed={len(alive) - len(ranked)}"
+        )
+        alive = sorted(keep)
+        if not alive:
+            break
+
+    full_cost = len(df) * len(combos_params)
+    logger.info(
+        f"halving sweep done | combos={len(combos_params)} survivors={len(alive)} "
+        f"bar_evaluations={evaluated_bars} ({evaluated_bars / max(full_cost, 1):.1%} of a full sweep)"
+    )
+    _store_run(run_id, keys, combos_params, records, min_trades=MIN_TRADES, extra_rows=extra_rows)
+    return [{**rec, **extra} for rec, extra in zip(records, extra_rows)]
 
 
 def main():
@@ -153,6 +520,19 @@ def main():
     parser.add_argument("--timeframe", default="1h")
     parser.add_argument("--years", type=int, default=1)
     parser.add_argument("--grid", type=str, default="")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for the grid sweep")
+    parser.add_argument("--plot-top", type=int, default=0, help="Render equity plots for the top N combos")
+    parser.add_argument("--plot-metric", type=str, default="sharpe")
+    parser.add_argument("--history-dir", type=str, default="", help="Read candles from a local history store")
+    parser.add_argument("--base-timeframe", type=str, default="",
+                        help="Resample --timeframe from this stored base series (e.g. 1m)")
+    parser.add_argument("--prune", action="store_true", help="Successive-halving sweep over growing history prefixes")
+    parser.add_argument("--eta", type=int, default=3, help="Promote the top 1/eta combos per rung")
+    parser.add_argument("--rungs", type=int, default=3)
+    parser.add_argument("--prune-metric", type=str, default="sharpe")
+    parser.add_argument("--equity-mode", choices=EQUITY_MODES, default="spill",
+                        help="spill: full float32 curves on disk; downsample: at most --equity-points bars")
+    parser.add_argument("--equity-points", type=int, default=2000)
     args = parser.parse_args()
 
     cfg = AppConfig()
@@ -163,7 +543,35 @@ def main():
     else:
         grid = {"ema_fast": [10], "ema_slow": [20], "rsi_period": [14], "rsi_buy_min": [45], "rsi_buy_max": [60]}
 
-    run_backtest(args.symbol, args.timeframe, args.years, cfg, grid)
+    loader = None
+    if args.history_dir:
+        from .history import HistoryStore, history_loader
+
+        store = HistoryStore(Path(args.history_dir))
+        if args.base_timeframe:
+            from .resample import resampled_loader
+
+            loader = resampled_loader(store, args.base_timeframe)
+        else:
+            loader = history_loader(store)
+
+    if args.prune:
+        results = run_pruned_backtest(
+            args.symbol, args.timeframe, args.years, cfg, grid, data_loader=loader, jobs=args.jobs,
+            eta=args.eta, rungs=args.rungs, metric=args.prune_metric,
+            equity_mode=args.equity_mode, equity_points=args.equity_points,
+        )
+    else:
+        results = run_backtest(
+            args.symbol, args.timeframe, args.years, cfg, grid, data_loader=loader, jobs=args.jobs,
+            equity_mode=args.equity_mode, equity_points=args.equity_points,
+        )
+
+    # Plotting is a separate post-processing stage over the saved equity arrays
+    if args.plot_top > 0 and results:
+        from .plots import render_equity_plots
+
+        render_equity_plots(run_id=results[0]["run_id"], top_n=args.plot_top, metric=args.plot_metric, jobs=args.jobs)
 
 
 if __name__ == "__main__":
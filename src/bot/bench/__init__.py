@@ -0,0 +1,152 @@
+"""Benchmarks for the strategy, backtest, broker and metrics hot paths.
+
+Every (case, size) pair runs in a fresh spawned process so peak RSS is per case.
+Timing repeats run without tracing; one extra traced run records allocations with
+tracemalloc. Results are plain JSON, so two runs can be compared with `compare`.
+
+CLI:
+  python -m bot.bench --sizes 1000,10000,100000,1000000 --out data/artifacts/bench.json
+  python -m bot.bench --compare before.json after.json
+"""
+from __future__ import annotations
+
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .cases import CASES, synthetic_ohlcv
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+__all__ = ["CASES", "DEFAULT_SIZES", "synthetic_ohlcv", "run_case", "run_benchmarks", "compare"]
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def run_case(name: str, size: int, *, seed: int = 42, repeat: int = 3) -> Dict[str, Any]:
+    """Time one case in the current process and return its result record."""
+    case = CASES[name]
+    state = case.setup(int(size), int(seed))
+    rss_before = _peak_rss_bytes()
+
+    times = []
+    bars = 0
+    for _ in range(max(1, int(repeat))):
+        t0 = time.perf_counter()
+        bars = case.run(state)
+        times.append(time.perf_counter() - t0)
+    rss_peak = _peak_rss_bytes()
+
+    tracemalloc.start()
+    try:
+        case.run(state)
+        _, alloc_peak = tracemalloc.get_traced_memory()
+        stats = tracemalloc.take_snapshot().statistics("filename")
+    finally:
+        tracemalloc.stop()
+
+    best = min(times)
+    return {
+        "case": name,
+        "size": int(size),
+        "bars": int(bars),
+        "repeat": len(times),
+        "best_s": best,
+        "median_s": sorted(times)[len(times) // 2],
+        "bars_per_sec": bars / best if best > 0 else float("inf"),
+        "peak_rss_bytes": rss_peak,
+        "rss_delta_bytes": None if rss_peak is None or rss_before is None else rss_peak - rss_before,
+        "alloc_peak_bytes": int(alloc_peak),
+        "alloc_live_blocks": int(sum(s.count for s in stats)),
+    }
+
+
+def _run_isolated(name: str, size: int, seed: int, repeat: int) -> Dict[str, Any]:
+    import multiprocessing as mp
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+        return pool.submit(run_case, name, size, seed=seed, repeat=repeat).result()
+
+
+def run_benchmarks(
+    cases: Optional[Iterable[str]] = None,
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    *,
+    seed: int = 42,
+    repeat: int = 3,
+    isolate: bool = True,
+    log=print,
+) -> Dict[str, Any]:
+    """Run cases x sizes and return {"meta": ..., "results": [...]}."""
+    names = list(cases) if cases else list(CASES)
+    unknown = [c for c in names if c not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark cases: {unknown}; available: {sorted(CASES)}")
+
+    import numpy as np
+    import pandas as pd
+
+    results: List[Dict[str, Any]] = []
+    for name in names:
+        for size in sizes:
+            rec = _run_isolated(name, size, seed, repeat) if isolate else run_case(name, size, seed=seed, repeat=repeat)
+            results.append(rec)
+            if log is not None:
+                log(
+                    f"{name:<22} {size:>9} bars  {rec['bars_per_sec']:>14,.0f} bars/s  "
+                    f"best={rec['best_s']:.4f}s  alloc_peak={rec['alloc_peak_bytes'] / 2**20:.1f}MiB"
+                )
+    meta = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "seed": int(seed),
+        "repeat": int(repeat),
+        "isolated": bool(isolate),
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Pair up (case, size) rows of two runs; speedup > 1 means `new` is faster."""
+    index = {(r["case"], r["size"]): r for r in base.get("results", [])}
+    rows = []
+    for r in new.get("results", []):
+        b = index.get((r["case"], r["size"]))
+        if b is None:
+            continue
+        rows.append(
+            {
+                "case": r["case"],
+                "size": r["size"],
+                "base_bars_per_sec": b["bars_per_sec"],
+                "new_bars_per_sec": r["bars_per_sec"],
+                "speedup": r["bars_per_sec"] / b["bars_per_sec"] if b["bars_per_sec"] else float("nan"),
+                "alloc_peak_ratio": (
+                    r["alloc_peak_bytes"] / b["alloc_peak_bytes"] if b["alloc_peak_bytes"] else float("nan")
+                ),
+            }
+        )
+    return rows
+
+
+def write_json(report: Dict[str, Any], path: Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True), encoding="utf-8")
+    return path
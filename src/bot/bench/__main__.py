@@ -0,0 +1,39 @@
+"""`python -m bot.bench` entry point."""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from . import DEFAULT_SIZES, compare, run_benchmarks, write_json
+
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m bot.bench")
+    p.add_argument("--cases", type=str, default="", help="Comma-separated subset of cases")
+    p.add_argument("--sizes", type=str, default=",".join(str(s) for s in DEFAULT_SIZES))
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--no-isolate", action="store_true", help="Run all cases in this process")
+    p.add_argument("--out", type=str, default="data/artifacts/bench.json")
+    p.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two result files and exit")
+    args = p.parse_args()
+
+    if args.compare:
+        base, new = (json.loads(Path(x).read_text(encoding="utf-8")) for x in args.compare)
+        for row in compare(base, new):
+            print(
+                f"{row['case']:<22} {row['size']:>9}  {row['base_bars_per_sec']:>14,.0f} -> "
+                f"{row['new_bars_per_sec']:>14,.0f} bars/s  x{row['speedup']:.2f}  "
+                f"alloc x{row['alloc_peak_ratio']:.2f}"
+            )
+        return
+
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()] or None
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = run_benchmarks(cases, sizes, seed=args.seed, repeat=args.repeat, isolate=not args.no_isolate)
+    print(f"Wrote {write_json(report, Path(args.out))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark cases over seeded synthetic candles.
+
+Each case is `setup(n, seed) -> state` followed by `run(state) -> bars`, where the
+return value is the number of bars processed by one run (used for bars/sec).
+Setup work (data generation, broker construction) is never timed.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+from typing import Any, Callable, Dict, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import AppConfig
+
+# update_prices is a per-bar call in the runner loop; cap the calls per run so the
+# 1M-bar size stays practical (the cost of one call does not depend on history length).
+MAX_UPDATE_CALLS = 20_000
+
+
+def synthetic_ohlcv(n: int, seed: int = 42) -> pd.DataFrame:
+    """Hourly random-walk OHLCV frame of n bars; identical for the same (n, seed)."""
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, n))
+    close = np.maximum(close, 1.0)
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = rng.uniform(0.1, 2.0, n)
+    return pd.DataFrame(
+        {
+            "timestamp": (1_577_836_800 + np.arange(n, dtype=np.int64) * 3600) * 1000,
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.maximum(np.minimum(open_, close) - spread, 0.5),
+            "close": close,
+            "volume": rng.uniform(1.0, 10.0, n),
+        }
+    )
+
+
+def _bench_cfg() -> AppConfig:
+    return AppConfig(ema_fast=10, ema_slow=30, rsi_period=14, enable_adx=True, enable_vol_filter=True)
+
+
+class Case(NamedTuple):
+    setup: Callable[[int, int], Any]
+    run: Callable[[Any], int]
+
+
+# ---------- strategy ----------
+def _setup_frame(n: int, seed: int) -> Dict[str, Any]:
+    return {"df": synthetic_ohlcv(n, seed), "cfg": _bench_cfg()}
+
+
+def _run_calculate_indicators(state: Dict[str, Any]) -> int:
+    from ..strategy import calculate_indicators
+
+    calculate_indicators(state["df"], state["cfg"])
+    return len(state["df"])
+
+
+def _run_generate_signal(state: Dict[str, Any]) -> int:
+    from ..strategy import generate_signal
+
+    generate_signal(state["df"], state["cfg"])
+    return len(state["df"])
+
+
+# ---------- backtest ----------
+def _run_backtest(state: Dict[str, Any]) -> int:
+    from ..backtest import run_backtest
+    from ..cache import get_cache
+
+    df, cfg = state["df"], state["cfg"]
+    grid = {"ema_fast": [cfg.ema_fast], "ema_slow": [cfg.ema_slow], "rsi_period": [cfg.rsi_period]}
+    # Cold indicator cache on every run; artifacts go to a throwaway directory
+    get_cache().clear()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            run_backtest("BTC/USDT", "1h", 1, cfg, grid, data_loader=lambda *_: df)
+        finally:
+            os.chdir(cwd)
+    return len(df)
+
+
+# ---------- paper broker ----------
+def _setup_broker(n: int, seed: int) -> Dict[str, Any]:
+    from ..paper import PaperBroker
+
+    df = synthetic_ohlcv(n, seed)
+    broker = PaperBroker(AppConfig(), equity=1_000_000.0)
+    # Levels outside every bar's range: the position stays open and every call does a full check
+    broker.buy("BTC/USDT", float(df["close"].iloc[-1]), 1.0, stop=-1.0, tp=1e12)
+    return {"df": df, "broker": broker, "calls": min(n, MAX_UPDATE_CALLS)}
+
+
+def _run_update_prices(state: Dict[str, Any]) -> int:
+    df, broker = state["df"], state["broker"]
+    for _ in range(state["calls"]):
+        broker.update_prices(df)
+    return state["calls"]
+
+
+# ---------- metrics ----------
+def _setup_equity(n: int, seed: int) -> Dict[str, Any]:
+    df = synthetic_ohlcv(n, seed)
+    return {"equity": (1000.0 * df["close"] / df["close"].iloc[0]).tolist()}
+
+
+def _run_max_drawdown(state: Dict[str, Any]) -> int:
+    from ..metrics import max_drawdown
+
+    max_drawdown(state["equity"])
+    return len(state["equity"])
+
+
+CASES: Dict[str, Case] = {
+    "calculate_indicators": Case(_setup_frame, _run_calculate_indicators),
+    "generate_signal": Case(_setup_frame, _run_generate_signal),
+    "run_backtest": Case(_setup_frame, _run_backtest),
+    "update_prices": Case(_setup_broker, _run_update_prices),
+    "max_drawdown": Case(_setup_equity, _run_max_drawdown),
+}
@@ -0,0 +1,90 @@
+"""Process-local LRU cache for indicator series shared across backtest combos.
+
+Entries are keyed by (dataset fingerprint, indicator name, parameters) so a grid
+sweep computes each distinct series (e.g. EMA(10) or RSI(14)) once per dataset per
+process. Memory is bounded by the total bytes of cached arrays.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """Stable content hash of the OHLCV (and timestamp, if present) columns."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(len(df)).encode())
+    for col in ("timestamp", "open", "high", "low", "close", "volume"):
+        if col not in df.columns:
+            continue
+        h.update(col.encode())
+        h.update(np.ascontiguousarray(df[col].to_numpy(dtype=np.float64)).data)
+    return h.hexdigest()
+
+
+class IndicatorCache:
+    """Bounded LRU mapping keys to read-only NumPy arrays."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = int(max_bytes)
+        self._data: "OrderedDict[Tuple[Hashable, ...], np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key: Tuple[Hashable, ...], compute: Callable[[], object]) -> np.ndarray:
+        with self._lock:
+            arr = self._data.get(key)
+            if arr is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return arr
+            self.misses += 1
+
+        arr = np.asarray(compute(), dtype=np.float64)
+        arr.setflags(write=False)
+
+        with self._lock:
+            if key not in self._data and arr.nbytes <= self.max_bytes:
+                self._data[key] = arr
+                self._bytes += arr.nbytes
+                while self._bytes > self.max_bytes and self._data:
+                    _, old = self._data.popitem(last=False)
+                    self._bytes -= old.nbytes
+                    self.evictions += 1
+        return arr
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+_CACHE = IndicatorCache()
+
+
+def get_cache() -> IndicatorCache:
+    """Return the process-wide indicator cache."""
+    return _CACHE
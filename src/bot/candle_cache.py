@@ -0,0 +1,150 @@
+"""Per-symbol ring buffers of recent candles for the runner loops.
+
+Each symbol keeps the last `capacity` candles (including the still-forming one)
+in fixed-size NumPy columns. After a one-time backfill, each iteration only
+requests the few candles since the last stored timestamp; a candle with the
+stored last timestamp overwrites it in place (the forming candle updates until
+it closes).
+
+Every value is written twice, at slot `i` and `i + capacity`, so the latest
+window is always one contiguous slice and `frame()` is a zero-copy view.
+"""
+from __future__ import annotations
+
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .history import timeframe_to_ms
+
+COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+class CandleRing:
+    """Fixed-capacity OHLCV ring with contiguous (mirrored) storage."""
+
+    def __init__(self, capacity: int = 200) -> None:
+        self.capacity = max(2, int(capacity))
+        cap2 = 2 * self.capacity
+        self._cols: Dict[str, np.ndarray] = {"timestamp": np.zeros(cap2, dtype=np.int64)}
+        self._cols.update({c: np.zeros(cap2, dtype=np.float64) for c in COLUMNS[1:]})
+        self._n = 0  # candles written in total
+        self._last = -1  # slot of the newest candle
+
+    def __len__(self) -> int:
+        return min(self._n, self.capacity)
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return int(self._cols["timestamp"][self._last]) if self._n else None
+
+    def clear(self) -> None:
+        self._n = 0
+        self._last = -1
+
+    def _write(self, slot: int, row: Sequence[Any]) -> None:
+        for k, c in enumerate(COLUMNS):
+            col = self._cols[c]
+            col[slot] = row[k]
+            col[slot + self.capacity] = row[k]
+
+    def push(self, row: Sequence[Any]) -> None:
+        """Append a newer candle, or overwrite the newest one when the timestamps match."""
+        ts = int(row[0])
+        last = self.last_ts
+        if last is not None and ts < last:
+            return  # closed candles are final
+        if last is not None and ts == last:
+            self._write(self._last, row)
+            return
+        self._last = self._n % self.capacity
+        self._write(self._last, row)
+        self._n += 1
+
+    def window(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy views of the newest `n` candles (default: all), oldest first."""
+        size = len(self)
+        n = size if n is None else max(0, min(int(n), size))
+        end = self._last + self.capacity + 1 if self._n else 0
+        return {c: col[end - n : end] for c, col in self._cols.items()}
+
+
+class CandleCache:
+    """Recent candles per symbol; fetches only what is new after a backfill.
+
+    Frames returned by `frame()` alias the ring buffers and are only valid until
+    the symbol's next `ingest`.
+    """
+
+    def __init__(
+        self,
+        timeframe: str,
+        *,
+        capacity: int = 200,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.timeframe = timeframe
+        self.tf_ms = timeframe_to_ms(timeframe)
+        self.capacity = int(capacity)
+        self._clock = clock
+        self.rings: Dict[str, CandleRing] = {}
+
+    def __contains__(self, symbol: str) -> bool:
+        ring = self.rings.get(symbol)
+        return ring is not None and len(ring) > 0
+
+    def fetch_limit(self, symbol: str) -> int:
+        """Candles to request for `symbol`: the full capacity until backfilled, then
+        the bars since the stored forming candle plus a margin of one."""
+        ring = self.rings.get(symbol)
+        if ring is None or ring.last_ts is None:
+            return self.capacity
+        elapsed = max(0, int(self._clock() * 1000) - ring.last_ts)
+        return int(min(self.capacity, math.floor(elapsed / self.tf_ms) + 2))
+
+    def ingest(self, symbol: str, candles: Iterable[Sequence[Any]]) -> bool:
+        """Merge fetched candles; False (and the symbol reset) when they leave a gap
+        after the stored ones, so the caller backfills again."""
+        rows = sorted(candles, key=lambda c: c[0])
+        ring = self.rings.get(symbol)
+        if ring is None:
+            ring = self.rings[symbol] = CandleRing(self.capacity)
+        last = ring.last_ts
+        if rows and last is not None and int(rows[0][0]) > last + self.tf_ms:
+            ring.clear()
+            return False
+        for row in rows:
+            ring.push(row)
+        return True
+
+    def frame(self, symbol: str, n: Optional[int] = None) -> pd.DataFrame:
+        """Newest candles of `symbol` as a DataFrame over the ring (no copy)."""
+        return pd.DataFrame(self.rings[symbol].window(n), columns=COLUMNS, copy=False)
+
+    def merge(
+        self, rows_by_symbol: Dict[str, List[list]], fetch: Callable[[List[str], int], Dict[str, List[list]]]
+    ) -> Dict[str, List[list]]:
+        """Ingest fetched rows per symbol, backfilling (one more `fetch`) any that left a gap."""
+        lagging = [s for s, rows in rows_by_symbol.items() if not self.ingest(s, rows)]
+        if not lagging:
+            return rows_by_symbol
+        again = fetch(lagging, self.capacity)
+        for s in lagging:
+            self.ingest(s, again[s])
+        return {**rows_by_symbol, **again}
+
+    def refresh(
+        self, fetch: Callable[[List[str], int], Dict[str, List[list]]], symbols: Iterable[str]
+    ) -> Dict[str, List[list]]:
+        """Fetch and ingest new candles for all symbols, backfilling any that lag.
+
+        `fetch(symbols, limit)` returns rows per symbol; one request covers the
+        largest limit any symbol needs. Returns the fetched rows.
+        """
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+        return self.merge(fetch(symbols, max(self.fetch_limit(s) for s in symbols)), fetch)
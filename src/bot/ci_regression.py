@@ -2,9 +2,20 @@ import argparse
 import csv
 import json
 import os
+from contextlib import nullcontext
 from datetime import datetime, timezone
 
 
+def _store_rows(store_path: str):
+    """Yield rows of a columnar results store as string dicts, like csv.DictReader."""
+    from .results import load_results
+
+    df = load_results(store_path)
+    fieldnames = [str(c) for c in df.columns]
+    rows = ({k: ("" if v is None else str(v)) for k, v in zip(fieldnames, values)} for values in df.itertuples(index=False))
+    return fieldnames, rows
+
+
 def evaluate(csv_path: str, out_path: str) -> bool:
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f"CSV not found: {csv_path}")
@@ -15,9 +26,14 @@ def evaluate(csv_path: str, out_path: str) -> bool:
     best_sharpe = float("-inf")
     worst_dd = float("inf")
 
-    with open(csv_path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        cols = [c.lower() for c in reader.fieldnames or []]
+    # csv_path may also point at the columnar results store directory
+    with (nullcontext() if os.path.isdir(csv_path) else open(csv_path, newline="", encoding="utf-8")) as f:
+        if f is None:
+            fieldnames, reader = _store_rows(csv_path)
+        else:
+            reader = csv.DictReader(f)
+            fieldnames = reader.fieldnames
+        cols = [c.lower() for c in fieldnames or []]
         # Accept typical variations
         def get(row, *names):
             for n in names:
@@ -37,6 +53,9 @@ def evaluate(csv_path: str, out_path: str) -> bool:
         dd_cols = ["max_dd", "maxdd", "max_drawdown"]
 
         for row in reader:
+            # Combos pruned by a halving sweep only have partial-history metrics
+            if str(get(row, "pruned") or "").strip().lower() in ("true", "1", "1.0"):
+                continue
             s = get(row, *sharpe_cols)
             d = get(row, *dd_cols)
             if s is None or d is None:
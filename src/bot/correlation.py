@@ -0,0 +1,151 @@
+"""Rolling return correlations of all whitelisted symbols, kept in memory.
+
+`RollingCorrelation` stores the last `window` close-to-close returns of every
+symbol on a shared timestamp index and maintains the pairwise sums behind the
+Pearson correlation (count, sum x, sum x^2, sum xy over rows where both
+symbols have a return). Each closed candle adds one row and evicts the oldest
+with O(N^2) array updates, so the full N x N matrix is always current and guard
+queries need no candles at all. The sums are rebuilt exactly from the window
+every `window` rows to keep rounding drift out.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class RollingCorrelation:
+    """Pairwise-complete Pearson correlations over the last `window` returns."""
+
+    def __init__(self, symbols: Sequence[str], window: int = 100, *, min_obs: int = 10) -> None:
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.window = max(2, int(window))
+        self.min_obs = int(min_obs)
+        n = len(self.symbols)
+        self.returns = np.full((self.window, n), np.nan)  # ring of return rows
+        self.last_ts: Optional[int] = None
+        self._rows = 0  # rows pushed in total
+        self._since_rebuild = 0
+        self._last_close = np.full(n, np.nan)
+        self._n = np.zeros((n, n))
+        self._sx = np.zeros((n, n))  # _sx[i, j]: sum of x_i where i and j both have a return
+        self._sxx = np.zeros((n, n))
+        self._sxy = np.zeros((n, n))
+
+    def __len__(self) -> int:
+        return min(self._rows, self.window)
+
+    def _accumulate(self, row: np.ndarray, sign: float) -> None:
+        valid = np.isfinite(row)
+        if not valid.any():
+            return
+        v = valid.astype(float)
+        x = np.where(valid, row, 0.0)
+        self._n += sign * np.outer(v, v)
+        self._sx += sign * np.outer(x, v)
+        self._sxx += sign * np.outer(x * x, v)
+        self._sxy += sign * np.outer(x, x)
+
+    def _rebuild(self) -> None:
+        for m in (self._n, self._sx, self._sxx, self._sxy):
+            m.fill(0.0)
+        for row in self.returns[: len(self)]:
+            self._accumulate(row, 1.0)
+        self._since_rebuild = 0
+
+    def push(self, ts: int, closes: Mapping[str, float]) -> None:
+        """Add the closed candle at `ts` (closes of the symbols that have one)."""
+        ts = int(ts)
+        if self.last_ts is not None and ts <= self.last_ts:
+            return
+        close = np.full(len(self.symbols), np.nan)
+        for s, c in closes.items():
+            i = self.index.get(s)
+            if i is not None:
+                close[i] = float(c)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            row = close / self._last_close - 1.0
+        self._last_close = np.where(np.isfinite(close), close, self._last_close)
+        self.push_returns(ts, row)
+
+    def push_returns(self, ts: int, row: np.ndarray) -> None:
+        """Add one row of returns (in `symbols` order, NaN where a symbol has none)."""
+        ts = int(ts)
+        if self.last_ts is not None and ts <= self.last_ts:
+            return
+        row = np.asarray(row, dtype=float)
+        slot = self._rows % self.window
+        if self._rows >= self.window:
+            self._accumulate(self.returns[slot], -1.0)
+        self.returns[slot] = row
+        self._accumulate(row, 1.0)
+        self._rows += 1
+        self.last_ts = ts
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.window:
+            self._rebuild()
+
+    def update(self, frames: Mapping[str, pd.DataFrame]) -> int:
+        """Push closed candles newer than `last_ts` from per-symbol frames.
+
+        Frames hold closed candles only. Rows are added up to the oldest of the
+        symbols' newest timestamps, so a symbol whose candle is late is not
+        skipped. Returns the number of rows added.
+        """
+        cols = {
+            s: (df["timestamp"].to_numpy(dtype=np.int64), df["close"].to_numpy(dtype=float))
+            for s, df in frames.items()
+            if s in self.index and len(df)
+        }
+        if not cols:
+            return 0
+        horizon = min(int(ts[-1]) for ts, _ in cols.values())
+        lo = -np.inf if self.last_ts is None else self.last_ts
+        new = np.unique(np.concatenate([ts[(ts > lo) & (ts <= horizon)] for ts, _ in cols.values()]))
+        for t in new:
+            closes = {}
+            for s, (ts, close) in cols.items():
+                k = int(np.searchsorted(ts, t))
+                if k < len(ts) and ts[k] == t:
+                    closes[s] = close[k]
+            self.push(int(t), closes)
+        return len(new)
+
+    def matrix(self) -> np.ndarray:
+        """Full N x N correlation matrix (NaN where fewer than `min_obs` common returns)."""
+        n = self._n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = self._sxy - self._sx * self._sx.T / n
+            var_i = self._sxx - self._sx**2 / n
+            var_j = var_i.T
+            denom = np.sqrt(np.clip(var_i, 0.0, None) * np.clip(var_j, 0.0, None))
+            corr = np.where(denom > 0, cov / denom, np.nan)
+        corr[n < self.min_obs] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+    def corr(self, a: str, b: str) -> float:
+        i, j = self.index.get(a), self.index.get(b)
+        if i is None or j is None:
+            return float("nan")
+        n = self._n[i, j]
+        if n < self.min_obs:
+            return float("nan")
+        cov = self._sxy[i, j] - self._sx[i, j] * self._sx[j, i] / n
+        var_i = self._sxx[i, j] - self._sx[i, j] ** 2 / n
+        var_j = self._sxx[j, i] - self._sx[j, i] ** 2 / n
+        denom = np.sqrt(max(var_i, 0.0) * max(var_j, 0.0))
+        return float(min(1.0, max(-1.0, cov / denom))) if denom > 0 else float("nan")
+
+    def count_correlated(self, symbol: str, others: Iterable[str], threshold: float) -> int:
+        """How many of `others` (excluding `symbol`) correlate with `symbol` above `threshold`."""
+        count = 0
+        for o in others:
+            if o == symbol:
+                continue
+            c = self.corr(symbol, o)
+            if c == c and c > threshold:
+                count += 1
+        return count
@@ -0,0 +1,207 @@
+"""Paginated, resumable bulk OHLCV downloader into the local history store.
+
+Pages forward with `fetch_ohlcv(..., since=...)` for every whitelisted symbol,
+concurrently, under one shared request-rate limit. After each page the candles are
+appended to the `HistoryStore` and the next `since` (one candle after the newest
+stored one) is checkpointed, so an interrupted download resumes where it stopped.
+Overlapping pages are de-duplicated by the store (only strictly newer timestamps
+are appended).
+
+CLI:
+  python -m bot.download --config config/config.yaml --timeframe 1m --since 2023-01-01
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from loguru import logger
+
+from .history import HistoryStore, timeframe_to_ms
+
+
+class RateLimiter:
+    """Thread-safe spacing limiter: at most `rate` acquisitions per second overall."""
+
+    def __init__(
+        self,
+        rate: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.interval = 1.0 / float(rate) if rate and rate > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            self._sleep(wait)
+
+
+class Checkpoint:
+    """JSON file mapping "symbol|timeframe" to the next `since` (ms) to request."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.data: Dict[str, int] = {}
+        if self.path.exists():
+            self.data = {k: int(v) for k, v in json.loads(self.path.read_text(encoding="utf-8")).items()}
+
+    @staticmethod
+    def key(symbol: str, timeframe: str) -> str:
+        return f"{symbol}|{timeframe}"
+
+    def get(self, symbol: str, timeframe: str) -> Optional[int]:
+        with self._lock:
+            return self.data.get(self.key(symbol, timeframe))
+
+    def set(self, symbol: str, timeframe: str, since: int) -> None:
+        with self._lock:
+            self.data[self.key(symbol, timeframe)] = int(since)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps(self.data, indent=2, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+def _rate_from_exchange(exchange: Any) -> float:
+    # ccxt exposes rateLimit as milliseconds between requests
+    client = getattr(exchange, "client", exchange)
+    ms = getattr(client, "rateLimit", None)
+    try:
+        return 1000.0 / float(ms) if ms else 10.0
+    except Exception:
+        return 10.0
+
+
+def download_symbol(
+    exchange: Any,
+    store: HistoryStore,
+    symbol: str,
+    timeframe: str,
+    start_ms: int,
+    *,
+    end_ms: Optional[int] = None,
+    page_limit: int = 1000,
+    limiter: Optional[RateLimiter] = None,
+    checkpoint: Optional[Checkpoint] = None,
+) -> int:
+    """Download closed candles for one symbol from start_ms (or the resume point)."""
+    tf_ms = timeframe_to_ms(timeframe)
+    end_ms = int(time.time() * 1000) if end_ms is None else int(end_ms)
+    since = int(start_ms)
+    last = store.last_timestamp(symbol, timeframe)
+    if last is not None:
+        since = max(since, last + tf_ms)
+    # The store is the resume point; a checkpoint ahead of it would skip candles
+    if checkpoint is not None and (checkpoint.get(symbol, timeframe) or 0) > since:
+        checkpoint.set(symbol, timeframe, since)
+
+    written = 0
+    while since < end_ms:
+        if limiter is not None:
+            limiter.acquire()
+        page = exchange.fetch_ohlcv(symbol, timeframe, limit=page_limit, since=since)
+        # Only candles that closed before end_ms are stored
+        closed = [c for c in page or [] if int(c[0]) >= since and int(c[0]) + tf_ms <= end_ms]
+        if not closed:
+            break
+        written += store.append(symbol, timeframe, closed)
+        newest = max(int(c[0]) for c in closed)
+        since = newest + tf_ms
+        if checkpoint is not None:
+            checkpoint.set(symbol, timeframe, since)
+        logger.debug(f"download {symbol} {timeframe}: +{len(closed)} up to {newest}")
+    return written
+
+
+def download_history(
+    exchange: Any,
+    store: HistoryStore,
+    symbols: Iterable[str],
+    timeframe: str,
+    start_ms: int,
+    *,
+    end_ms: Optional[int] = None,
+    page_limit: int = 1000,
+    jobs: int = 4,
+    rate_per_sec: Optional[float] = None,
+    checkpoint_path: Optional[Path] = None,
+) -> Dict[str, int]:
+    """Download all symbols concurrently; returns rows written per symbol."""
+    symbols = list(symbols)
+    limiter = RateLimiter(rate_per_sec if rate_per_sec else _rate_from_exchange(exchange))
+    checkpoint = Checkpoint(checkpoint_path or (store.root / "download_checkpoint.json"))
+    end_ms = int(time.time() * 1000) if end_ms is None else int(end_ms)
+
+    def _one(symbol: str) -> int:
+        n = download_symbol(
+            exchange, store, symbol, timeframe, start_ms,
+            end_ms=end_ms, page_limit=page_limit, limiter=limiter, checkpoint=checkpoint,
+        )
+        logger.info(f"download {symbol} {timeframe}: {n} new candles, total {store.count(symbol, timeframe)}")
+        return n
+
+    with ThreadPoolExecutor(max_workers=max(1, int(jobs))) as pool:
+        counts = list(pool.map(_one, symbols))
+    return dict(zip(symbols, counts))
+
+
+def _parse_date_ms(value: str) -> int:
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def main():
+    from .config import load_config
+    from .exchange import Exchange
+
+    p = argparse.ArgumentParser()
+    p.add_argument("--config", type=str, default="config/config.yaml")
+    p.add_argument("--timeframe", type=str, default="")
+    p.add_argument("--since", type=str, required=True, help="ISO date, e.g. 2023-01-01")
+    p.add_argument("--until", type=str, default="")
+    p.add_argument("--symbols", type=str, default="", help="Comma-separated subset of the whitelist")
+    p.add_argument("--history-dir", type=str, default="data/history")
+    p.add_argument("--page-limit", type=int, default=1000)
+    p.add_argument("--jobs", type=int, default=4)
+    p.add_argument("--rate", type=float, default=0.0, help="Max requests/sec (default: exchange rateLimit)")
+    args = p.parse_args()
+
+    cfg, env = load_config(Path(args.config))
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()] or list(cfg.symbols_whitelist)
+    ex = Exchange(cfg, env)
+    counts = download_history(
+        ex,
+        HistoryStore(Path(args.history_dir)),
+        symbols,
+        args.timeframe or cfg.timeframe,
+        _parse_date_ms(args.since),
+        end_ms=_parse_date_ms(args.until) if args.until else None,
+        page_limit=args.page_limit,
+        jobs=args.jobs,
+        rate_per_sec=args.rate or None,
+    )
+    print(f"Downloaded: {counts}")
+
+
+if __name__ == "__main__":
+    main()
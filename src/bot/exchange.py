@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from decimal import Decimal, ROUND_FLOOR
 from time import sleep
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
 
 import ccxt  # type: ignore
 from loguru import logger
@@ -181,17 +182,27 @@ class Exchange:
 
         return float(self._with_retries(_op))
 
-    def fetch_ohlcv(self, symbol: str, timeframe: str, limit: int = 500) -> list[list[Any]]:
+    def fetch_ohlcv(
+        self, symbol: str, timeframe: str, limit: int = 500, since: Optional[int] = None
+    ) -> list[list[Any]]:
+        """Fetch candles; `since` (ms) pages forward from a start time when given."""
         self._check_symbol_allowed(symbol)
 
         def _op():
-            candles = self.client.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+            if since is not None:
+                candles = self.client.fetch_ohlcv(symbol, timeframe=timeframe, since=int(since), limit=limit)
+            else:
+                candles = self.client.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
             if not isinstance(candles, list):
                 raise ExchangeError("OHLCV response malformed")
             return candles
 
         return self._with_retries(_op)
 
+    def fetch_time(self) -> int:
+        """Exchange server time in ms."""
+        return int(self._with_retries(lambda: self.client.fetch_time()))
+
     def get_balance(self, quote: str) -> float:
         def _op():
             bal = self.client.fetch_balance()
@@ -285,3 +296,140 @@ class Exchange:
         return self._with_retries(_op)
 
     # NEVER implement any withdrawal functions in this class.
+
+
+class AsyncExchange:
+    """asyncio market-data client on `ccxt.async_support` with the `Exchange` guardrails.
+
+    Same whitelist check, retry/backoff on transient ccxt errors and normalization
+    to `ExchangeError`; `fetch_ohlcv_many` fetches several symbols concurrently
+    under a semaphore. Orders stay on the blocking `Exchange`.
+    """
+
+    def __init__(
+        self,
+        cfg: AppConfig,
+        env: Optional[EnvVars] = None,
+        *,
+        max_retries: int = 3,
+        backoff_base_delay: float = 0.05,
+        timeout_ms: int = 15000,
+        client: Any = None,
+    ) -> None:
+        self.cfg = cfg
+        self.env = env or EnvVars()
+        self.symbols_whitelist = set(cfg.symbols_whitelist)
+        self._retry = _RetryPolicy(tries=max_retries, base_delay=backoff_base_delay)
+        if client is None:
+            import ccxt.async_support as ccxt_async  # type: ignore
+
+            creds = {"apiKey": self.env.BINANCE_API_KEY, "secret": self.env.BINANCE_API_SECRET}
+            creds = {k: v for k, v in creds.items() if v}
+            client = ccxt_async.binance(
+                {**creds, "enableRateLimit": True, "timeout": timeout_ms, "options": {"defaultType": "spot"}}
+            )
+        self.client = client
+
+    async def _with_retries(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        delay = self._retry.base_delay
+        last_err: Optional[Exception] = None
+        for attempt in range(1, self._retry.tries + 1):
+            try:
+                return await func()
+            except RetryableCcxtErrors as e:  # type: ignore[misc]
+                last_err = e
+                if attempt == self._retry.tries:
+                    break
+                logger.warning(
+                    f"Transient exchange error (attempt {attempt}/{self._retry.tries}): {e}. Retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(min(delay, self._retry.max_delay))
+                delay = min(delay * 2, self._retry.max_delay)
+            except ExchangeError:
+                raise
+            except ccxt.BaseError as e:  # non-retryable ccxt error
+                raise ExchangeError(str(e)) from e
+            except Exception as e:  # any other error
+                raise ExchangeError(str(e)) from e
+        assert last_err is not None
+        raise ExchangeError(str(last_err)) from last_err
+
+    def _check_symbol_allowed(self, symbol: str) -> None:
+        if symbol not in self.symbols_whitelist:
+            raise ExchangeError(f"Symbol {symbol} not in whitelist")
+
+    async def get_price(self, symbol: str) -> float:
+        self._check_symbol_allowed(symbol)
+
+        async def _op():
+            t = await self.client.fetch_ticker(symbol)
+            price = t.get("last") or t.get("close") or t.get("info", {}).get("lastPrice")
+            if price is None:
+                raise ExchangeError("No price in ticker response")
+            return float(price)
+
+        return float(await self._with_retries(_op))
+
+    async def fetch_ohlcv(
+        self, symbol: str, timeframe: str, limit: int = 500, since: Optional[int] = None
+    ) -> list[list[Any]]:
+        self._check_symbol_allowed(symbol)
+
+        async def _op():
+            if since is not None:
+                candles = await self.client.fetch_ohlcv(symbol, timeframe=timeframe, since=int(since), limit=limit)
+            else:
+                candles = await self.client.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+            if not isinstance(candles, list):
+                raise ExchangeError("OHLCV response malformed")
+            return candles
+
+        return await self._with_retries(_op)
+
+    async def fetch_ohlcv_many(
+        self, symbols: Iterable[str], timeframe: str, limit: int = 500, *, concurrency: int = 8
+    ) -> Dict[str, list[list[Any]]]:
+        """Candles for every symbol, at most `concurrency` requests in flight."""
+        symbols = list(symbols)
+        sem = asyncio.Semaphore(max(1, int(concurrency)))
+
+        async def _one(symbol: str):
+            async with sem:
+                return await self.fetch_ohlcv(symbol, timeframe, limit=limit)
+
+        results = await asyncio.gather(*(_one(s) for s in symbols))
+        return dict(zip(symbols, results))
+
+    async def close(self) -> None:
+        closer = getattr(self.client, "close", None)
+        if closer is not None:
+            await closer()
+
+    async def __aenter__(self) -> "AsyncExchange":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+
+class ConcurrentFetcher:
+    """Blocking facade for the sync runner loops: runs `AsyncExchange.fetch_ohlcv_many`
+    on a private event loop that lives as long as the fetcher (one client session)."""
+
+    def __init__(self, aex: AsyncExchange, concurrency: int = 8) -> None:
+        self.aex = aex
+        self.concurrency = max(1, int(concurrency))
+        self._loop = asyncio.new_event_loop()
+
+    def fetch_many(self, symbols: Iterable[str], timeframe: str, limit: int = 500) -> Dict[str, list[list[Any]]]:
+        return self._loop.run_until_complete(
+            self.aex.fetch_ohlcv_many(symbols, timeframe, limit, concurrency=self.concurrency)
+        )
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        try:
+            self._loop.run_until_complete(self.aex.close())
+        finally:
+            self._loop.close()
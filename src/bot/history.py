@@ -0,0 +1,173 @@
+"""Local on-disk OHLCV history with memory-mapped reads and append-only sync.
+
+Each (symbol, timeframe) pair is one flat binary file of fixed-width records
+(int64 timestamp in ms followed by float64 open/high/low/close/volume):
+
+    data/history/BTC_USDT/1h.ohlcv
+
+`HistoryStore.open` maps the file read-only with zero copy; `sync` appends only
+CLOSED candles newer than the last stored timestamp.
+"""
+from __future__ import annotations
+
+import math
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+OHLCV_DTYPE = np.dtype(
+    [
+        ("timestamp", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8"),
+    ]
+)
+
+DEFAULT_ROOT = Path("data/history")
+
+_TF_UNITS_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """Duration of a ccxt-style timeframe string ("1m", "4h", "1d") in milliseconds."""
+    tf = str(timeframe).strip()
+    unit = tf[-1]
+    if unit not in _TF_UNITS_MS or not tf[:-1].isdigit():
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(tf[:-1]) * _TF_UNITS_MS[unit]
+
+
+def to_records(candles: Iterable[Sequence[Any]]) -> np.ndarray:
+    """Convert ccxt-style rows (or OHLCV_DTYPE records) to a structured array sorted and
+    de-duplicated by timestamp."""
+    if isinstance(candles, np.ndarray) and candles.dtype == OHLCV_DTYPE:
+        arr = candles
+    else:
+        rows = [tuple(c[:6]) for c in candles]
+        arr = np.array([(int(r[0]),) + tuple(float(x) for x in r[1:6]) for r in rows], dtype=OHLCV_DTYPE)
+    if not len(arr):
+        return np.zeros(0, dtype=OHLCV_DTYPE)
+    # Keep the last occurrence of each timestamp (later pages win)
+    order = np.argsort(arr["timestamp"], kind="stable")
+    arr = arr[order]
+    keep = np.ones(len(arr), dtype=bool)
+    keep[:-1] = arr["timestamp"][1:] != arr["timestamp"][:-1]
+    return arr[keep]
+
+
+class HistoryStore:
+    """Per-(symbol, timeframe) fixed-width candle files under one root directory."""
+
+    def __init__(self, root: Path = DEFAULT_ROOT) -> None:
+        self.root = Path(root)
+
+    def path(self, symbol: str, timeframe: str) -> Path:
+        return self.root / symbol.replace("/", "_") / f"{timeframe}.ohlcv"
+
+    def count(self, symbol: str, timeframe: str) -> int:
+        p = self.path(symbol, timeframe)
+        return p.stat().st_size // OHLCV_DTYPE.itemsize if p.exists() else 0
+
+    def open(self, symbol: str, timeframe: str) -> np.ndarray:
+        """Memory-map the stored candles read-only (structured array, zero copy)."""
+        n = self.count(symbol, timeframe)
+        if n == 0:
+            return np.zeros(0, dtype=OHLCV_DTYPE)
+        # A torn trailing record from an interrupted write is ignored via shape
+        return np.memmap(self.path(symbol, timeframe), dtype=OHLCV_DTYPE, mode="r", shape=(n,))
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        arr = self.open(symbol, timeframe)
+        return int(arr["timestamp"][-1]) if len(arr) else None
+
+    def frame(self, symbol: str, timeframe: str, since: Optional[int] = None) -> pd.DataFrame:
+        """Candles as a DataFrame (ccxt column names), optionally from `since` (ms)."""
+        arr = self.open(symbol, timeframe)
+        if since is not None and len(arr):
+            arr = arr[int(np.searchsorted(arr["timestamp"], since, side="left")):]
+        return pd.DataFrame({name: arr[name] for name in OHLCV_DTYPE.names})
+
+    def append(self, symbol: str, timeframe: str, candles: Iterable[Sequence[Any]]) -> int:
+        """Append candles newer than the last stored timestamp; returns rows written."""
+        recs = to_records(candles)
+        last = self.last_timestamp(symbol, timeframe)
+        if last is not None:
+            recs = recs[recs["timestamp"] > last]
+        if not len(recs):
+            return 0
+        p = self.path(symbol, timeframe)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        n_valid = self.count(symbol, timeframe)
+        with p.open("ab") as f:
+            # Drop a torn trailing record before appending
+            f.truncate(n_valid * OHLCV_DTYPE.itemsize)
+            f.write(recs.tobytes())
+        return int(len(recs))
+
+    def sync(
+        self,
+        exchange: Any,
+        symbol: str,
+        timeframe: str,
+        *,
+        max_limit: int = 1000,
+        now_ms: Optional[int] = None,
+    ) -> int:
+        """Fetch and append closed candles newer than the last stored one.
+
+        The request limit is sized from the gap since the last stored candle, so a
+        store that is up to date costs a request of only a couple of bars. A gap of
+        more than `max_limit` bars is fetched forward in pages from the last stored
+        candle, so nothing is skipped. The candle that is still forming is never
+        stored.
+        """
+        last = self.last_timestamp(symbol, timeframe)
+        if last is None:
+            candles = exchange.fetch_ohlcv(symbol, timeframe, limit=max_limit)
+            if not candles:
+                return 0
+            return self.append(symbol, timeframe, sorted(candles, key=lambda c: c[0])[:-1])
+        tf_ms = timeframe_to_ms(timeframe)
+        now_ms = int(time.time() * 1000) if now_ms is None else int(now_ms)
+        gap = math.ceil(max(0, now_ms - last) / tf_ms)
+        if gap + 2 <= max_limit:
+            candles = exchange.fetch_ohlcv(symbol, timeframe, limit=int(gap + 2))
+            if not candles:
+                return 0
+            return self.append(symbol, timeframe, sorted(candles, key=lambda c: c[0])[:-1])
+
+        written = 0
+        since = last + tf_ms
+        while since + tf_ms <= now_ms:
+            page = exchange.fetch_ohlcv(symbol, timeframe, limit=max_limit, since=since)
+            if not page:
+                break
+            page = sorted(page, key=lambda c: c[0])
+            last_page = len(page) < max_limit
+            # The newest candle of the last page is the forming one
+            closed = [c for c in (page[:-1] if last_page else page) if int(c[0]) + tf_ms <= now_ms]
+            written += self.append(symbol, timeframe, closed)
+            newest = int(page[-1][0])
+            if last_page or newest + tf_ms <= since:
+                break
+            since = newest + tf_ms
+        return written
+
+
+def history_loader(store: HistoryStore) -> Callable[[str, str, int], pd.DataFrame]:
+    """`data_loader` for run_backtest/run_ab reading the last `years` from the store."""
+
+    def _load(symbol: str, timeframe: str, years: int) -> pd.DataFrame:
+        last = store.last_timestamp(symbol, timeframe)
+        if last is None:
+            raise FileNotFoundError(f"No stored history for {symbol} {timeframe} under {store.root}")
+        since = last - int(years) * 365 * 86_400_000
+        return store.frame(symbol, timeframe, since=since)
+
+    return _load
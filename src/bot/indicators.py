@@ -0,0 +1,337 @@
+"""Streaming indicator state for incremental, candle-by-candle updates.
+
+Each state object consumes one CLOSED candle at a time in O(1) and reproduces the
+values of the batch helpers in `bot.strategy` (`_ema`, `_rsi`, ADX and the volume
+SMA in `calculate_indicators`) when fed the same series from its first row. States
+can be warmed up from history and round-tripped through plain dicts for storage.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from .config import AppConfig
+
+
+def _div(num: float, den: float) -> float:
+    """IEEE-style division matching pandas/numpy (x/0 -> +-inf, 0/0 -> NaN)."""
+    try:
+        return num / den
+    except ZeroDivisionError:
+        if num != num or num == 0.0:
+            return float("nan")
+        return math.copysign(float("inf"), num) * math.copysign(1.0, den)
+
+
+class EwmState:
+    """Exponentially weighted mean with `adjust=False`, mirroring pandas' recursion.
+
+    NaN inputs are skipped (ignore_na=False semantics: they still decay the weight
+    of the previous value, which for adjust=False has no effect on the result).
+    Output is NaN until `min_periods` non-NaN observations have been seen.
+    """
+
+    def __init__(self, alpha: float, min_periods: int = 0) -> None:
+        self.alpha = float(alpha)
+        self.min_periods = int(min_periods)
+        self.mean = float("nan")
+        self.nobs = 0
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if x == x:
+            self.nobs += 1
+            if self.mean != self.mean:
+                self.mean = x
+            elif self.mean != x:
+                old_wt = 1.0 - self.alpha
+                new_wt = self.alpha
+                self.mean = (old_wt * self.mean + new_wt * x) / (old_wt + new_wt)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.mean if self.nobs >= max(self.min_periods, 1) else float("nan")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"alpha": self.alpha, "min_periods": self.min_periods, "mean": self.mean, "nobs": self.nobs}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "EwmState":
+        st = cls(d["alpha"], d["min_periods"])
+        st.mean = float(d["mean"])
+        st.nobs = int(d["nobs"])
+        return st
+
+
+class EmaState(EwmState):
+    """EMA by span, equivalent to `series.ewm(span=span, adjust=False).mean()`."""
+
+    def __init__(self, span: int) -> None:
+        com = (float(span) - 1.0) / 2.0
+        super().__init__(1.0 / (1.0 + com))
+        self.span = int(span)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**super().to_dict(), "span": self.span}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "EmaState":
+        st = cls(d["span"])
+        st.mean = float(d["mean"])
+        st.nobs = int(d["nobs"])
+        return st
+
+
+def _wilder(period: int) -> EwmState:
+    return EwmState(1.0 / period, min_periods=period)
+
+
+class RsiState:
+    """Wilder RSI on closes, matching `bot.strategy._rsi`."""
+
+    def __init__(self, period: int) -> None:
+        self.period = int(period)
+        self.prev_close: Optional[float] = None
+        self.up = _wilder(self.period)
+        self.down = _wilder(self.period)
+
+    def update(self, close: float) -> float:
+        close = float(close)
+        if self.prev_close is not None:
+            delta = close - self.prev_close
+            self.up.update(max(delta, 0.0))
+            self.down.update(-min(delta, 0.0))
+        self.prev_close = close
+        return self.value
+
+    @property
+    def value(self) -> float:
+        rs = _div(self.up.value, self.down.value)
+        if rs != rs:
+            return float("nan")
+        return 100.0 - _div(100.0, 1.0 + rs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"period": self.period, "prev_close": self.prev_close, "up": self.up.to_dict(), "down": self.down.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "RsiState":
+        st = cls(d["period"])
+        st.prev_close = d["prev_close"]
+        st.up = EwmState.from_dict(d["up"])
+        st.down = EwmState.from_dict(d["down"])
+        return st
+
+
+class AdxState:
+    """Wilder ADX matching the ADX block of `calculate_indicators`."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.period = int(period)
+        self.prev_high: Optional[float] = None
+        self.prev_low: Optional[float] = None
+        self.prev_close: Optional[float] = None
+        self.atr = _wilder(self.period)
+        self.plus = _wilder(self.period)
+        self.minus = _wilder(self.period)
+        self.adx = _wilder(self.period)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        high, low, close = float(high), float(low), float(close)
+        if self.prev_close is None:
+            tr = max(0.0, high - low)
+        else:
+            tr = max(max(abs(high - self.prev_close), abs(low - self.prev_close)), high - low)
+        self.atr.update(tr)
+        if self.prev_high is not None and self.prev_low is not None:
+            up_move = high - self.prev_high
+            down_move = -(low - self.prev_low)
+            plus_dm = 0.0 if (up_move <= down_move or up_move <= 0) else up_move
+            minus_dm = 0.0 if (down_move <= up_move or down_move <= 0) else down_move
+            self.plus.update(plus_dm)
+            self.minus.update(minus_dm)
+        atr = self.atr.value
+        plus_di = 100 * _div(self.plus.value, atr)
+        minus_di = 100 * _div(self.minus.value, atr)
+        dx = _div(100 * abs(plus_di - minus_di), plus_di + minus_di)
+        self.adx.update(0.0 if dx != dx else dx)
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.adx.value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "period": self.period,
+            "prev": [self.prev_high, self.prev_low, self.prev_close],
+            "atr": self.atr.to_dict(),
+            "plus": self.plus.to_dict(),
+            "minus": self.minus.to_dict(),
+            "adx": self.adx.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "AdxState":
+        st = cls(d["period"])
+        st.prev_high, st.prev_low, st.prev_close = d["prev"]
+        for name in ("atr", "plus", "minus", "adx"):
+            setattr(st, name, EwmState.from_dict(d[name]))
+        return st
+
+
+class SmaState:
+    """Rolling mean over a fixed window with compensated running sums.
+
+    Matches `series.rolling(period, min_periods=period).mean()` for finite inputs, up to
+    floating-point rounding of the running sum.
+    """
+
+    def __init__(self, period: int) -> None:
+        self.period = int(period)
+        self.window: deque = deque(maxlen=self.period)
+        self._sum = 0.0
+        self._comp = 0.0
+
+    def _add(self, x: float) -> None:
+        y = x - self._comp
+        t = self._sum + y
+        self._comp = t - self._sum - y
+        self._sum = t
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if len(self.window) == self.period:
+            self._add(-self.window[0])
+        self.window.append(x)
+        self._add(x)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if len(self.window) < self.period:
+            return float("nan")
+        return self._sum / float(self.period)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"period": self.period, "window": list(self.window), "sum": self._sum, "comp": self._comp}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "SmaState":
+        st = cls(d["period"])
+        st.window.extend(float(x) for x in d["window"])
+        st._sum = float(d["sum"])
+        st._comp = float(d["comp"])
+        return st
+
+
+class IndicatorState:
+    """Bundle of the strategy indicators for one symbol, driven by closed candles.
+
+    Candles are ccxt-style rows: [timestamp, open, high, low, close, volume].
+    `values()` returns the same column names as `calculate_indicators`.
+    """
+
+    def __init__(self, cfg: AppConfig) -> None:
+        self.ema_fast = EmaState(cfg.ema_fast)
+        self.ema_slow = EmaState(cfg.ema_slow)
+        self.rsi = RsiState(cfg.rsi_period)
+        self.adx: Optional[AdxState] = None
+        self.vol_sma: Optional[SmaState] = None
+        if getattr(cfg, "enable_adx", False):
+            self.adx = AdxState(int(getattr(cfg, "adx_period", 14)))
+        if getattr(cfg, "enable_vol_filter", False):
+            self.vol_sma = SmaState(int(getattr(cfg, "vol_sma_period", 20)))
+        self.last_ts: Optional[float] = None
+        self.prev_close: Optional[float] = None
+        self.close: Optional[float] = None
+        self.volume: Optional[float] = None
+        self.n_bars = 0
+
+    @property
+    def columns(self) -> List[str]:
+        cols = ["ema_fast", "ema_slow", "rsi"]
+        if self.adx is not None:
+            cols.append("adx")
+        if self.vol_sma is not None:
+            cols.append("vol_sma")
+        return cols
+
+    def update(self, candle: Sequence[float]) -> Dict[str, float]:
+        ts, _open, high, low, close, volume = candle[:6]
+        self.ema_fast.update(close)
+        self.ema_slow.update(close)
+        self.rsi.update(close)
+        if self.adx is not None:
+            self.adx.update(high, low, close)
+        if self.vol_sma is not None:
+            self.vol_sma.update(volume)
+        self.last_ts = ts
+        self.prev_close = self.close
+        self.close = float(close)
+        self.volume = float(volume)
+        self.n_bars += 1
+        return self.values()
+
+    def values(self) -> Dict[str, float]:
+        out = {
+            "ema_fast": self.ema_fast.value,
+            "ema_slow": self.ema_slow.value,
+            "rsi": self.rsi.value,
+        }
+        if self.adx is not None:
+            out["adx"] = self.adx.value
+        if self.vol_sma is not None:
+            out["vol_sma"] = self.vol_sma.value
+        return out
+
+    def warmup(self, candles: Any) -> "IndicatorState":
+        """Feed historical closed candles (DataFrame or iterable of rows) in order."""
+        if isinstance(candles, pd.DataFrame):
+            df = candles
+            if "timestamp" not in df.columns:
+                df = df.assign(timestamp=range(len(df)))
+            rows = df[["timestamp", "open", "high", "low", "close", "volume"]].itertuples(index=False)
+        else:
+            rows = candles
+        for row in rows:
+            self.update(tuple(row))
+        return self
+
+    @classmethod
+    def from_history(cls, candles: Any, cfg: AppConfig) -> "IndicatorState":
+        return cls(cfg).warmup(candles)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ema_fast": self.ema_fast.to_dict(),
+            "ema_slow": self.ema_slow.to_dict(),
+            "rsi": self.rsi.to_dict(),
+            "adx": self.adx.to_dict() if self.adx is not None else None,
+            "vol_sma": self.vol_sma.to_dict() if self.vol_sma is not None else None,
+            "last_ts": self.last_ts,
+            "prev_close": self.prev_close,
+            "close": self.close,
+            "volume": self.volume,
+            "n_bars": self.n_bars,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "IndicatorState":
+        st = cls.__new__(cls)
+        st.ema_fast = EmaState.from_dict(d["ema_fast"])
+        st.ema_slow = EmaState.from_dict(d["ema_slow"])
+        st.rsi = RsiState.from_dict(d["rsi"])
+        st.adx = AdxState.from_dict(d["adx"]) if d.get("adx") else None
+        st.vol_sma = SmaState.from_dict(d["vol_sma"]) if d.get("vol_sma") else None
+        st.last_ts = d.get("last_ts")
+        st.prev_close = d.get("prev_close")
+        st.close = d.get("close")
+        st.volume = d.get("volume")
+        st.n_bars = int(d.get("n_bars", 0))
+        return st
@@ -1,7 +1,10 @@
 """Performance metrics for backtests."""
-from typing import List, Sequence
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Union
 
-from .paper import Trade
+import numpy as np
+
+from .paper import Trade, TradeLog
 
 
 def sharpe(returns: Sequence[float], periods_per_year: float = 252.0, rf: float = 0.0) -> float:
@@ -11,8 +14,11 @@ def sharpe(returns: Sequence[float], periods_per_year: float = 252.0, rf: float
     - annualizes by sqrt(periods_per_year)
     """
     try:
-        import numpy as np
-        r = np.asarray(list(returns), dtype=float)
+        # Arrays and sequences are used as-is; only iterators are materialized
+        if hasattr(returns, "__len__"):
+            r = np.asarray(returns, dtype=float)
+        else:
+            r = np.fromiter(returns, dtype=float)
         if r.size == 0:
             return 0.0
         # excess returns
@@ -53,23 +59,47 @@ def max_drawdown(equity: List[float]) -> float:
     return float(abs(max_dd))
 
 
-def winrate(trades: List[Trade]) -> float:
-    if not trades:
+def _log_pnl(trades) -> Optional[np.ndarray]:
+    """PnL column when `trades` is a columnar `TradeLog`, else None."""
+    return trades.pnl if isinstance(trades, TradeLog) else None
+
+
+def _seq_sum(values: Iterable[float]) -> float:
+    # Plain left-to-right addition, the order np.bincount and OnlineMetrics use.
+    # Builtin sum() compensates rounding on Python >= 3.12, so it is not used here.
+    if isinstance(values, np.ndarray):
+        values = values.tolist()
+    total = 0.0
+    for v in values:
+        total += v
+    return float(total)
+
+
+def winrate(trades: Union[List[Trade], TradeLog]) -> float:
+    if not len(trades):
         return 0.0
+    p = _log_pnl(trades)
+    if p is not None:
+        return float((p > 0.0).sum()) / float(len(p))
     wins = sum(1 for t in trades if (t.pnl or 0.0) > 0.0)
     return float(wins) / float(len(trades))
 
 
-def profit_factor(trades: List[Trade]) -> float:
+def profit_factor(trades: Union[List[Trade], TradeLog]) -> float:
     """Gross profit / gross loss with robust edge cases.
 
     - No losses but some profit -> large finite PF (e.g., 1e9)
     - No profits and no losses -> NaN
     """
-    if not trades:
+    if not len(trades):
         return 0.0
-    profits = sum((t.pnl or 0.0) for t in trades if (t.pnl or 0.0) > 0.0)
-    losses = -sum((t.pnl or 0.0) for t in trades if (t.pnl or 0.0) < 0.0)
+    p = _log_pnl(trades)
+    if p is not None:
+        profits = _seq_sum(p[p > 0.0])
+        losses = -_seq_sum(p[p < 0.0])
+    else:
+        profits = _seq_sum((t.pnl or 0.0) for t in trades if (t.pnl or 0.0) > 0.0)
+        losses = -_seq_sum((t.pnl or 0.0) for t in trades if (t.pnl or 0.0) < 0.0)
     if losses == 0:
         if profits > 0:
             return 1e9
@@ -77,15 +107,266 @@ def profit_factor(trades: List[Trade]) -> float:
     return float(profits) / float(losses)
 
 
-def expectancy(trades: List[Trade]) -> float:
-    if not trades:
+def expectancy(trades: Union[List[Trade], TradeLog]) -> float:
+    if not len(trades):
         return 0.0
-    return float(sum((t.pnl or 0.0) for t in trades)) / float(len(trades))
+    p = _log_pnl(trades)
+    if p is not None:
+        return _seq_sum(p) / float(len(p))
+    return _seq_sum((t.pnl or 0.0) for t in trades) / float(len(trades))
 
 
-def avg_trade(trades: List[Trade]) -> float:
-    if not trades:
+def avg_trade(trades: Union[List[Trade], TradeLog]) -> float:
+    if not len(trades):
         return 0.0
-    return float(
-        sum(abs(t.pnl or 0.0) for t in trades) / float(len(trades))
-    )
+    p = _log_pnl(trades)
+    if p is not None:
+        return _seq_sum(abs(p)) / float(len(p))
+    return _seq_sum(abs(t.pnl or 0.0) for t in trades) / float(len(trades))
+
+
+# ---------- vectorized metrics over many combos ----------
+# Each function takes a (combos x bars) equity matrix or columnar trade arrays and
+# returns one value per combo, equal to the scalar function above for that combo.
+
+
+def _as_matrix(equity) -> np.ndarray:
+    eq = np.asarray(equity, dtype=float)
+    if eq.ndim == 1:
+        eq = eq[None, :]
+    if eq.ndim != 2:
+        raise ValueError("equity must be a (combos x bars) matrix")
+    return eq
+
+
+def max_drawdown_batch(equity) -> np.ndarray:
+    """`max_drawdown` for every row of a (combos x bars) equity matrix."""
+    eq = _as_matrix(equity)
+    if eq.shape[1] == 0:
+        return np.zeros(eq.shape[0])
+    peak = np.maximum.accumulate(eq, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd = np.where(peak > 0, (eq - peak) / np.where(peak > 0, peak, 1.0), 0.0)
+    return np.abs(np.minimum(dd.min(axis=1), 0.0))
+
+
+def cagr_batch(equity, years: float) -> np.ndarray:
+    """`cagr` for every row; only the first and last column are read."""
+    eq = _as_matrix(equity)
+    out = np.zeros(eq.shape[0])
+    if eq.shape[1] == 0 or years <= 0:
+        return out
+    start, end = eq[:, 0], eq[:, -1]
+    ok = start > 0
+    # Python's pow per combo (O(combos)): np.power may differ from it in the last ulp
+    e = 1.0 / years
+    out[ok] = [float(x) ** e - 1.0 for x in (end[ok] / start[ok])]
+    return out
+
+
+def returns_batch(equity) -> np.ndarray:
+    """Per-bar simple returns of every row (pct_change without the leading NaN)."""
+    eq = _as_matrix(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return eq[:, 1:] / eq[:, :-1] - 1.0
+
+
+def sharpe_batch(returns, periods_per_year: float = 252.0, rf: float = 0.0) -> np.ndarray:
+    """`sharpe` for every row of a (combos x bars) returns matrix.
+
+    Rows containing NaN (which `sharpe` callers drop first) are computed one by one.
+    """
+    r = _as_matrix(returns)
+    m, n = r.shape
+    out = np.zeros(m)
+    if n == 0:
+        return out
+    ex = r - float(rf) / float(periods_per_year)
+    has_nan = np.isnan(ex).any(axis=1)
+    dense = ~has_nan
+    if dense.any():
+        x = ex[dense]
+        with np.errstate(invalid="ignore"):
+            mu = x.mean(axis=1)
+            std = x.std(axis=1, ddof=1 if n > 1 else 0)
+            val = mu / std * (float(periods_per_year) ** 0.5)
+        out[dense] = np.where((std == 0) | np.isnan(std), 0.0, val)
+    for i in np.flatnonzero(has_nan):
+        row = r[i]
+        out[i] = sharpe(row[~np.isnan(row)], periods_per_year, rf)
+    return out
+
+
+def trade_metrics_batch(pnl, combo, n_combos: int) -> Dict[str, np.ndarray]:
+    """winrate, pf, expectancy, avg_trade and n_trades for columnar trades.
+
+    `pnl[i]` is the PnL of trade i and `combo[i]` its combo index; each combo's
+    trades must appear in close order. Sums are accumulated in input order
+    (np.bincount), as `_seq_sum` does for the scalar functions, so results are
+    equal to them exactly.
+    """
+    pnl = np.asarray(pnl, dtype=float)
+    combo = np.asarray(combo, dtype=np.int64)
+    counts = np.bincount(combo, minlength=n_combos).astype(float)
+    total = np.bincount(combo, weights=pnl, minlength=n_combos)
+    wins = np.bincount(combo, weights=(pnl > 0.0).astype(float), minlength=n_combos)
+    profits = np.bincount(combo, weights=np.where(pnl > 0.0, pnl, 0.0), minlength=n_combos)
+    losses = -np.bincount(combo, weights=np.where(pnl < 0.0, pnl, 0.0), minlength=n_combos)
+    abs_total = np.bincount(combo, weights=np.abs(pnl), minlength=n_combos)
+
+    has = counts > 0
+    safe = np.where(has, counts, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pf = np.where(losses == 0, np.where(profits > 0, 1e9, np.nan), profits / np.where(losses == 0, 1.0, losses))
+    return {
+        "winrate": np.where(has, wins / safe, 0.0),
+        "pf": np.where(has, pf, 0.0),
+        "expectancy": np.where(has, total / safe, 0.0),
+        "avg_trade": np.where(has, abs_total / safe, 0.0),
+        "n_trades": counts.astype(np.int64),
+    }
+
+
+def batch_metrics(
+    equity,
+    pnl,
+    combo,
+    *,
+    years: float,
+    periods_per_year: float = 252.0,
+) -> Dict[str, np.ndarray]:
+    """All backtest metrics for a sweep in one pass, keyed like the result columns."""
+    eq = _as_matrix(equity)
+    return {
+        "cagr": cagr_batch(eq, years),
+        "max_dd": max_drawdown_batch(eq),
+        **trade_metrics_batch(pnl, combo, eq.shape[0]),
+        "sharpe": sharpe_batch(returns_batch(eq), periods_per_year),
+    }
+
+
+class OnlineMetrics:
+    """O(1)-memory accumulator for the metrics above.
+
+    Feed it every equity value (`update_equity`, or `update_equity_flat` for a run
+    of identical values) and every closed trade's PnL (`update_trade`). `result`
+    returns the same keys and values as the batch functions: drawdown and the
+    trade metrics are bit-identical (trade PnLs are running sums, the same
+    left-to-right order as `_seq_sum`), while Sharpe uses Welford mean/variance
+    and agrees to floating-point rounding.
+    """
+
+    def __init__(self) -> None:
+        # Equity / returns
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+        self.peak = 0.0
+        self._max_dd = 0.0
+        self.n_returns = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        # Trades
+        self.n_trades = 0
+        self.wins = 0
+        self.gross_profit = 0.0
+        self._gross_loss = 0.0  # sum of negative PnLs
+        self.total_pnl = 0.0
+        self._abs_pnl = 0.0
+
+    # ---- equity ----
+    def _add_return(self, r: float) -> None:
+        if r != r:  # NaN is dropped, like pct_change().dropna()
+            return
+        self.n_returns += 1
+        delta = r - self._mean
+        self._mean += delta / self.n_returns
+        self._m2 += delta * (r - self._mean)
+
+    def update_equity(self, value: float) -> None:
+        x = float(value)
+        if self.first is None:
+            self.first = x
+            self.peak = x
+        else:
+            prev = self.last
+            if prev != 0:
+                self._add_return(x / prev - 1.0)
+            elif x != 0:
+                self._add_return(math.copysign(math.inf, x))
+            else:
+                self._add_return(math.nan)
+            self.peak = max(self.peak, x)
+        if self.peak > 0:
+            dd = (x - self.peak) / self.peak
+            if dd < self._max_dd:
+                self._max_dd = dd
+        self.last = x
+
+    def update_equity_flat(self, value: float, count: int) -> None:
+        """Equivalent to `count` calls of update_equity(value), in O(1)."""
+        if count <= 0:
+            return
+        self.update_equity(value)
+        k = int(count) - 1
+        if k <= 0 or float(value) == 0:
+            # Repeated zeros give 0/0 returns, which are dropped: nothing changes
+            return
+        # k zero returns merged in one step (Chan et al. parallel variance)
+        n = self.n_returns + k
+        delta = -self._mean
+        self._m2 += delta * delta * self.n_returns * k / n
+        self._mean += delta * k / n
+        self.n_returns = n
+
+    # ---- trades ----
+    def update_trade(self, pnl: Optional[float]) -> None:
+        p = pnl or 0.0
+        self.n_trades += 1
+        self.total_pnl += p
+        self._abs_pnl += abs(p)
+        if p > 0.0:
+            self.wins += 1
+            self.gross_profit += p
+        elif p < 0.0:
+            self._gross_loss += p
+
+    # ---- results ----
+    @property
+    def max_dd(self) -> float:
+        return float(abs(self._max_dd))
+
+    def sharpe(self, periods_per_year: float = 252.0, rf: float = 0.0) -> float:
+        if self.n_returns == 0:
+            return 0.0
+        mu = self._mean - float(rf) / float(periods_per_year)
+        ddof = 1 if self.n_returns > 1 else 0
+        var = self._m2 / (self.n_returns - ddof)
+        std = math.sqrt(var) if var > 0 else 0.0
+        if std == 0 or not (std == std):
+            return 0.0
+        return float(mu / std * (float(periods_per_year) ** 0.5))
+
+    def cagr(self, years: float) -> float:
+        if self.first is None or years <= 0 or self.first <= 0:
+            return 0.0
+        return float((self.last / self.first) ** (1.0 / years) - 1.0)
+
+    def result(self, years: float, periods_per_year: float = 252.0) -> Dict[str, float]:
+        """Metrics dict keyed like the backtest result columns."""
+        n = self.n_trades
+        if n == 0:
+            pf = 0.0
+        elif self._gross_loss == 0:
+            pf = 1e9 if self.gross_profit > 0 else float("nan")
+        else:
+            pf = float(self.gross_profit) / float(-self._gross_loss)
+        return {
+            "cagr": self.cagr(years),
+            "max_dd": self.max_dd,
+            "winrate": float(self.wins) / float(n) if n else 0.0,
+            "pf": pf,
+            "expectancy": float(self.total_pnl) / float(n) if n else 0.0,
+            "avg_trade": float(self._abs_pnl / float(n)) if n else 0.0,
+            "sharpe": self.sharpe(periods_per_year),
+            "n_trades": n,
+        }
@@ -2,20 +2,42 @@
 
 CLI:
   python -m bot.optimize --results data/artifacts/backtest_results.csv
+  python -m bot.optimize --results data/artifacts/results
+  python -m bot.optimize --search --budget 200 --batch 8 --jobs 8
+  python -m bot.optimize --walk-forward --grid grid.yaml --folds 6 --jobs 6
   python -m bot.optimize --ab
 """
 from __future__ import annotations
 
 import argparse
+import itertools
+import math
 from pathlib import Path
 from statistics import median
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import yaml
+from loguru import logger
 
 from .config import AppConfig
-from .backtest import run_backtest
+from .backtest import (
+    TF_PERIODS_PER_YEAR,
+    _attach_frame,
+    _default_loader,
+    _equity_finalizer,
+    _evaluate,
+    _share_frame,
+    _simulate_combo,
+    _store_run,
+    run_backtest,
+)
+from .cache import dataset_fingerprint
+from .history import HistoryStore, history_loader
+from .metrics import cagr, max_drawdown, sharpe
+from .results import completed_rows, next_run_id, read_results
+from .tpe import Param, TPESampler
 
 
 PARAM_KEYS = [
@@ -28,6 +50,17 @@ PARAM_KEYS = [
     "risk_rr",
 ]
 
+# Typed bounds for the model-based search over PARAM_KEYS
+SEARCH_SPACE = [
+    Param("ema_fast", 5, 100, "int"),
+    Param("ema_slow", 20, 300, "int"),
+    Param("rsi_period", 5, 30, "int"),
+    Param("rsi_buy_min", 20, 60, "int"),
+    Param("rsi_buy_max", 45, 85, "int"),
+    Param("atr_k", 0.5, 3.0),
+    Param("risk_rr", 1.0, 4.0),
+]
+
 
 def _top_quartile(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
@@ -79,25 +112,303 @@ def write_yaml(path: Path, obj: Dict[str, Any]) -> None:
         yaml.safe_dump(obj, f, sort_keys=True)
 
 
-def optimize_from_csv(csv_path: Path, out_path: Path, *, pf_min: float = 1.0, cagr_min: float = 0.0, max_dd_max: float = 0.40, ntrades_min: int = 50) -> Dict[str, Any]:
-    df = pd.read_csv(csv_path)
-    # Apply constraints
-    for col in ["pf", "cagr", "max_dd", "n_trades", "sharpe"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-    filt = (
+def _constraint_mask(df: pd.DataFrame, pf_min: float, cagr_min: float, max_dd_max: float, ntrades_min: int) -> pd.Series:
+    return (
         (df.get("pf", 0) > pf_min)
         & (df.get("cagr", 0) > cagr_min)
         & (df.get("max_dd", 1) <= max_dd_max)
         & (df.get("n_trades", 0) >= ntrades_min)
     )
-    df2 = df[filt].copy()
+
+
+def optimize_from_csv(csv_path: Path, out_path: Path, *, pf_min: float = 1.0, cagr_min: float = 0.0, max_dd_max: float = 0.40, ntrades_min: int = 50) -> Dict[str, Any]:
+    # Accepts either the legacy CSV or the columnar results store directory
+    # Combos pruned by a halving sweep only have partial-history metrics
+    df = completed_rows(read_results(csv_path))
+    # Apply constraints
+    for col in ["pf", "cagr", "max_dd", "n_trades", "sharpe"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    df2 = df[_constraint_mask(df, pf_min, cagr_min, max_dd_max, ntrades_min)].copy()
     top = _top_quartile(df2)
     recs = _recommend_defaults(top)
     write_yaml(out_path, recs)
     return recs
 
 
+def _search_score(rec: Dict[str, Any], pf_min: float, cagr_min: float, max_dd_max: float, ntrades_min: int) -> float:
+    """Sharpe for combos meeting the optimize_from_csv constraints; infeasible ones
+    rank below every feasible one, ordered by how many constraints they break."""
+    def num(key: str) -> float:
+        try:
+            return float(rec.get(key))
+        except (TypeError, ValueError):
+            return float("nan")
+
+    # NaN fails every check, as in the DataFrame filter
+    checks = [num("pf") > pf_min, num("cagr") > cagr_min, num("max_dd") <= max_dd_max, num("n_trades") >= ntrades_min]
+    violated = sum(0 if ok else 1 for ok in checks)
+    sharpe = float(rec.get("sharpe", float("nan")))
+    if not math.isfinite(sharpe):
+        sharpe = -1e3
+    return sharpe - 1e6 * violated
+
+
+def _valid_combo(params: Dict[str, Any]) -> bool:
+    return params["ema_fast"] < params["ema_slow"] and params["rsi_buy_min"] < params["rsi_buy_max"]
+
+
+def search_params(
+    symbol: str,
+    timeframe: str,
+    years: int,
+    cfg: AppConfig,
+    out_path: Path,
+    *,
+    budget: int = 100,
+    batch: int = 8,
+    jobs: int = 1,
+    seed: int = 0,
+    pf_min: float = 1.0,
+    cagr_min: float = 0.0,
+    max_dd_max: float = 0.40,
+    ntrades_min: int = 50,
+    space: List[Param] = SEARCH_SPACE,
+    data_loader=None,
+) -> Dict[str, Any]:
+    """TPE search over `space` with a fixed evaluation budget.
+
+    Each round asks the sampler for `batch` new combos and backtests them together
+    (over `jobs` processes). The objective is Sharpe under the same constraints as
+    `optimize_from_csv`. Every evaluation is written to the results store as one
+    run; the best feasible combo is written to out_path.
+    """
+    df = (data_loader or _default_loader)(symbol, timeframe, years).reset_index(drop=True)
+    fingerprint = dataset_fingerprint(df)
+    periods_per_year = float(TF_PERIODS_PER_YEAR.get(timeframe, 365 * 24))
+    run_id = next_run_id(Path("data/artifacts/results"))
+    limits = dict(pf_min=pf_min, cagr_min=cagr_min, max_dd_max=max_dd_max, ntrades_min=ntrades_min)
+
+    sampler = TPESampler(space, n_startup=max(10, int(batch)), constraint=_valid_combo, seed=seed)
+    finalize = _equity_finalizer(run_id)
+    trials: List[Dict[str, Any]] = []
+    records: List[Dict[str, Any]] = []
+    while len(trials) < int(budget):
+        proposals = sampler.ask(min(int(batch), int(budget) - len(trials)))
+        if not proposals:
+            break
+        recs = _evaluate(df, symbol, years, cfg, proposals, periods_per_year, run_id, jobs, fingerprint, finalize)
+        for params, rec in zip(proposals, recs):
+            sampler.tell(params, _search_score(rec, **limits))
+        trials.extend(proposals)
+        records.extend(recs)
+        best_so_far = max(_search_score(r, **limits) for r in records)
+        logger.info(f"search {len(trials)}/{budget} | best_score={best_so_far:.4f}")
+
+    _store_run(run_id, [p.name for p in space], trials, records, min_trades=int(getattr(cfg, "min_trades", 30)))
+
+    scores = [_search_score(r, **limits) for r in records]
+    feasible = [i for i, sc in enumerate(scores) if sc > -1e5]
+    result: Dict[str, Any] = {"run_id": run_id, "evaluations": len(trials), "params": {}, "metrics": {}}
+    if feasible:
+        best = max(feasible, key=lambda i: scores[i])
+        result["params"] = dict(trials[best])
+        result["metrics"] = {k: records[best][k] for k in ("sharpe", "max_dd", "pf", "cagr", "n_trades")}
+    else:
+        logger.warning("search found no combo meeting the constraints")
+    write_yaml(out_path, result["params"])
+    return result
+
+
+# ---------- walk-forward ----------
+WF_WARMUP = 200
+
+
+def walk_forward_folds(
+    n: int,
+    n_folds: int,
+    *,
+    train_bars: Optional[int] = None,
+    test_bars: Optional[int] = None,
+    anchored: bool = False,
+    warmup: int = WF_WARMUP,
+) -> List[Tuple[int, int, int, int]]:
+    """(train_lo, train_hi, test_lo, test_hi) bar ranges for consecutive folds.
+
+    Test windows are back to back and never overlap. Rolling folds slide a fixed
+    train window in front of each test window; anchored folds always train from
+    the first tradable bar. Defaults split the history so train = 3 x test.
+    """
+    usable = n - warmup
+    if test_bars is None:
+        test_bars = (usable - train_bars) // n_folds if train_bars else usable // (n_folds + 3)
+    if train_bars is None:
+        train_bars = 3 * test_bars
+    if test_bars <= 0 or train_bars <= 0 or warmup + train_bars + n_folds * test_bars > n:
+        raise ValueError(f"Cannot fit {n_folds} folds (train={train_bars}, test={test_bars}) into {n} bars")
+    folds = []
+    for k in range(n_folds):
+        test_lo = warmup + train_bars + k * test_bars
+        train_lo = warmup if anchored else test_lo - train_bars
+        folds.append((train_lo, test_lo, test_lo, test_lo + test_bars))
+    return folds
+
+
+_WF: dict = {}
+
+
+def _init_wf_worker(spec: dict, ctx: Dict[str, Any]) -> None:
+    shm, df = _attach_frame(spec)
+    _WF.update(shm=shm, df=df, **ctx)
+
+
+def _wf_fold_worker(job: Tuple[int, Tuple[int, int, int, int]]) -> Dict[str, Any]:
+    return _wf_fold(_WF["df"], job, **{k: v for k, v in _WF.items() if k not in ("shm", "df")})
+
+
+def _wf_fold(
+    df: pd.DataFrame,
+    job: Tuple[int, Tuple[int, int, int, int]],
+    *,
+    symbol: str,
+    cfg: AppConfig,
+    combos: List[Dict[str, Any]],
+    periods_per_year: float,
+    fingerprint: str,
+    limits: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Pick the best combo on the fold's train window and trade it out of sample."""
+    k, (train_lo, train_hi, test_lo, test_hi) = job
+
+    def years(lo: int, hi: int) -> float:
+        return (hi - lo) / periods_per_year
+
+    best_i, best_score = 0, float("-inf")
+    for i, params in enumerate(combos):
+        rec = _simulate_combo(
+            df, symbol, years(train_lo, train_hi), cfg, params, periods_per_year, 0, fingerprint, window=(train_lo, train_hi)
+        )
+        score = _search_score(rec, **limits)
+        if score > best_score:
+            best_i, best_score = i, score
+    params = combos[best_i]
+    oos = _simulate_combo(
+        df, symbol, years(test_lo, test_hi), cfg, params, periods_per_year, 0, fingerprint, window=(test_lo, test_hi)
+    )
+    return {
+        "fold": k,
+        "train_lo": train_lo,
+        "train_hi": train_hi,
+        "test_lo": test_lo,
+        "test_hi": test_hi,
+        **params,
+        "train_score": best_score,
+        "feasible": best_score > -1e5,
+        **{f"oos_{m}": oos[m] for m in ("sharpe", "max_dd", "pf", "cagr", "n_trades")},
+        "equity": oos["equity"],
+    }
+
+
+def stitch_equity(curves: List[List[float]], start: float = 1000.0) -> np.ndarray:
+    """Chain per-fold equity curves by compounding each fold's returns."""
+    out = [float(start)]
+    for curve in curves:
+        c = np.asarray(curve, dtype=float)
+        if c.size == 0 or c[0] <= 0:
+            continue
+        out.extend((out[-1] * c[1:] / c[0]).tolist())
+    return np.asarray(out)
+
+
+def walk_forward(
+    symbol: str,
+    timeframe: str,
+    years: int,
+    cfg: AppConfig,
+    param_grid: Dict[str, List[Any]],
+    *,
+    n_folds: int = 4,
+    train_bars: Optional[int] = None,
+    test_bars: Optional[int] = None,
+    anchored: bool = False,
+    jobs: int = 1,
+    pf_min: float = 1.0,
+    cagr_min: float = 0.0,
+    max_dd_max: float = 0.40,
+    ntrades_min: int = 50,
+    data_loader=None,
+    out_dir: Path = Path("data/artifacts/walk_forward"),
+) -> Dict[str, Any]:
+    """Walk-forward optimization of `param_grid`, one process per fold.
+
+    Each fold picks the combo with the best constrained Sharpe (the
+    `optimize_from_csv` constraints) on its train window and is then traded on
+    the following test window. Indicators are computed over the full history and
+    cached per process, so folds handled by one worker reuse them. Writes
+    folds.csv (per-fold choices and out-of-sample metrics) and oos_equity.npy
+    (the stitched out-of-sample curve) to out_dir.
+    """
+    df = (data_loader or _default_loader)(symbol, timeframe, years).reset_index(drop=True)
+    keys = list(param_grid.keys())
+    combos = [dict(zip(keys, c)) for c in itertools.product(*[param_grid[k] for k in keys])]
+    folds = walk_forward_folds(len(df), n_folds, train_bars=train_bars, test_bars=test_bars, anchored=anchored)
+    periods_per_year = float(TF_PERIODS_PER_YEAR.get(timeframe, 365 * 24))
+    ctx = dict(
+        symbol=symbol,
+        cfg=cfg,
+        combos=combos,
+        periods_per_year=periods_per_year,
+        fingerprint=dataset_fingerprint(df),
+        limits=dict(pf_min=pf_min, cagr_min=cagr_min, max_dd_max=max_dd_max, ntrades_min=ntrades_min),
+    )
+    jobs_list = list(enumerate(folds))
+
+    if int(jobs) > 1 and len(folds) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        shm, spec = _share_frame(df)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(int(jobs), len(folds)), initializer=_init_wf_worker, initargs=(spec, ctx)
+            ) as pool:
+                fold_rows = list(pool.map(_wf_fold_worker, jobs_list))
+        finally:
+            shm.close()
+            shm.unlink()
+    else:
+        fold_rows = [_wf_fold(df, job, **ctx) for job in jobs_list]
+
+    for row in fold_rows:
+        logger.info(
+            f"walk-forward fold {row['fold']} | train=[{row['train_lo']},{row['train_hi']}) "
+            f"test=[{row['test_lo']},{row['test_hi']}) params={ {k: row[k] for k in keys} } "
+            f"oos_sharpe={row['oos_sharpe']:.3f}"
+        )
+
+    equity = stitch_equity([row.pop("equity") for row in fold_rows])
+    returns = np.diff(equity) / equity[:-1] if equity.size > 1 else np.zeros(0)
+    oos_years = sum(f[3] - f[2] for f in folds) / periods_per_year
+    summary = {
+        "sharpe": sharpe(returns, periods_per_year=periods_per_year),
+        "max_dd": max_drawdown(equity.tolist()),
+        "cagr": cagr(equity.tolist(), oos_years),
+        "final_equity": float(equity[-1]),
+    }
+    folds_df = pd.DataFrame(fold_rows)
+    ts = df["timestamp"].to_numpy() if "timestamp" in df.columns else np.arange(len(df))
+    for col in ("train_lo", "train_hi", "test_lo", "test_hi"):
+        # Bar ranges are half-open; record the timestamps of their first/last bars
+        idx = folds_df[col] - (1 if col.endswith("_hi") else 0)
+        folds_df[col.replace("_lo", "_start").replace("_hi", "_end")] = ts[idx.to_numpy()]
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    folds_df.to_csv(out_dir / "folds.csv", index=False)
+    np.save(out_dir / "oos_equity.npy", equity)
+    logger.info(f"walk-forward done | folds={len(folds)} oos={summary}")
+    return {"folds": folds_df, "equity": equity, "summary": summary}
+
+
 def _ab_variants() -> List[Tuple[str, Dict[str, Any]]]:
     return [
         ("baseline", {"enable_adx": False, "enable_vol_filter": False}),
@@ -124,6 +435,13 @@ def _collect_metrics(results: List[Dict[str, Any]]) -> Dict[str, float]:
 
 
 def run_ab(symbol: str, timeframe: str, years: int, cfg: AppConfig, data_loader=None) -> pd.DataFrame:
+    # Load candles once so every variant runs on the same dataset; the shared
+    # indicator cache then serves EMA/RSI series computed by earlier variants.
+    base_df = (data_loader or _default_loader)(symbol, timeframe, years)
+
+    def shared_loader(_symbol, _timeframe, _years):
+        return base_df
+
     rows = []
     for name, flags in _ab_variants():
         cfg_copy = cfg.copy()
@@ -142,7 +460,7 @@ def run_ab(symbol: str, timeframe: str, years: int, cfg: AppConfig, data_loader=
             years,
             cfg_copy,
             {"ema_fast": [cfg_copy.ema_fast], "ema_slow": [cfg_copy.ema_slow], "rsi_period": [cfg_copy.rsi_period], "rsi_buy_min": [cfg_copy.rsi_buy_min], "rsi_buy_max": [cfg_copy.rsi_buy_max]},
-            data_loader=data_loader,
+            data_loader=shared_loader,
         )
         m = _collect_metrics(results)
         rows.append({"variant": name, **m})
@@ -167,9 +485,21 @@ def main():
     p = argparse.ArgumentParser()
     p.add_argument("--results", type=str, default="")
     p.add_argument("--ab", action="store_true")
+    p.add_argument("--search", action="store_true", help="TPE search over PARAM_KEYS")
+    p.add_argument("--budget", type=int, default=100, help="Backtest evaluations for --search")
+    p.add_argument("--batch", type=int, default=8, help="Combos evaluated per search round")
+    p.add_argument("--jobs", type=int, default=1)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--walk-forward", action="store_true", help="Walk-forward optimization of --grid")
+    p.add_argument("--grid", type=str, default="", help="YAML grid for --walk-forward")
+    p.add_argument("--folds", type=int, default=4)
+    p.add_argument("--train-bars", type=int, default=0)
+    p.add_argument("--test-bars", type=int, default=0)
+    p.add_argument("--anchored", action="store_true", help="Anchored (expanding) instead of rolling train windows")
     p.add_argument("--symbol", type=str, default="BTC/USDT")
     p.add_argument("--timeframe", type=str, default="1h")
     p.add_argument("--years", type=int, default=1)
+    p.add_argument("--history-dir", type=str, default="")
     # Optimizer constraints
     p.add_argument("--pf-min", type=float, default=1.0)
     p.add_argument("--cagr-min", type=float, default=0.0)
@@ -188,8 +518,35 @@ def main():
         rec = optimize_from_csv(csv_path, out, pf_min=args.pf_min, cagr_min=args.cagr_min, max_dd_max=args.max_dd_max, ntrades_min=args.ntrades_min)
         print(f"Wrote {out}: {rec}")
 
+    loader = history_loader(HistoryStore(Path(args.history_dir))) if args.history_dir else None
+
+    if args.search:
+        out = artifacts / "optimized_defaults.yaml"
+        res = search_params(
+            args.symbol, args.timeframe, args.years, cfg, out,
+            budget=args.budget, batch=args.batch, jobs=args.jobs, seed=args.seed,
+            pf_min=args.pf_min, cagr_min=args.cagr_min, max_dd_max=args.max_dd_max, ntrades_min=args.ntrades_min,
+            data_loader=loader,
+        )
+        print(f"Wrote {out}: {res['params']} {res['metrics']}")
+
+    if args.walk_forward:
+        if args.grid:
+            with open(args.grid, "r", encoding="utf-8") as f:
+                grid = yaml.safe_load(f)
+        else:
+            grid = {k: [getattr(cfg, k)] for k in PARAM_KEYS}
+        res = walk_forward(
+            args.symbol, args.timeframe, args.years, cfg, grid,
+            n_folds=args.folds, train_bars=args.train_bars or None, test_bars=args.test_bars or None,
+            anchored=args.anchored, jobs=args.jobs,
+            pf_min=args.pf_min, cagr_min=args.cagr_min, max_dd_max=args.max_dd_max, ntrades_min=args.ntrades_min,
+            data_loader=loader, out_dir=artifacts / "walk_forward",
+        )
+        print(f"Wrote {artifacts / 'walk_forward'}: {res['summary']}")
+
     if args.ab:
-        df = run_ab(args.symbol, args.timeframe, args.years, cfg)
+        df = run_ab(args.symbol, args.timeframe, args.years, cfg, data_loader=loader)
         out_csv = artifacts / "ab_results.csv"
         out_summary = artifacts / "ab_summary.txt"
         save_ab_results(df, out_csv, out_summary)
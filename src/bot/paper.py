@@ -1,8 +1,9 @@
 """Paper trading engine implementation."""
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Union
+from datetime import datetime, timedelta, timezone
 
+import numpy as np
 import pandas as pd
 
 from .config import AppConfig
@@ -22,12 +23,205 @@ class Trade:
     pnl: Optional[float] = None
 
 
+class TradeLog:
+    """Closed trades as a struct of growable NumPy columns.
+
+    One row per closed trade: symbol id (into `symbols`), entry/exit bar index
+    (-1 when unknown), entry/exit timestamps in ms, prices, qty and pnl. Indexing
+    and iteration yield `Trade` objects for existing callers; the metrics
+    functions read the columns directly.
+    """
+
+    _FLOAT = ("entry_price", "stop_price", "take_profit", "qty", "exit_price", "pnl")
+    _INT = ("entry_bar", "exit_bar", "entry_ts", "exit_ts")
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.symbols: List[str] = []
+        self._symbol_ids: Dict[str, int] = {}
+        self._n = 0
+        cap = max(1, int(capacity))
+        self._cols: Dict[str, np.ndarray] = {"symbol_id": np.zeros(cap, dtype=np.int32)}
+        self._cols.update({c: np.zeros(cap, dtype=np.float64) for c in self._FLOAT})
+        self._cols.update({c: np.zeros(cap, dtype=np.int64) for c in self._INT})
+
+    def _grow(self) -> None:
+        for name, col in self._cols.items():
+            bigger = np.zeros(2 * len(col), dtype=col.dtype)
+            bigger[: self._n] = col[: self._n]
+            self._cols[name] = bigger
+
+    def symbol_id(self, symbol: str) -> int:
+        sid = self._symbol_ids.get(symbol)
+        if sid is None:
+            sid = self._symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return sid
+
+    def append(self, trade: "Trade", *, entry_bar: int = -1, exit_bar: int = -1) -> None:
+        if self._n == len(self._cols["pnl"]):
+            self._grow()
+        i = self._n
+        c = self._cols
+        c["symbol_id"][i] = self.symbol_id(trade.symbol)
+        c["entry_price"][i] = trade.entry_price
+        c["stop_price"][i] = trade.stop_price
+        c["take_profit"][i] = trade.take_profit
+        c["qty"][i] = trade.qty
+        c["exit_price"][i] = trade.exit_price
+        c["pnl"][i] = trade.pnl
+        c["entry_bar"][i] = entry_bar
+        c["exit_bar"][i] = exit_bar
+        c["entry_ts"][i] = _to_ms(trade.entry_time)
+        c["exit_ts"][i] = _to_ms(trade.exit_time)
+        self._n += 1
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of the filled part of one column."""
+        view = self._cols[name][: self._n]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def pnl(self) -> np.ndarray:
+        return self.column("pnl")
+
+    def counts_by_symbol(self) -> Dict[str, int]:
+        counts = np.bincount(self.column("symbol_id"), minlength=len(self.symbols))
+        return {s: int(counts[k]) for k, s in enumerate(self.symbols)}
+
+    def _trade(self, i: int) -> "Trade":
+        c = self._cols
+        return Trade(
+            symbol=self.symbols[int(c["symbol_id"][i])],
+            side="buy",  # PaperBroker only trades longs
+            entry_price=float(c["entry_price"][i]),
+            stop_price=float(c["stop_price"][i]),
+            take_profit=float(c["take_profit"][i]),
+            qty=float(c["qty"][i]),
+            entry_time=_from_ms(int(c["entry_ts"][i])),
+            exit_price=float(c["exit_price"][i]),
+            exit_time=_from_ms(int(c["exit_ts"][i])),
+            pnl=float(c["pnl"][i]),
+        )
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._trade(i) for i in range(*key.indices(self._n))]
+        i = int(key)
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("trade index out of range")
+        return self._trade(i)
+
+    def __iter__(self) -> Iterator["Trade"]:
+        return (self._trade(i) for i in range(self._n))
+
+    def to_frame(self) -> pd.DataFrame:
+        """All rows as a DataFrame with `Trade` field names (times as UTC datetimes)."""
+        df = pd.DataFrame({name: self.column(name) for name in self._FLOAT + self._INT})
+        df.insert(0, "symbol", np.asarray(self.symbols, dtype=object)[self.column("symbol_id")] if self._n else [])
+        for col in ("entry_ts", "exit_ts"):
+            df[col.replace("_ts", "_time")] = pd.to_datetime(df[col].where(df[col] >= 0), unit="ms")
+        return df
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_ms(value: Optional[datetime]) -> int:
+    if value is None:
+        return -1
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    # Integer timedelta arithmetic, so bar timestamps round-trip exactly
+    return (value - _EPOCH) // timedelta(milliseconds=1)
+
+
+def _from_ms(ms: int) -> Optional[datetime]:
+    # Naive UTC, like datetime.utcnow()
+    return None if ms < 0 else (_EPOCH + timedelta(milliseconds=int(ms))).replace(tzinfo=None)
+
+
+def _bar_time(ts: Union[int, float, datetime, None]) -> datetime:
+    """Naive UTC datetime of a bar timestamp (ms or datetime); wall clock when None."""
+    if ts is None:
+        return datetime.utcnow()
+    if isinstance(ts, datetime):
+        return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+    return _from_ms(int(ts))
+
+
+DAY_MS = 86_400_000
+
+
+def utc_day(ts: Union[int, float, datetime, None] = None) -> int:
+    """UTC day number (days since the epoch) of a bar timestamp in ms or a datetime.
+
+    None means now; naive datetimes are taken as UTC.
+    """
+    if ts is None:
+        ts = datetime.now(timezone.utc)
+    if isinstance(ts, datetime):
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        return int(ts.timestamp() * 1000) // DAY_MS
+    return int(ts) // DAY_MS
+
+
+class Ledger:
+    """Running realized-PnL and open-notional aggregates of a `PaperBroker`.
+
+    Realized PnL is summed as trades close, in total and per UTC day of the
+    closing bar, so the risk guards no longer re-sum the trade log every bar.
+    All queries are O(1).
+    """
+
+    def __init__(self) -> None:
+        self.total_pnl = 0.0
+        self.daily_pnl: Dict[int, float] = {}
+        self.open_notional = 0.0
+        self.n_closed = 0
+        # UTC day of the latest recorded event; "today" for `day_pnl()`
+        self.day: Optional[int] = None
+
+    def mark(self, ts: Union[int, float, datetime, None] = None) -> int:
+        """Advance the ledger clock to the day of `ts` and return that day."""
+        self.day = utc_day(ts)
+        return self.day
+
+    def record_open(self, notional: float, ts: Union[int, float, datetime, None] = None) -> None:
+        self.mark(ts)
+        self.open_notional += float(notional)
+
+    def record_close(
+        self, pnl: float, notional: float, ts: Union[int, float, datetime, None] = None, *, flat: bool = False
+    ) -> None:
+        day = self.mark(ts)
+        self.total_pnl += float(pnl)
+        self.daily_pnl[day] = self.daily_pnl.get(day, 0.0) + float(pnl)
+        self.n_closed += 1
+        # Reset when flat so add/subtract rounding cannot accumulate
+        self.open_notional = 0.0 if flat else self.open_notional - float(notional)
+
+    def day_pnl(self, ts: Union[int, float, datetime, None] = None) -> float:
+        """Realized PnL of the UTC day of `ts` (default: the ledger's current day)."""
+        day = self.day if ts is None else utc_day(ts)
+        return self.daily_pnl.get(day, 0.0) if day is not None else 0.0
+
+
 class PaperBroker:
     def __init__(self, cfg: AppConfig, equity: float) -> None:
         self.cfg = cfg
         self.equity = float(equity)
         self.open_positions: Dict[str, Trade] = {}
-        self.trade_log: List[Trade] = []
+        self.trade_log = TradeLog()
+        self.ledger = Ledger()
+        # Bar index of each open position's entry, for the trade log
+        self._entry_bars: Dict[str, int] = {}
 
     def _apply_slippage(self, price: float, side: str) -> float:
         bps = float(getattr(self.cfg, "slippage_bps", 0) or 0)
@@ -40,7 +234,11 @@ class PaperBroker:
         fee_rate = float(self.cfg.fees.taker if self.cfg and self.cfg.fees else 0.0)
         return abs(notional) * fee_rate
 
-    def buy(self, symbol: str, price: float, qty: float, stop: float, tp: float) -> Trade:
+    def buy(
+        self, symbol: str, price: float, qty: float, stop: float, tp: float, ts=None, bar: Optional[int] = None
+    ) -> Trade:
+        """Open a long at `price` (slipped); `ts` is the bar timestamp (ms), used as the
+        entry time and for the ledger, `bar` the bar index recorded in the trade log."""
         fill_price = self._apply_slippage(float(price), "buy")
         notional = fill_price * float(qty)
         fee = self._taker_fee(notional)
@@ -53,12 +251,18 @@ class PaperBroker:
             stop_price=float(stop),
             take_profit=float(tp),
             qty=float(qty),
-            entry_time=datetime.utcnow(),
+            entry_time=_bar_time(ts),
         )
         self.open_positions[symbol] = trade
+        self._entry_bars[symbol] = -1 if bar is None else int(bar)
+        self.ledger.record_open(notional, ts)
         return trade
 
-    def sell(self, symbol: str, price: float, qty: float) -> Optional[Trade]:
+    def sell(self, symbol: str, price: float, qty: float, ts=None, bar: Optional[int] = None) -> Optional[Trade]:
+        """Close `symbol` at `price` (slipped) at bar timestamp `ts` (ms; now when None).
+
+        PnL is booked on the UTC day of `ts`.
+        """
         if symbol not in self.open_positions:
             return None
         trade = self.open_positions.pop(symbol)
@@ -69,9 +273,12 @@ class PaperBroker:
         self.equity += proceeds - fee
         pnl = (fill_price - trade.entry_price) * float(qty) - self._taker_fee(trade.entry_price * float(qty)) - fee
         trade.exit_price = float(fill_price)
-        trade.exit_time = datetime.utcnow()
+        trade.exit_time = _bar_time(ts)
         trade.pnl = float(pnl)
-        self.trade_log.append(trade)
+        self.trade_log.append(
+            trade, entry_bar=self._entry_bars.pop(symbol, -1), exit_bar=-1 if bar is None else int(bar)
+        )
+        self.ledger.record_close(trade.pnl, trade.entry_price * trade.qty, ts, flat=not self.open_positions)
         return trade
 
     def update_prices(self, candles_df: pd.DataFrame) -> None:
@@ -82,9 +289,95 @@ class PaperBroker:
         row = df.iloc[-1]
         high = float(row["high"]) if "high" in df.columns else float(row[2])
         low = float(row["low"]) if "low" in df.columns else float(row[3])
+        ts = int(row["timestamp"]) if "timestamp" in df.columns else None
         for symbol, trade in list(self.open_positions.items()):
             # Stop first, then TP for conservative handling
             if low <= trade.stop_price <= high:
-                self.sell(symbol, trade.stop_price, trade.qty)
+                self.sell(symbol, trade.stop_price, trade.qty, ts)
             elif low <= trade.take_profit <= high:
-                self.sell(symbol, trade.take_profit, trade.qty)
+                self.sell(symbol, trade.take_profit, trade.qty, ts)
+
+
+@dataclass
+class ExitResolution:
+    """Batched exit outcome per trade; index -1 / NaN when no exit was found."""
+
+    exit_idx: np.ndarray
+    exit_price: np.ndarray  # fill price after slippage
+    pnl: np.ndarray
+    is_stop: np.ndarray
+
+
+def resolve_exits(
+    high: np.ndarray,
+    low: np.ndarray,
+    entry_idx: np.ndarray,
+    entry_price: np.ndarray,
+    stop: np.ndarray,
+    tp: np.ndarray,
+    qty: np.ndarray,
+    cfg: Optional[AppConfig] = None,
+    *,
+    chunk: int = 64,
+) -> ExitResolution:
+    """Find the first exit bar for many long trades in one batched NumPy pass.
+
+    Bars are scanned from each trade's entry index (inclusive), mirroring
+    `PaperBroker.update_prices`: a level triggers when it lies within the bar's
+    [low, high] range and the stop is checked before the TP on the same bar.
+    Fill price and PnL use the same slippage and taker-fee math as `PaperBroker`;
+    `entry_price` is the already-slipped fill recorded by `buy`.
+
+    Unresolved trades are scanned in windows that double in size, so short-lived
+    trades cost little while long holds still resolve in O(log n) passes.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    entry_idx = np.asarray(entry_idx, dtype=np.int64)
+    stop = np.asarray(stop, dtype=float)
+    tp = np.asarray(tp, dtype=float)
+    m = len(entry_idx)
+    n = len(high)
+
+    exit_idx = np.full(m, -1, dtype=np.int64)
+    is_stop = np.zeros(m, dtype=bool)
+    pending = np.arange(m)
+    start = entry_idx.copy()
+    width = max(1, int(chunk))
+    while pending.size:
+        pending = pending[start[pending] < n]
+        if not pending.size:
+            break
+        offs = start[pending][:, None] + np.arange(width)[None, :]
+        valid = offs < n
+        offs_c = np.minimum(offs, n - 1)
+        h = high[offs_c]
+        lo = low[offs_c]
+        s = stop[pending][:, None]
+        t = tp[pending][:, None]
+        hit_stop = (lo <= s) & (s <= h) & valid
+        hit_tp = (lo <= t) & (t <= h) & valid
+        hit = hit_stop | hit_tp
+        found = hit.any(axis=1)
+        first = hit.argmax(axis=1)
+        rows = np.flatnonzero(found)
+        done = pending[rows]
+        exit_idx[done] = offs[rows, first[rows]]
+        is_stop[done] = hit_stop[rows, first[rows]]
+        pending = pending[~found]
+        start[pending] += width
+        width *= 2
+
+    bps = float(getattr(cfg, "slippage_bps", 0) or 0) if cfg is not None else 0.0
+    fee_rate = float(cfg.fees.taker if cfg and cfg.fees else 0.0)
+    factor = 1.0 + (bps / 10000.0)
+    qty = np.asarray(qty, dtype=float)
+    entry_price = np.asarray(entry_price, dtype=float)
+
+    resolved = exit_idx >= 0
+    raw = np.where(is_stop, stop, tp)
+    fill = np.where(resolved, raw / factor, np.nan)
+    proceeds = qty * fill
+    fee = np.abs(proceeds) * fee_rate
+    pnl = (fill - entry_price) * qty - np.abs(entry_price * qty) * fee_rate - fee
+    return ExitResolution(exit_idx=exit_idx, exit_price=fill, pnl=pnl, is_stop=is_stop & resolved)
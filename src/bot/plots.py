@@ -0,0 +1,121 @@
+"""Deferred equity-curve plotting for backtest runs.
+
+The backtest only saves equity arrays (data/artifacts/equity/run_id=<id>/<hash>.npy).
+This stage selects a few combos from the results store, either the top N by a
+metric or explicit param hashes, and renders their plots in a worker pool.
+
+CLI:
+  python -m bot.plots --top 10 --metric sharpe
+  python -m bot.plots --run-id 1700000000 --hash 1a2b3c4d --hash 5e6f7a8b
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .results import LOWER_IS_BETTER, completed_rows, load_results
+
+ARTIFACTS_DIR = Path("data/artifacts")
+
+
+def select_combos(
+    results: pd.DataFrame,
+    *,
+    top_n: int = 10,
+    metric: str = "sharpe",
+    hashes: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """Pick rows to plot: the given param hashes, else the top N by metric."""
+    if results.empty:
+        return results
+    if hashes:
+        wanted = set(hashes)
+        return results[results["param_hash"].isin(wanted)]
+    ranked = results.assign(_m=pd.to_numeric(results[metric], errors="coerce")).dropna(subset=["_m"])
+    ranked = ranked.sort_values("_m", ascending=metric in LOWER_IS_BETTER, kind="mergesort")
+    return ranked.drop(columns="_m").head(max(0, int(top_n)))
+
+
+def _render_one(job: Tuple[str, str, str]) -> str:
+    equity_path, plot_path, title = job
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    equity = np.load(equity_path, mmap_mode="r")
+    fig = plt.figure(figsize=(6, 3))
+    plt.plot(np.asarray(equity))
+    plt.title(title)
+    plt.tight_layout()
+    fig.savefig(plot_path)
+    plt.close(fig)
+    return plot_path
+
+
+def render_equity_plots(
+    run_id: Optional[int] = None,
+    *,
+    top_n: int = 10,
+    metric: str = "sharpe",
+    hashes: Optional[Iterable[str]] = None,
+    jobs: int = 1,
+    artifacts_dir: Path = ARTIFACTS_DIR,
+) -> List[Path]:
+    """Render equity_<hash>.png for selected combos of one run (latest by default).
+
+    matplotlib is optional; when it is missing a warning is logged and nothing is rendered.
+    """
+    try:
+        import matplotlib  # noqa: F401
+    except Exception:
+        logger.warning("matplotlib not installed; skipping equity plots")
+        return []
+
+    artifacts_dir = Path(artifacts_dir)
+    results = load_results(artifacts_dir / "results")
+    if results.empty:
+        return []
+    if run_id is None:
+        run_id = int(results["run_id"].max())
+    run_rows = completed_rows(results[results["run_id"] == int(run_id)])
+    chosen = select_combos(run_rows, top_n=top_n, metric=metric, hashes=hashes)
+
+    equity_dir = artifacts_dir / "equity" / f"run_id={int(run_id)}"
+    jobs_list = []
+    for param_hash in chosen["param_hash"]:
+        src = equity_dir / f"{param_hash}.npy"
+        if src.exists():
+            dst = artifacts_dir / f"equity_{param_hash}.png"
+            jobs_list.append((str(src), str(dst), f"Equity Curve {param_hash}"))
+
+    if int(jobs) > 1 and len(jobs_list) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=int(jobs)) as pool:
+            paths = list(pool.map(_render_one, jobs_list))
+    else:
+        paths = [_render_one(j) for j in jobs_list]
+    return [Path(p) for p in paths]
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--run-id", type=int, default=None)
+    p.add_argument("--top", type=int, default=10)
+    p.add_argument("--metric", type=str, default="sharpe")
+    p.add_argument("--hash", action="append", default=[])
+    p.add_argument("--jobs", type=int, default=1)
+    args = p.parse_args()
+
+    paths = render_equity_plots(args.run_id, top_n=args.top, metric=args.metric, hashes=args.hash, jobs=args.jobs)
+    print(f"Wrote {len(paths)} plots")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""Multi-symbol portfolio backtest on a shared, time-aligned bar index.
+
+Every whitelisted symbol is loaded once and joined on the union of timestamps.
+One `PaperBroker` trades all of them under the `run_paper` portfolio rules:
+
+- the daily loss guard (realized PnL of the bar's UTC day) and the kill switch
+  (total realized PnL) halt new entries,
+- at most `max_open_trades` open positions and one position per symbol,
+- per-pair notional caps (`pair_caps`, then `max_notional_usdt_per_pair`),
+- the correlation guard over the last `corr_window` bar returns, kept as
+  running sums (`RollingCorrelation`) over the aligned return matrix instead
+  of re-fetching candles.
+
+On each bar, entries are placed first (in whitelist order, at the previous
+closed candle) and then stops/TPs are checked, as in the runner loop. Entry
+masks and exits are computed in batch per symbol, so the walk only visits
+bars where something can happen.
+
+CLI:
+  python -m bot.portfolio --config config/config.yaml --timeframe 1h --years 3
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .backtest import TF_PERIODS_PER_YEAR, _default_loader
+from .cache import dataset_fingerprint, get_cache
+from .config import AppConfig, EnvVars
+from .correlation import RollingCorrelation
+from .metrics import avg_trade, cagr, expectancy, max_drawdown, profit_factor, sharpe, winrate
+from .paper import PaperBroker, resolve_exits
+from .position import position_size
+from .risk import compute_stop, ledger_daily_loss_guard, ledger_kill_switch, pair_notional_cap
+from .strategy import entry_signals
+
+WARMUP = 200
+
+
+class AlignedBars:
+    """OHLC of several symbols on the union of their timestamps (NaN where absent).
+
+    `rows[s]` maps symbol s's own row k to its aligned bar index.
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame]) -> None:
+        self.symbols = list(frames)
+        ts = [np.asarray(f["timestamp"], dtype=np.int64) for f in frames.values()]
+        self.timestamps = np.unique(np.concatenate(ts)) if ts else np.zeros(0, dtype=np.int64)
+        t, s = len(self.timestamps), len(self.symbols)
+        self.close = np.full((t, s), np.nan)
+        self.rows: List[np.ndarray] = []
+        for j, (f, tj) in enumerate(zip(frames.values(), ts)):
+            pos = np.searchsorted(self.timestamps, tj)
+            self.rows.append(pos)
+            self.close[pos, j] = f["close"].to_numpy(dtype=float)
+        # Bar-to-bar returns per symbol; NaN across gaps and before listing
+        self.returns = np.full((t, s), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.returns[1:] = self.close[1:] / self.close[:-1] - 1.0
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+def _load_frames(
+    symbols: Sequence[str], timeframe: str, years: int, data_loader: Callable[[str, str, int], pd.DataFrame]
+) -> Dict[str, pd.DataFrame]:
+    frames = {}
+    for sym in symbols:
+        df = data_loader(sym, timeframe, years)
+        frames[sym] = df.sort_values("timestamp").drop_duplicates("timestamp").reset_index(drop=True)
+    return frames
+
+
+def run_portfolio_backtest(
+    cfg: AppConfig,
+    timeframe: Optional[str] = None,
+    years: int = 1,
+    *,
+    env: Optional[EnvVars] = None,
+    symbols: Optional[Sequence[str]] = None,
+    data_loader=None,
+    corr_window: int = 100,
+) -> Dict[str, Any]:
+    """Trade all symbols on one shared broker; returns equity, trades and metrics."""
+    env = env or EnvVars()
+    timeframe = timeframe or cfg.timeframe
+    symbols = list(symbols or cfg.symbols_whitelist)
+    frames = _load_frames(symbols, timeframe, years, data_loader or _default_loader)
+    bars = AlignedBars(frames)
+    base_equity = float(env.BASE_EQUITY)
+    broker = PaperBroker(cfg, equity=base_equity)
+
+    # Candidate entries per symbol: own row k enters at close[k - 1] when signal[k - 1]
+    candidates: Dict[int, List[int]] = {}
+    own: List[Dict[str, np.ndarray]] = []
+    for j, sym in enumerate(symbols):
+        df = frames[sym]
+        mask = entry_signals(
+            df[["open", "high", "low", "close", "volume"]], cfg, cache=get_cache(), fingerprint=dataset_fingerprint(df)
+        )
+        own.append(
+            {
+                "close": df["close"].to_numpy(dtype=float),
+                "high": df["high"].to_numpy(dtype=float),
+                "low": df["low"].to_numpy(dtype=float),
+            }
+        )
+        ks = np.flatnonzero(mask[WARMUP - 1 : len(df) - 1]) + WARMUP if len(df) > WARMUP else []
+        for k in ks:
+            candidates.setdefault(int(bars.rows[j][k]), []).append(j)
+
+    threshold = float(getattr(cfg, "correlation_threshold", 0.85))
+    max_corr = int(getattr(cfg, "max_correlated_trades", 2))
+    max_open = int(cfg.max_open_trades)
+    risk_pct = float(env.RISK_PER_TRADE_PCT)
+    max_loss_pct = float(env.MAX_DAILY_LOSS_PCT)
+
+    exits: List[tuple] = []  # heap of (aligned exit bar, seq, symbol index, is_stop)
+    open_idx: Dict[int, int] = {}  # symbol index -> aligned exit bar (-1: never)
+    skipped = {
+        "max_open_trades": 0, "pair_cap": 0, "correlation": 0, "daily_loss": 0, "kill_switch": 0, "size": 0,
+    }
+    changes: Dict[int, float] = {}
+    # Rolling correlations over returns[t - corr_window : t], fed up to bar `fed`
+    correlations = RollingCorrelation(symbols, window=corr_window)
+    fed = 0
+    halted = False
+    seq = 0
+
+    event_bars = sorted(candidates)
+    ei = 0
+    while ei < len(event_bars) or exits:
+        next_entry = event_bars[ei] if ei < len(event_bars) else None
+        next_exit = exits[0][0] if exits else None
+        t = min(x for x in (next_entry, next_exit) if x is not None)
+
+        if next_entry == t:
+            ei += 1
+            ts = int(bars.timestamps[t])
+            for j in candidates[t]:
+                sym = symbols[j]
+                # Realized PnL of the bar's UTC day, then across all closed trades, as in the runner
+                if not ledger_daily_loss_guard(broker.ledger, base_equity, max_loss_pct, ts):
+                    skipped["daily_loss"] += 1
+                    continue
+                stop_now = ledger_kill_switch(broker.ledger, base_equity, max_loss_pct)
+                if stop_now != halted:
+                    halted = stop_now
+                    if halted:
+                        logger.warning(f"portfolio kill switch at bar {t}; halting new entries")
+                if halted:
+                    skipped["kill_switch"] += 1
+                    continue
+                if j in open_idx:
+                    continue
+                if len(broker.open_positions) >= max_open:
+                    skipped["max_open_trades"] += 1
+                    continue
+                cap = pair_notional_cap(cfg, sym)
+                if cap <= 0:
+                    skipped["pair_cap"] += 1
+                    continue
+                if open_idx:
+                    # Bars skipped by the walk only matter if still inside the window
+                    for r in range(max(fed, t - corr_window), t):
+                        correlations.push_returns(int(bars.timestamps[r]), bars.returns[r])
+                    fed = max(fed, t)
+                    n_corr = correlations.count_correlated(sym, [symbols[o] for o in open_idx], threshold)
+                    if n_corr >= max_corr:
+                        skipped["correlation"] += 1
+                        continue
+
+                k = int(np.searchsorted(bars.rows[j], t))
+                entry = float(own[j]["close"][k - 1])
+                stop = compute_stop(entry, atr=entry * 0.0 + 1.0, k=cfg.atr_k)
+                tp = entry + (entry - stop) * float(cfg.risk_rr)
+                try:
+                    qty = position_size(entry, stop, broker.equity, risk_pct, step=0.0)
+                except Exception:
+                    qty = 0.0
+                if qty > 0 and entry * qty > cap:
+                    qty = cap / max(entry, 1e-12)
+                if qty <= 0:
+                    skipped["size"] += 1
+                    continue
+
+                trade = broker.buy(sym, entry, qty, stop, tp, ts=ts, bar=t)
+                ex = resolve_exits(own[j]["high"], own[j]["low"], [k], [trade.entry_price], [stop], [tp], [qty], cfg)
+                exit_k = int(ex.exit_idx[0])
+                if exit_k >= 0:
+                    t_exit = int(bars.rows[j][exit_k])
+                    heapq.heappush(exits, (t_exit, seq, j, bool(ex.is_stop[0])))
+                    seq += 1
+                    open_idx[j] = t_exit
+                else:
+                    open_idx[j] = -1
+            changes[t] = broker.equity
+
+        # Stops/TPs on this bar, after entries (runner order)
+        while exits and exits[0][0] == t:
+            _, _, j, is_stop = heapq.heappop(exits)
+            trade = broker.open_positions[symbols[j]]
+            price = trade.stop_price if is_stop else trade.take_profit
+            broker.sell(symbols[j], price, trade.qty, ts=int(bars.timestamps[t]), bar=t)
+            del open_idx[j]
+            changes[t] = broker.equity
+
+    equity = np.full(len(bars), np.nan)
+    equity[0] = base_equity
+    for t, value in changes.items():
+        equity[t] = value
+    equity = pd.Series(equity).ffill().to_numpy()
+
+    trades = broker.trade_log
+    periods_per_year = float(TF_PERIODS_PER_YEAR.get(timeframe, 365 * 24))
+    returns = pd.Series(equity).pct_change().dropna().values
+    metrics = {
+        "cagr": cagr(equity.tolist(), max(1, years)),
+        "max_dd": max_drawdown(equity.tolist()),
+        "winrate": winrate(trades),
+        "pf": profit_factor(trades),
+        "expectancy": expectancy(trades),
+        "avg_trade": avg_trade(trades),
+        "sharpe": sharpe(returns, periods_per_year=periods_per_year),
+        "n_trades": len(trades),
+    }
+    counts = trades.counts_by_symbol()
+    per_symbol = {s: counts.get(s, 0) for s in symbols}
+    logger.info(f"portfolio backtest | symbols={len(symbols)} bars={len(bars)} trades={len(trades)} skipped={skipped}")
+    return {
+        "timestamps": bars.timestamps,
+        "equity": equity,
+        "trades": trades,
+        "broker": broker,
+        "metrics": metrics,
+        "trades_per_symbol": per_symbol,
+        "skipped": skipped,
+    }
+
+
+def save_portfolio_results(result: Dict[str, Any], out_dir: Path) -> Path:
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    np.save(out_dir / "equity.npy", result["equity"])
+    result["trades"].to_frame().to_csv(out_dir / "trades.csv", index=False)
+    summary = {**result["metrics"], **{f"skipped_{k}": v for k, v in result["skipped"].items()}}
+    pd.DataFrame([summary]).to_csv(out_dir / "summary.csv", index=False)
+    return out_dir
+
+
+def main():
+    from .config import load_config
+
+    p = argparse.ArgumentParser()
+    p.add_argument("--config", type=str, default="config/config.yaml")
+    p.add_argument("--timeframe", type=str, default="")
+    p.add_argument("--years", type=int, default=1)
+    p.add_argument("--symbols", type=str, default="", help="Comma-separated subset of the whitelist")
+    p.add_argument("--history-dir", type=str, default="", help="Read candles from a local history store")
+    p.add_argument("--corr-window", type=int, default=100)
+    args = p.parse_args()
+
+    cfg, env = load_config(Path(args.config))
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()] or None
+    loader = None
+    if args.history_dir:
+        from .history import HistoryStore, history_loader
+
+        loader = history_loader(HistoryStore(Path(args.history_dir)))
+    res = run_portfolio_backtest(
+        cfg, args.timeframe or None, args.years, env=env, symbols=symbols, data_loader=loader,
+        corr_window=args.corr_window,
+    )
+    out = save_portfolio_results(res, Path("data/artifacts/portfolio"))
+    print(f"Wrote {out}: {res['metrics']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Higher-timeframe candles built locally from one stored base (1m) series.
+
+Bars are bucketed on sorted integer timestamps: each base candle belongs to
+the bucket `ts - (ts - offset) % tf_ms` (UTC-aligned; weeks start on Monday as on
+the exchanges), and bucket boundaries are found with one comparison of
+neighbouring bucket starts, so OHLCV is aggregated with `ufunc.reduceat` and no
+groupby. A bucket is emitted once it is closed; the trailing bucket is kept back
+until the base series reaches its end.
+
+`Resampler` does the same incrementally as new base candles arrive,
+`resampled_loader` serves any timeframe to `run_backtest` from a base history
+store, and `ResampledFeed` is a `fetch_ohlcv` stand-in for the runner that only
+requests new base candles.
+
+CLI:
+  python -m bot.backtest --history-dir data/history --base-timeframe 1m --timeframe 4h
+  python -m bot.runner --paper --history-dir data/history --base-timeframe 1m
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .history import OHLCV_DTYPE, HistoryStore, timeframe_to_ms, to_records
+
+# 1970-01-01 is a Thursday; weekly buckets start on Monday 1970-01-05
+_WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def _check(timeframe: str, base: str) -> tuple:
+    tf_ms, base_ms = timeframe_to_ms(timeframe), timeframe_to_ms(base)
+    if tf_ms < base_ms or tf_ms % base_ms:
+        raise ValueError(f"{timeframe} is not a multiple of the base timeframe {base}")
+    return tf_ms, base_ms
+
+
+def bucket_starts(timestamps: np.ndarray, timeframe: str) -> np.ndarray:
+    """Start (ms) of the `timeframe` bucket containing each timestamp."""
+    tf_ms = timeframe_to_ms(timeframe)
+    offset = _WEEK_OFFSET_MS if timeframe.endswith("w") else 0
+    ts = np.asarray(timestamps, dtype=np.int64)
+    return ts - (ts - offset) % tf_ms
+
+
+def resample(
+    records: np.ndarray, timeframe: str, *, base: str = "1m", closed_until: Optional[int] = None
+) -> np.ndarray:
+    """Aggregate sorted base candles (OHLCV_DTYPE) into closed `timeframe` candles.
+
+    `closed_until` (ms) is the time up to which the base series is complete; it
+    defaults to the end of the last base candle. Buckets ending after it are
+    still forming and left out.
+    """
+    tf_ms, base_ms = _check(timeframe, base)
+    if not len(records):
+        return np.zeros(0, dtype=OHLCV_DTYPE)
+    ts = np.asarray(records["timestamp"], dtype=np.int64)
+    buckets = bucket_starts(ts, timeframe)
+    if closed_until is None:
+        closed_until = int(ts[-1]) + base_ms
+    # Buckets are sorted, so only a trailing run can still be open
+    n_closed = int(np.searchsorted(buckets + tf_ms, int(closed_until), side="right"))
+    if n_closed == 0:
+        return np.zeros(0, dtype=OHLCV_DTYPE)
+    buckets = buckets[:n_closed]
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], n_closed] - 1
+
+    out = np.zeros(len(starts), dtype=OHLCV_DTYPE)
+    out["timestamp"] = buckets[starts]
+    out["open"] = records["open"][starts]
+    out["high"] = np.maximum.reduceat(np.asarray(records["high"][:n_closed]), starts)
+    out["low"] = np.minimum.reduceat(np.asarray(records["low"][:n_closed]), starts)
+    out["close"] = records["close"][ends]
+    out["volume"] = np.add.reduceat(np.asarray(records["volume"][:n_closed]), starts)
+    return out
+
+
+def resample_frame(df: pd.DataFrame, timeframe: str, *, base: str = "1m") -> pd.DataFrame:
+    """`resample` for a DataFrame with ccxt column names."""
+    recs = np.zeros(len(df), dtype=OHLCV_DTYPE)
+    for name in OHLCV_DTYPE.names:
+        recs[name] = df[name].to_numpy()
+    out = resample(recs, timeframe, base=base)
+    return pd.DataFrame({name: out[name] for name in OHLCV_DTYPE.names})
+
+
+def _as_rows(records: np.ndarray) -> List[list]:
+    return [[int(r[0]), *map(float, list(r)[1:])] for r in records]
+
+
+class Resampler:
+    """Incremental `resample`: feed closed base candles, get newly closed candles back.
+
+    Only the base candles of the still-open bucket are kept between updates
+    (at most tf/base - 1 rows).
+    """
+
+    def __init__(self, timeframe: str, base: str = "1m") -> None:
+        self.timeframe = timeframe
+        self.base = base
+        self.tf_ms, self.base_ms = _check(timeframe, base)
+        self.pending = np.zeros(0, dtype=OHLCV_DTYPE)
+        self.last_ts: Optional[int] = None
+
+    def update(self, candles: Any) -> np.ndarray:
+        """Add closed base candles (rows or records); returns the buckets they closed."""
+        recs = candles if isinstance(candles, np.ndarray) and candles.dtype == OHLCV_DTYPE else to_records(candles)
+        if self.last_ts is not None:
+            recs = recs[recs["timestamp"] > self.last_ts]
+        if not len(recs):
+            return np.zeros(0, dtype=OHLCV_DTYPE)
+        self.last_ts = int(recs["timestamp"][-1])
+        combined = np.concatenate([self.pending, recs])
+        done = resample(combined, self.timeframe, base=self.base)
+        # Rows of buckets not emitted yet stay pending
+        cut = int(np.searchsorted(combined["timestamp"], int(done["timestamp"][-1]) + self.tf_ms)) if len(done) else 0
+        self.pending = combined[cut:].copy()
+        return done
+
+    def forming(self, extra: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """The open bucket as one record, including `extra` (e.g. the forming base candle)."""
+        rows = self.pending if extra is None or not len(extra) else np.concatenate([self.pending, extra])
+        if not len(rows):
+            return None
+        bucket = bucket_starts(rows["timestamp"][-1:], self.timeframe)[0]
+        rows = rows[bucket_starts(rows["timestamp"], self.timeframe) == bucket]
+        out = np.zeros(1, dtype=OHLCV_DTYPE)
+        out["timestamp"] = bucket
+        out["open"] = rows["open"][0]
+        out["high"] = rows["high"].max()
+        out["low"] = rows["low"].min()
+        out["close"] = rows["close"][-1]
+        out["volume"] = rows["volume"].sum()
+        return out
+
+
+def resampled_loader(store: HistoryStore, base: str = "1m") -> Callable[[str, str, int], pd.DataFrame]:
+    """`data_loader` serving any timeframe from the stored `base` candles of the last `years`."""
+
+    def _load(symbol: str, timeframe: str, years: int) -> pd.DataFrame:
+        last = store.last_timestamp(symbol, base)
+        if last is None:
+            raise FileNotFoundError(f"No stored {base} history for {symbol} under {store.root}")
+        frame = store.frame(symbol, base, since=last - int(years) * 365 * 86_400_000)
+        if timeframe == base or frame.empty:
+            return frame
+        out = resample_frame(frame, timeframe, base=base)
+        # A first bucket that starts before the loaded data is partial
+        if len(out) and int(out["timestamp"].iloc[0]) < int(frame["timestamp"].iloc[0]):
+            out = out.iloc[1:].reset_index(drop=True)
+        return out
+
+    return _load
+
+
+class ResampledFeed:
+    """`fetch_ohlcv`-compatible source that builds every timeframe from `base` candles.
+
+    After the first call only base candles newer than the last one seen are
+    requested. The last returned candle is the forming bucket, as with an
+    exchange. With a `store`, the first call starts from the stored base
+    candles and closed base candles are appended to it.
+    """
+
+    def __init__(
+        self,
+        exchange: Any,
+        base: str = "1m",
+        *,
+        store: Optional[HistoryStore] = None,
+        page_limit: int = 1000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.exchange = exchange
+        self.base = base
+        self.base_ms = timeframe_to_ms(base)
+        self.store = store
+        self.page_limit = int(page_limit)
+        self._clock = clock
+        self._states: Dict[tuple, Dict[str, Any]] = {}
+
+    def _fetch_base(self, symbol: str, since: int, now_ms: int) -> np.ndarray:
+        pages = []
+        while since < now_ms:
+            page = self.exchange.fetch_ohlcv(symbol, self.base, limit=self.page_limit, since=since)
+            if not page:
+                break
+            pages.extend(page)
+            newest = max(int(c[0]) for c in page)
+            if len(page) < self.page_limit or newest + self.base_ms >= now_ms or newest + self.base_ms <= since:
+                break
+            since = newest + self.base_ms
+        return to_records(pages)
+
+    def _seed(self, state: Dict[str, Any], symbol: str, timeframe: str, start: int) -> None:
+        """Build the first candles from stored base candles; only newer ones are fetched."""
+        stored = self.store.open(symbol, self.base)
+        stored = stored[int(np.searchsorted(stored["timestamp"], start)):]
+        if len(stored):
+            # A bucket the store only covers in part is left out rather than half-built
+            first = int(stored["timestamp"][0])
+            bucket = int(bucket_starts(np.array([first]), timeframe)[0])
+            if bucket != first:
+                stored = stored[stored["timestamp"] >= bucket + timeframe_to_ms(timeframe)]
+        if not len(stored):
+            return
+        state["candles"] = state["resampler"].update(np.asarray(stored))[-state["keep"]:]
+        state["since"] = int(stored["timestamp"][-1]) + self.base_ms
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str, limit: int = 200, since: Optional[int] = None) -> List[list]:
+        tf_ms, _ = _check(timeframe, self.base)
+        now_ms = int(self._clock() * 1000)
+        key = (symbol, timeframe)
+        limit = max(1, int(limit))
+        state = self._states.get(key)
+        if state is None:
+            # Start on a bucket boundary so the first candle is not partial
+            start = int(bucket_starts(np.array([now_ms - limit * tf_ms]), timeframe)[0])
+            if since is not None:
+                first = int(bucket_starts(np.array([int(since)]), timeframe)[0])
+                start = first if first == int(since) else first + tf_ms
+            state = self._states[key] = {
+                "resampler": Resampler(timeframe, self.base),
+                "candles": np.zeros(0, dtype=OHLCV_DTYPE),
+                "since": start,
+                "keep": limit,
+            }
+            if self.store is not None:
+                self._seed(state, symbol, timeframe, start)
+        # Callers may ask for different lengths; keep enough for the longest
+        state["keep"] = keep = max(state["keep"], limit)
+
+        recs = self._fetch_base(symbol, state["since"], now_ms)
+        is_closed = recs["timestamp"] + self.base_ms <= now_ms
+        closed, open_rows = recs[is_closed], recs[~is_closed]
+        if len(closed):
+            # The forming base candle is requested again next time
+            state["since"] = int(closed["timestamp"][-1]) + self.base_ms
+            if self.store is not None:
+                self.store.append(symbol, self.base, closed)
+        resampler: Resampler = state["resampler"]
+        done = resampler.update(closed)
+        state["candles"] = candles = np.concatenate([state["candles"], done])[-keep:]
+
+        forming = resampler.forming(open_rows)
+        if forming is None:
+            return _as_rows(candles[-limit:])
+        # Like an exchange: the last `limit` candles, the forming one last
+        return _as_rows(np.concatenate([candles[len(candles) - min(len(candles), limit - 1):], forming]))
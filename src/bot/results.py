@@ -0,0 +1,258 @@
+"""Columnar results store for backtest sweeps.
+
+Rows are buffered in memory and flushed in batches as part files under one
+partition directory per run_id:
+
+    <root>/run_id=<id>/schema.json
+    <root>/run_id=<id>/part-00000.parquet   (or .npz when pyarrow is missing)
+
+Each partition carries an explicit schema (parameter columns followed by the
+metric columns), so adding a parameter key to a grid can no longer shift CSV
+columns. The legacy CSV is kept in step with `append_csv`, which adds only the
+rows of the run just written; a CSV that predates the store is imported into it
+once with `import_legacy_csv`. `export_csv` rewrites the CSV from every
+partition.
+"""
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ROOT = Path("data/artifacts/results")
+
+METRIC_COLUMNS = ["cagr", "max_dd", "winrate", "pf", "expectancy", "avg_trade", "sharpe", "n_trades"]
+META_COLUMNS = ["valid_row", "run_id"]
+# Written by pruned sweeps: the rung a row was evaluated at, its history length in
+# bars and whether (and why) the combo was dropped there.
+PRUNE_COLUMNS = ["rung", "bars", "pruned", "prune_reason"]
+
+# Metrics where a smaller value ranks higher
+LOWER_IS_BETTER = {"max_dd"}
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+class ResultsSink:
+    """Buffered writer for one run_id partition.
+
+    Usage:
+        with ResultsSink(run_id, param_keys) as sink:
+            sink.append(row)
+    """
+
+    def __init__(
+        self,
+        run_id: int,
+        param_keys: Iterable[str],
+        root: Path = DEFAULT_ROOT,
+        *,
+        batch_size: int = 256,
+        extra_columns: Iterable[str] = (),
+        fmt: Optional[str] = None,
+    ) -> None:
+        self.run_id = int(run_id)
+        self.root = Path(root)
+        self.columns: List[str] = list(param_keys) + METRIC_COLUMNS + list(extra_columns) + META_COLUMNS
+        self.batch_size = max(1, int(batch_size))
+        self.fmt = fmt or ("parquet" if _has_pyarrow() else "npz")
+        self.partition = self.root / f"run_id={self.run_id}"
+        self._buffer: List[Dict[str, Any]] = []
+        self._write_schema()
+
+    def _write_schema(self) -> None:
+        self.partition.mkdir(parents=True, exist_ok=True)
+        schema_path = self.partition / "schema.json"
+        if schema_path.exists():
+            existing = json.loads(schema_path.read_text(encoding="utf-8"))
+            if existing.get("columns") != self.columns:
+                raise ValueError(
+                    f"Schema mismatch for run_id={self.run_id}: {existing.get('columns')} != {self.columns}"
+                )
+            return
+        schema_path.write_text(json.dumps({"columns": self.columns, "format": self.fmt}, indent=2), encoding="utf-8")
+
+    def append(self, row: Dict[str, Any]) -> None:
+        unknown = set(row) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Columns not in schema for run_id={self.run_id}: {sorted(unknown)}")
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        df = pd.DataFrame(self._buffer, columns=self.columns)
+        part = len(list(self.partition.glob("part-*")))
+        path = self.partition / f"part-{part:05d}.{self.fmt}"
+        if self.fmt == "parquet":
+            df.to_parquet(path, index=False)
+        else:
+            arrays = {c: df[c].to_numpy() for c in self.columns}
+            np.savez(path, **arrays)
+        self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "ResultsSink":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+@dataclass(frozen=True)
+class EquityHandle:
+    """Lazy reference to a saved float32 equity curve.
+
+    `points` is the stored length and `bars` the simulated length; they differ
+    when the curve was downsampled. `np.asarray(handle)` loads the curve.
+    """
+
+    path: Path
+    points: int
+    bars: int
+
+    def load(self, mmap: bool = True) -> np.ndarray:
+        return np.load(self.path, mmap_mode="r" if mmap else None)
+
+    def __len__(self) -> int:
+        return self.points
+
+    def __array__(self, dtype=None, copy=None):
+        arr = np.asarray(self.load(mmap=False))
+        return arr if dtype is None else arr.astype(dtype)
+
+
+class EquityWriter:
+    """Spills equity curves of one run as float32 .npy files (memory-mapped on load).
+
+    With `points`, curves longer than that are downsampled to `points` evenly
+    spaced bars (first and last bar always kept) before they are written.
+    """
+
+    def __init__(self, directory: Path, *, points: Optional[int] = None) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.points = int(points) if points else None
+
+    def write(self, name: str, curve: Any) -> EquityHandle:
+        arr = np.asarray(curve, dtype=np.float32)
+        bars = len(arr)
+        if self.points and bars > self.points:
+            idx = np.unique(np.linspace(0, bars - 1, self.points).round().astype(np.int64))
+            arr = arr[idx]
+        path = self.directory / f"{name}.npy"
+        np.save(path, arr)
+        return EquityHandle(path, len(arr), bars)
+
+
+def next_run_id(root: Path = DEFAULT_ROOT) -> int:
+    """Wall-clock run id, bumped past existing partitions so each run gets its own."""
+    run_id = int(time.time())
+    root = Path(root)
+    if root.is_dir():
+        existing = [int(p.name.split("=", 1)[1]) for p in root.glob("run_id=*")]
+        if existing:
+            run_id = max(run_id, max(existing) + 1)
+    return run_id
+
+
+def _read_part(path: Path, columns: List[str]) -> pd.DataFrame:
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    with np.load(path, allow_pickle=True) as data:
+        return pd.DataFrame({c: data[c] for c in columns if c in data.files}, columns=columns)
+
+
+def load_results(root: Path = DEFAULT_ROOT, run_ids: Optional[Iterable[int]] = None) -> pd.DataFrame:
+    """Read all (or selected) partitions into one DataFrame, oldest run first."""
+    root = Path(root)
+    wanted = None if run_ids is None else {int(r) for r in run_ids}
+    frames = []
+    partitions = sorted(root.glob("run_id=*"), key=lambda p: int(p.name.split("=", 1)[1]))
+    for partition in partitions:
+        if wanted is not None and int(partition.name.split("=", 1)[1]) not in wanted:
+            continue
+        schema = json.loads((partition / "schema.json").read_text(encoding="utf-8"))
+        for part in sorted(partition.glob("part-*")):
+            frames.append(_read_part(part, schema["columns"]))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True, sort=False)
+
+
+def read_results(path: Path) -> pd.DataFrame:
+    """Read either a results CSV or a columnar results store directory."""
+    path = Path(path)
+    if path.is_dir():
+        return load_results(path)
+    return pd.read_csv(path)
+
+
+def completed_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop rows of combos pruned early; their metrics cover only part of the history."""
+    if df.empty or "pruned" not in df.columns:
+        return df
+    pruned = df["pruned"].map(lambda v: str(v).strip().lower() in ("true", "1", "1.0"))
+    return df[~pruned]
+
+
+def export_csv(root: Path, csv_path: Path) -> Path:
+    """Write every stored row to a CSV with a single, consistent header."""
+    df = load_results(root)
+    csv_path = Path(csv_path)
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(csv_path, index=False)
+    return csv_path
+
+
+def import_legacy_csv(csv_path: Path, root: Path = DEFAULT_ROOT, run_id: int = 0) -> bool:
+    """Copy the rows of a CSV written before the store existed into partition `run_id`.
+
+    Only done while the store is still empty; returns whether rows were imported.
+    """
+    csv_path, root = Path(csv_path), Path(root)
+    if not csv_path.is_file() or (root.is_dir() and any(root.glob("run_id=*"))):
+        return False
+    df = pd.read_csv(csv_path)
+    if df.empty:
+        return False
+    if "run_id" not in df.columns:
+        df["run_id"] = run_id
+    reserved = set(METRIC_COLUMNS) | set(META_COLUMNS)
+    params = [c for c in df.columns if c not in reserved]
+    with ResultsSink(run_id, params, root) as sink:
+        for rec in df.to_dict(orient="records"):
+            sink.append({k: v for k, v in rec.items() if k in sink.columns})
+    return True
+
+
+def append_csv(root: Path, run_id: int, csv_path: Path) -> Path:
+    """Add the rows of one run to the legacy CSV without reading the other partitions.
+
+    The CSV is rewritten in full (`export_csv`) only when it does not exist yet
+    or the run brings columns its header lacks.
+    """
+    csv_path = Path(csv_path)
+    if not csv_path.is_file():
+        return export_csv(root, csv_path)
+    header = list(pd.read_csv(csv_path, nrows=0).columns)
+    df = load_results(root, [run_id])
+    if set(df.columns) - set(header):
+        return export_csv(root, csv_path)
+    df.reindex(columns=header).to_csv(csv_path, mode="a", header=False, index=False)
+    return csv_path
@@ -49,3 +49,24 @@ def kill_switch(pnl_list: Iterable[float], base_equity: float, max_loss_pct: flo
     the runner to decide whether to stop sending new orders for the day.
     """
     return not max_daily_loss_guard(pnl_list, base_equity, max_loss_pct)
+
+
+def ledger_daily_loss_guard(ledger, base_equity: float, max_loss_pct: float, ts=None) -> bool:
+    """`max_daily_loss_guard` on a broker `Ledger`: realized PnL of the UTC day of
+    `ts` (default: the ledger's current day), in O(1)."""
+    return max_daily_loss_guard([ledger.day_pnl(ts)], base_equity, max_loss_pct)
+
+
+def ledger_kill_switch(ledger, base_equity: float, max_loss_pct: float) -> bool:
+    """`kill_switch` on a broker `Ledger`'s running total realized PnL, in O(1)."""
+    return kill_switch([ledger.total_pnl], base_equity, max_loss_pct)
+
+
+def pair_notional_cap(cfg, symbol: str) -> float:
+    """Max open notional for `symbol`: pair_caps entry, else the per-pair default,
+    else the legacy per-trade cap."""
+    if cfg.pair_caps and symbol in cfg.pair_caps:
+        return float(cfg.pair_caps[symbol])
+    if getattr(cfg, "max_notional_usdt_per_pair", None):
+        return float(cfg.max_notional_usdt_per_pair)
+    return float(cfg.max_notional_per_trade_usdt)
@@ -3,20 +3,162 @@ import argparse
 from pathlib import Path
 from time import sleep
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import threading
 import time
 
+import numpy as np
 import pandas as pd
 
 from .logger import setup_logger
 from .config import load_config, AppConfig, EnvVars
 from .notifier import Notifier
-from .exchange import Exchange, ExchangeError
+from .exchange import AsyncExchange, ConcurrentFetcher, Exchange, ExchangeError
 from .strategy import generate_signal
+from .indicators import IndicatorState
+from .candle_cache import CandleCache
+from .correlation import RollingCorrelation
+from .history import HistoryStore
+from .resample import ResampledFeed, resample_frame
+from .scheduler import CandleScheduler, measure_clock_offset
+from .stream import BINANCE_WS, KlineStream, stream_rows
 from .position import position_size
-from .risk import compute_stop, max_daily_loss_guard, kill_switch
+from .risk import (
+    compute_stop,
+    kill_switch,
+    ledger_daily_loss_guard,
+    ledger_kill_switch,
+    pair_notional_cap,
+)
 from .paper import PaperBroker
+from .metrics import OnlineMetrics
+
+
+OHLCV_COLS = ["open", "high", "low", "close", "volume"]
+
+
+def _stream_indicators(
+    states: Dict[str, IndicatorState], symbol: str, df: pd.DataFrame, cfg: AppConfig
+) -> Tuple[pd.DataFrame, List[str]]:
+    """Advance the symbol's streaming indicators with newly closed candles.
+
+    Only candles newer than the state's last timestamp are fed, so steady-state cost
+    is O(1) per new candle. The indicator values are attached to the last CLOSED row
+    so `generate_signal` uses them instead of recomputing over the whole frame.
+    Returns the frame and the columns to pass on; falls back to plain OHLCV when the
+    state cannot be aligned with the frame (e.g. the feed went backwards).
+    """
+    if len(df) < 2:
+        return df, OHLCV_COLS
+    state = states.get(symbol)
+    if state is None:
+        state = states[symbol] = IndicatorState(cfg)
+    closed = df.iloc[:-1]
+    ts = closed["timestamp"].to_numpy()
+    start = 0 if state.last_ts is None else int(np.searchsorted(ts, state.last_ts, side="right"))
+    if start < len(closed):
+        state.warmup(closed.iloc[start:])
+    if state.last_ts != ts[-1]:
+        return df, OHLCV_COLS
+    out = df.copy()
+    for col, val in state.values().items():
+        out[col] = np.nan
+        out.iloc[-2, out.columns.get_loc(col)] = val
+    return out, OHLCV_COLS + state.columns
+
+
+def _warm_start(
+    history: Optional[HistoryStore],
+    ex,
+    symbols: List[str],
+    cfg: AppConfig,
+    logger,
+    base_timeframe: Optional[str] = None,
+) -> Dict[str, IndicatorState]:
+    """Sync the local history store and seed streaming indicators from it.
+
+    With `base_timeframe` only that series is stored and `cfg.timeframe` is
+    resampled from it. Without a store the states start empty and warm up from
+    the first fetch.
+    """
+    states: Dict[str, IndicatorState] = {}
+    if history is None:
+        return states
+    for symbol in symbols:
+        try:
+            if base_timeframe:
+                added = history.sync(ex, symbol, base_timeframe)
+                frame = resample_frame(history.frame(symbol, base_timeframe), cfg.timeframe, base=base_timeframe)
+            else:
+                added = history.sync(ex, symbol, cfg.timeframe)
+                frame = history.frame(symbol, cfg.timeframe)
+        except Exception as e:
+            logger.warning(f"warm start skipped for {symbol}: {e}")
+            continue
+        if len(frame):
+            states[symbol] = IndicatorState.from_history(frame, cfg)
+            logger.info(f"warm start {symbol}: {len(frame)} stored candles (+{added} synced)")
+    return states
+
+
+def _candle_feed(ex, cfg: AppConfig, base_timeframe: Optional[str], history: Optional[HistoryStore]):
+    """Source of `cfg.timeframe` candles: the exchange, or candles resampled from
+    `base_timeframe` when that differs (new base candles also go to `history`)."""
+    if base_timeframe and base_timeframe != cfg.timeframe:
+        return ResampledFeed(ex, base_timeframe, store=history)
+    return ex
+
+
+def _concurrent_fetcher(
+    cfg: AppConfig, env: EnvVars, concurrency: int, base_timeframe: Optional[str]
+) -> Optional[ConcurrentFetcher]:
+    """Async multi-symbol fetcher when concurrency > 1 (resampled feeds stay sequential)."""
+    if int(concurrency) <= 1 or (base_timeframe and base_timeframe != cfg.timeframe):
+        return None
+    return ConcurrentFetcher(AsyncExchange(cfg, env), concurrency)
+
+
+def _candle_scheduler(ex, cfg: AppConfig, logger) -> CandleScheduler:
+    """Scheduler for `cfg.timeframe` closes, synced to the exchange clock."""
+    offset = measure_clock_offset(ex)
+    logger.info(f"exchange clock offset {offset} ms; waking on {cfg.timeframe} candle closes")
+    return CandleScheduler(cfg.timeframe, offset_ms=offset)
+
+
+def _fetch_snapshot(
+    feed, fetcher: Optional[ConcurrentFetcher], symbols: List[str], timeframe: str, limit: int
+) -> Dict[str, list]:
+    """Candles of every symbol for one loop iteration: all at once through `fetcher`
+    (latency ~ one round-trip), else one request after another."""
+    if fetcher is not None:
+        return fetcher.fetch_many(symbols, timeframe, limit)
+    return {s: feed.fetch_ohlcv(s, timeframe, limit=limit) for s in symbols}
+
+
+def _kline_stream(symbols: List[str], cfg: AppConfig, base_url: str, logger) -> KlineStream:
+    """Websocket kline subscription for all `symbols`, started in the background."""
+    stream = KlineStream(symbols, cfg.timeframe, base_url=base_url).start()
+    logger.info(f"kline stream | {stream.url}")
+    return stream
+
+
+def _apply_stream(
+    stream: KlineStream, cache: CandleCache, fetch_rows, symbols: List[str], seen_reconnects: int, logger
+) -> int:
+    """Wait for the next pushed candle close and merge the updates into `cache`.
+
+    Gaps are backfilled over REST, as is everything after a reconnect or when no
+    close arrives within a candle (plus a minute). Returns the reconnect count seen.
+    """
+    events = stream.poll(timeout=cache.tf_ms / 1000 + 60)
+    cache.merge(stream_rows(events, cache.tf_ms), fetch_rows)
+    if not any(k.closed for k in events):
+        logger.warning("kline stream: no candle close received; polling REST")
+        cache.refresh(fetch_rows, symbols)
+    elif stream.reconnects != seen_reconnects:
+        # Closes missed while disconnected
+        cache.refresh(fetch_rows, symbols)
+    return stream.reconnects
 
 
 def watch_open_orders(exchange, symbol: str, poll_sec: float, logger):
@@ -163,7 +305,18 @@ def watch_open_orders(exchange, symbol: str, poll_sec: float, logger):
     return th
 
 
-def run_paper(cfg: AppConfig, env: EnvVars, *, max_iterations: int = 3, sleep_seconds: int = 0):
+def run_paper(
+    cfg: AppConfig,
+    env: EnvVars,
+    *,
+    max_iterations: int = 3,
+    sleep_seconds: int = 0,
+    history: Optional[HistoryStore] = None,
+    base_timeframe: Optional[str] = None,
+    fetch_concurrency: int = 1,
+    align_to_close: bool = False,
+    stream_url: Optional[str] = None,
+):
     logger = setup_logger()
     notifier = Notifier(
         enabled=cfg.telegram_enabled,
@@ -180,17 +333,39 @@ def run_paper(cfg: AppConfig, env: EnvVars, *, max_iterations: int = 3, sleep_se
 
     # Track last signal timestamp per symbol to avoid duplicate entries on the same closed candle
     last_signal_ts: Dict[str, Optional[int]] = {s: None for s in symbols}
+    # Streaming indicators per symbol; only new closed candles are processed each iteration
+    indicator_states = _warm_start(history, ex, symbols, cfg, logger, base_timeframe)
+    feed = _candle_feed(ex, cfg, base_timeframe, history)
+    fetcher = _concurrent_fetcher(cfg, env, fetch_concurrency, base_timeframe)
+    scheduler = _candle_scheduler(ex, cfg, logger) if align_to_close and not stream_url else None
+    # Last closed candle each symbol's signal was evaluated on
+    last_evaluated_ts: Dict[str, Optional[int]] = {}
+
+    # Recent candles per symbol; after the first backfill only new candles are fetched
+    cache = CandleCache(cfg.timeframe, capacity=200)
+
+    def fetch_rows(syms: List[str], limit: int) -> Dict[str, list]:
+        return _fetch_snapshot(feed, fetcher, syms, cfg.timeframe, limit)
+
+    def refetch(syms: List[str]) -> Dict[str, list]:
+        return fetch_rows(syms, max(cache.fetch_limit(s) for s in syms))
+
+    # Rolling return correlations of all symbols, updated once per closed candle
+    correlations = RollingCorrelation(symbols, window=100)
+    # Candle closes pushed over a websocket instead of polled (REST still backfills)
+    stream = _kline_stream(symbols, cfg, stream_url, logger) if stream_url else None
+    seen_reconnects = 0
+    # Live metrics in O(1) memory: equity once per iteration, PnL per closed trade
+    live = OnlineMetrics()
+    live.update_equity(broker.equity)
+    n_closed = 0
 
     def quote_from(symbol: str) -> str:
         return symbol.split("/")[-1] if "/" in symbol else "USDT"
 
     def per_pair_cap(symbol: str) -> float:
         # Try pair_caps map, fallback to max_notional_usdt_per_pair, then legacy per-trade cap
-        if cfg.pair_caps and symbol in cfg.pair_caps:
-            return float(cfg.pair_caps[symbol])
-        if getattr(cfg, "max_notional_usdt_per_pair", None):
-            return float(cfg.max_notional_usdt_per_pair)
-        return float(cfg.max_notional_per_trade_usdt)
+        return pair_notional_cap(cfg, symbol)
 
     def notional_open_for(symbol: str) -> float:
         if symbol not in broker.open_positions:
@@ -198,103 +373,126 @@ def run_paper(cfg: AppConfig, env: EnvVars, *, max_iterations: int = 3, sleep_se
         t = broker.open_positions[symbol]
         return float(t.entry_price) * float(t.qty)
 
-    def correlation_guard(symbol_new: str, df_new: pd.DataFrame) -> bool:
-        # Compute Pearson correlation between last N returns of symbol_new and each open symbol
+    def correlation_guard(symbol_new: str) -> bool:
+        # Rolling return correlation of symbol_new with each open symbol, read from memory
         if not broker.open_positions:
             return True
         threshold = float(getattr(cfg, "correlation_threshold", 0.85))
         max_corr = int(getattr(cfg, "max_correlated_trades", 2))
-        N = 100
-        returns_new = df_new["close"].astype(float).pct_change().tail(N)
-        correlated_count = 0
-        for sym_open in list(broker.open_positions.keys()):
-            if sym_open == symbol_new:
-                continue
-            try:
-                candles = ex.fetch_ohlcv(sym_open, cfg.timeframe, limit=N + 5)
-                df_o = pd.DataFrame(candles, columns=["timestamp", "open", "high", "low", "close", "volume"]).sort_values("timestamp")
-                returns_o = df_o["close"].astype(float).pct_change().tail(N)
-                joined = pd.concat([returns_new.reset_index(drop=True), returns_o.reset_index(drop=True)], axis=1).dropna()
-                if len(joined) < 10:
-                    continue
-                corr = joined.iloc[:, 0].corr(joined.iloc[:, 1])
-                if pd.notna(corr) and corr > threshold:
-                    correlated_count += 1
-            except Exception:
-                continue
+        correlated_count = correlations.count_correlated(symbol_new, broker.open_positions, threshold)
         if correlated_count >= max_corr:
             logger.info(f"Skip {symbol_new}: correlation guard (count={correlated_count} >= {max_corr})")
             return False
         return True
 
     it = 0
-    while it < max_iterations:
-        it += 1
-        for symbol in symbols:
-            candles = ex.fetch_ohlcv(symbol, cfg.timeframe, limit=200)
-            df = pd.DataFrame(
-                candles, columns=["timestamp", "open", "high", "low", "close", "volume"]
-            ).sort_values("timestamp")
-
-            # Risk guard on realized PnL across all trades
-            realized = [t.pnl for t in broker.trade_log if t.pnl is not None]
-            if not max_daily_loss_guard(realized, float(env.BASE_EQUITY), float(env.MAX_DAILY_LOSS_PCT)):
-                notifier.send("Max daily loss reached. Halting new entries.")
-                break
-            if kill_switch(realized, float(env.BASE_EQUITY), float(env.MAX_DAILY_LOSS_PCT)):
-                logger.warning("Kill switch activated. Stopping loop.")
-                break
-
-            # Per-pair notional cap and global open trades cap
-            if len(broker.open_positions) >= int(cfg.max_open_trades):
-                continue
-            if notional_open_for(symbol) >= per_pair_cap(symbol):
-                continue
+    try:
+        while it < max_iterations:
+            it += 1
+            if stream is not None and it > 1:
+                seen_reconnects = _apply_stream(stream, cache, fetch_rows, symbols, seen_reconnects, logger)
+            else:
+                rows = cache.refresh(fetch_rows, symbols)
+                if scheduler is not None:
+                    cache.merge(scheduler.await_closed(refetch, rows), fetch_rows)
+            correlations.update({s: cache.frame(s).iloc[:-1] for s in symbols if s in cache})
+            for symbol in symbols:
+                # Zero-copy view of the ring buffer, oldest candle first
+                df = cache.frame(symbol)
+
+                # Risk guards on the broker ledger: today's (UTC, by bar time) and total realized PnL
+                now_ts = int(df.iloc[-1]["timestamp"])
+                if not ledger_daily_loss_guard(broker.ledger, float(env.BASE_EQUITY), float(env.MAX_DAILY_LOSS_PCT), now_ts):
+                    notifier.send("Max daily loss reached. Halting new entries.")
+                    break
+                if ledger_kill_switch(broker.ledger, float(env.BASE_EQUITY), float(env.MAX_DAILY_LOSS_PCT)):
+                    logger.warning("Kill switch activated. Stopping loop.")
+                    break
 
-            sig = generate_signal(df[["open", "high", "low", "close", "volume"]], cfg)
-            ref_ts = df.iloc[-2]["timestamp"]
-            if sig != "buy" or last_signal_ts.get(symbol) == ref_ts:
-                continue
+                # Per-pair notional cap and global open trades cap
+                if len(broker.open_positions) >= int(cfg.max_open_trades):
+                    continue
+                if notional_open_for(symbol) >= per_pair_cap(symbol):
+                    continue
 
-            # Correlation guard
-            if not correlation_guard(symbol, df):
-                last_signal_ts[symbol] = ref_ts
-                continue
+                ref_ts = df.iloc[-2]["timestamp"]
+                if last_evaluated_ts.get(symbol) == ref_ts:
+                    continue  # no new closed candle since the last evaluation
+                last_evaluated_ts[symbol] = ref_ts
+                work, cols = _stream_indicators(indicator_states, symbol, df, cfg)
+                sig = generate_signal(work[cols], cfg)
+                if sig != "buy" or last_signal_ts.get(symbol) == ref_ts:
+                    continue
 
-            entry = float(df.iloc[-2]["close"])  # last closed
-            stop = compute_stop(entry, atr=entry * 0.0 + 1.0, k=cfg.atr_k)  # placeholder ATR
-            rr = float(cfg.risk_rr)
-            tp = entry + (entry - stop) * rr
-            try:
-                qty = position_size(entry, stop, broker.equity, float(env.RISK_PER_TRADE_PCT), step=0.0)
-            except Exception:
-                qty = 0.0
-            if qty > 0:
-                # Enforce per-pair notional cap by resizing qty if needed
-                cap = per_pair_cap(symbol)
-                notional = entry * qty
-                if notional > cap > 0:
-                    qty = cap / max(entry, 1e-12)
-                if qty <= 0:
+                # Correlation guard
+                if not correlation_guard(symbol):
+                    last_signal_ts[symbol] = ref_ts
                     continue
-                t = broker.buy(symbol, entry, qty, stop, tp)
-                last_signal_ts[symbol] = ref_ts
-                msg = f"BUY {t.symbol} qty={t.qty} entry={t.entry_price} stop={t.stop_price} tp={t.take_profit}"
-                logger.info(msg)
-                notifier.send(msg)
 
-        # Update stops/tps with the latest candle only for symbols we just processed
-        # Using the last fetched df is fine for simplicity in this loop.
-        # In a real loop, maintain per-symbol recent candles.
-        broker.update_prices(df.tail(1))
+                entry = float(df.iloc[-2]["close"])  # last closed
+                stop = compute_stop(entry, atr=entry * 0.0 + 1.0, k=cfg.atr_k)  # placeholder ATR
+                rr = float(cfg.risk_rr)
+                tp = entry + (entry - stop) * rr
+                try:
+                    qty = position_size(entry, stop, broker.equity, float(env.RISK_PER_TRADE_PCT), step=0.0)
+                except Exception:
+                    qty = 0.0
+                if qty > 0:
+                    # Enforce per-pair notional cap by resizing qty if needed
+                    cap = per_pair_cap(symbol)
+                    notional = entry * qty
+                    if notional > cap > 0:
+                        qty = cap / max(entry, 1e-12)
+                    if qty <= 0:
+                        continue
+                    t = broker.buy(symbol, entry, qty, stop, tp, ts=now_ts)
+                    last_signal_ts[symbol] = ref_ts
+                    msg = f"BUY {t.symbol} qty={t.qty} entry={t.entry_price} stop={t.stop_price} tp={t.take_profit}"
+                    logger.info(msg)
+                    notifier.send(msg)
+
+            # Update stops/tps with the latest candle only for symbols we just processed
+            # Using the last fetched df is fine for simplicity in this loop.
+            # In a real loop, maintain per-symbol recent candles.
+            broker.update_prices(df.tail(1))
+
+            for t in broker.trade_log[n_closed:]:
+                live.update_trade(t.pnl)
+            n_closed = len(broker.trade_log)
+            live.update_equity(broker.equity)
+            m = live.result(years=1.0)
+            logger.info(
+                f"paper metrics | equity={broker.equity:.2f} trades={m['n_trades']} winrate={m['winrate']:.2f} "
+                f"pf={m['pf']:.2f} max_dd={m['max_dd']:.4f}"
+            )
 
-        if sleep_seconds:
-            sleep(sleep_seconds)
+            if scheduler is not None:
+                if it < max_iterations:
+                    scheduler.wait()
+            elif sleep_seconds and stream is None:
+                sleep(sleep_seconds)
+    finally:
+        if fetcher is not None:
+            fetcher.close()
+        if stream is not None:
+            stream.close()
 
     return broker
 
 
-def run_live(cfg: AppConfig, env: EnvVars, *, dry_run: bool = False, max_iterations: int = 1, sleep_seconds: int = 0):
+def run_live(
+    cfg: AppConfig,
+    env: EnvVars,
+    *,
+    dry_run: bool = False,
+    max_iterations: int = 1,
+    sleep_seconds: int = 0,
+    history: Optional[HistoryStore] = None,
+    base_timeframe: Optional[str] = None,
+    fetch_concurrency: int = 1,
+    align_to_close: bool = False,
+    stream_url: Optional[str] = None,
+):
     logger = setup_logger()
     notifier = Notifier(
         enabled=cfg.telegram_enabled,
@@ -311,11 +509,7 @@ def run_live(cfg: AppConfig, env: EnvVars, *, dry_run: bool = False, max_iterati
     setattr(ex, "dry_run", bool(dry_run))
 
     def per_pair_cap(symbol: str) -> float:
-        if cfg.pair_caps and symbol in cfg.pair_caps:
-            return float(cfg.pair_caps[symbol])
-        if getattr(cfg, "max_notional_usdt_per_pair", None):
-            return float(cfg.max_notional_usdt_per_pair)
-        return float(cfg.max_notional_per_trade_usdt)
+        return pair_notional_cap(cfg, symbol)
 
     # Determine base equity from quote balance or fallback
     def quote_from(symbol: str) -> str:
@@ -332,109 +526,129 @@ def run_live(cfg: AppConfig, env: EnvVars, *, dry_run: bool = False, max_iterati
     )
 
     last_signal_ts: Dict[str, Optional[int]] = {s: None for s in cfg.symbols_whitelist}
+    indicator_states = _warm_start(history, ex, list(cfg.symbols_whitelist), cfg, logger, base_timeframe)
+    feed = _candle_feed(ex, cfg, base_timeframe, history)
+    fetcher = _concurrent_fetcher(cfg, env, fetch_concurrency, base_timeframe)
+    scheduler = _candle_scheduler(ex, cfg, logger) if align_to_close and not stream_url else None
+    # Last closed candle each symbol's signal was evaluated on
+    last_evaluated_ts: Dict[str, Optional[int]] = {}
+
+    # Recent candles per symbol; after the first backfill only new candles are fetched
+    cache = CandleCache(cfg.timeframe, capacity=200)
+
+    def fetch_rows(syms: List[str], limit: int) -> Dict[str, list]:
+        return _fetch_snapshot(feed, fetcher, syms, cfg.timeframe, limit)
+
+    def refetch(syms: List[str]) -> Dict[str, list]:
+        return fetch_rows(syms, max(cache.fetch_limit(s) for s in syms))
+
+    # Rolling return correlations of all symbols, updated once per closed candle
+    correlations = RollingCorrelation(cfg.symbols_whitelist, window=100)
+    # Candle closes pushed over a websocket instead of polled (REST still backfills)
+    stream = _kline_stream(cfg.symbols_whitelist, cfg, stream_url, logger) if stream_url else None
+    seen_reconnects = 0
 
-    def correlation_guard(symbol_new: str, df_new: pd.DataFrame) -> bool:
+    def correlation_guard(symbol_new: str) -> bool:
         threshold = float(getattr(cfg, "correlation_threshold", 0.85))
         max_corr = int(getattr(cfg, "max_correlated_trades", 2))
-        N = 100
-        returns_new = df_new["close"].astype(float).pct_change().tail(N)
-        correlated_count = 0
-        open_syms: Dict[str, bool] = {}
         # In live mode we don't track open positions here; rely on exchange/accounting integration later.
         # For now, we use last_signal_ts as a proxy to limit newly attempted entries across correlated pairs.
-        for sym in cfg.symbols_whitelist:
-            if sym == symbol_new:
-                continue
-            if last_signal_ts.get(sym) is None:
-                continue
-            try:
-                candles = ex.fetch_ohlcv(sym, cfg.timeframe, limit=N + 5)
-                df_o = pd.DataFrame(candles, columns=["timestamp", "open", "high", "low", "close", "volume"]).sort_values("timestamp")
-                returns_o = df_o["close"].astype(float).pct_change().tail(N)
-                joined = pd.concat([returns_new.reset_index(drop=True), returns_o.reset_index(drop=True)], axis=1).dropna()
-                if len(joined) < 10:
-                    continue
-                corr = joined.iloc[:, 0].corr(joined.iloc[:, 1])
-                if pd.notna(corr) and corr > threshold:
-                    correlated_count += 1
-            except Exception:
-                continue
+        signaled = [sym for sym in cfg.symbols_whitelist if last_signal_ts.get(sym) is not None]
+        correlated_count = correlations.count_correlated(symbol_new, signaled, threshold)
         return correlated_count < max_corr
 
     it = 0
-    while it < max_iterations:
-        it += 1
-        for symbol in cfg.symbols_whitelist:
-            candles = ex.fetch_ohlcv(symbol, cfg.timeframe, limit=200)
-            df = pd.DataFrame(
-                candles, columns=["timestamp", "open", "high", "low", "close", "volume"]
-            ).sort_values("timestamp")
-
-            # Kill switch check
-            if kill_switch([], base_equity, float(env.MAX_DAILY_LOSS_PCT)):
-                logger.warning("Kill switch engaged; skipping new entries.")
-                notifier.send("Kill switch engaged; skipping new entries.")
-                continue
+    try:
+        while it < max_iterations:
+            it += 1
+            if stream is not None and it > 1:
+                seen_reconnects = _apply_stream(stream, cache, fetch_rows, cfg.symbols_whitelist, seen_reconnects, logger)
+            else:
+                rows = cache.refresh(fetch_rows, cfg.symbols_whitelist)
+                if scheduler is not None:
+                    cache.merge(scheduler.await_closed(refetch, rows), fetch_rows)
+            correlations.update({s: cache.frame(s).iloc[:-1] for s in cfg.symbols_whitelist if s in cache})
+            for symbol in cfg.symbols_whitelist:
+                # Zero-copy view of the ring buffer, oldest candle first
+                df = cache.frame(symbol)
+
+                # Kill switch check
+                if kill_switch([], base_equity, float(env.MAX_DAILY_LOSS_PCT)):
+                    logger.warning("Kill switch engaged; skipping new entries.")
+                    notifier.send("Kill switch engaged; skipping new entries.")
+                    continue
 
-            sig = generate_signal(df[["open", "high", "low", "close", "volume"]], cfg)
-            ref_ts = df.iloc[-2]["timestamp"]
-            if sig != "buy" or last_signal_ts.get(symbol) == ref_ts:
-                continue
+                ref_ts = df.iloc[-2]["timestamp"]
+                if last_evaluated_ts.get(symbol) == ref_ts:
+                    continue  # no new closed candle since the last evaluation
+                last_evaluated_ts[symbol] = ref_ts
+                work, cols = _stream_indicators(indicator_states, symbol, df, cfg)
+                sig = generate_signal(work[cols], cfg)
+                if sig != "buy" or last_signal_ts.get(symbol) == ref_ts:
+                    continue
 
-            entry = float(df.iloc[-2]["close"])  # last closed candle
-            stop = compute_stop(entry, atr=1.0, k=cfg.atr_k)
-            tp = entry + (entry - stop) * float(cfg.risk_rr)
+                entry = float(df.iloc[-2]["close"])  # last closed candle
+                stop = compute_stop(entry, atr=1.0, k=cfg.atr_k)
+                tp = entry + (entry - stop) * float(cfg.risk_rr)
 
-            # Notional cap per pair
-            cap = per_pair_cap(symbol)
-            try:
-                equity_now = float(ex.get_balance(quote))
-            except Exception:
-                equity_now = base_equity
-            try:
-                qty = position_size(entry, stop, equity_now, float(env.RISK_PER_TRADE_PCT), step=0.0)
-            except Exception:
-                qty = 0.0
-            if qty <= 0:
-                continue
-            notional = entry * qty
-            if notional > cap:
-                # resize to cap
-                qty = cap / max(entry, 1e-12)
+                # Notional cap per pair
+                cap = per_pair_cap(symbol)
+                try:
+                    equity_now = float(ex.get_balance(quote))
+                except Exception:
+                    equity_now = base_equity
+                try:
+                    qty = position_size(entry, stop, equity_now, float(env.RISK_PER_TRADE_PCT), step=0.0)
+                except Exception:
+                    qty = 0.0
+                if qty <= 0:
+                    continue
+                notional = entry * qty
+                if notional > cap:
+                    # resize to cap
+                    qty = cap / max(entry, 1e-12)
 
-            # Correlation guard against recently signaled pairs
-            if not correlation_guard(symbol, df):
-                last_signal_ts[symbol] = ref_ts
-                continue
+                # Correlation guard against recently signaled pairs
+                if not correlation_guard(symbol):
+                    last_signal_ts[symbol] = ref_ts
+                    continue
+
+                if dry_run:
+                    msg = f"DRY-RUN would BUY {symbol} qty={qty:.8f} entry={entry} stop={stop} tp={tp}"
+                    logger.info(msg)
+                    notifier.send(msg)
+                    last_signal_ts[symbol] = ref_ts
+                    # In dry-run we also log what watcher would do (no thread spawned)
+                    logger.info(f"DRY-RUN watcher active for {symbol}: would cancel opposite leg if one fills")
+                    continue
 
-            if dry_run:
-                msg = f"DRY-RUN would BUY {symbol} qty={qty:.8f} entry={entry} stop={stop} tp={tp}"
+                # Place real orders
+                buy_res = ex.create_market_buy(symbol, qty)
+                oco_res = ex.place_oco_takeprofit_stoploss(symbol, qty, tp, stop)
+                last_signal_ts[symbol] = ref_ts
+                msg = (
+                    f"LIVE BUY {symbol} qty={qty:.8f} entry={entry} -> order={buy_res.get('id')} "
+                    f"oco(tp={oco_res.get('tp_order_id')}, sl={oco_res.get('sl_order_id')})"
+                )
                 logger.info(msg)
                 notifier.send(msg)
-                last_signal_ts[symbol] = ref_ts
-                # In dry-run we also log what watcher would do (no thread spawned)
-                logger.info(f"DRY-RUN watcher active for {symbol}: would cancel opposite leg if one fills")
-                continue
 
-            # Place real orders
-            buy_res = ex.create_market_buy(symbol, qty)
-            oco_res = ex.place_oco_takeprofit_stoploss(symbol, qty, tp, stop)
-            last_signal_ts[symbol] = ref_ts
-            msg = (
-                f"LIVE BUY {symbol} qty={qty:.8f} entry={entry} -> order={buy_res.get('id')} "
-                f"oco(tp={oco_res.get('tp_order_id')}, sl={oco_res.get('sl_order_id')})"
-            )
-            logger.info(msg)
-            notifier.send(msg)
+                # Start watcher for this symbol to manage OCO cancellation on fill
+                try:
+                    watch_open_orders(ex, symbol, poll_sec=max(sleep_seconds, 0.25), logger=logger)
+                except Exception as e:
+                    logger.warning(f"Failed to start watcher for {symbol}: {e}")
 
-            # Start watcher for this symbol to manage OCO cancellation on fill
-            try:
-                watch_open_orders(ex, symbol, poll_sec=max(sleep_seconds, 0.25), logger=logger)
-            except Exception as e:
-                logger.warning(f"Failed to start watcher for {symbol}: {e}")
-
-        if sleep_seconds:
-            sleep(sleep_seconds)
+            if scheduler is not None:
+                if it < max_iterations:
+                    scheduler.wait()
+            elif sleep_seconds and stream is None:
+                sleep(sleep_seconds)
+    finally:
+        if fetcher is not None:
+            fetcher.close()
+        if stream is not None:
+            stream.close()
 
 
 def main():
@@ -444,6 +658,16 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Do not place orders; log intents only")
     parser.add_argument("--config", type=str, default="config/config.yaml")
     parser.add_argument("--iterations", type=int, default=0, help="Max iterations for loops")
+    parser.add_argument("--history-dir", type=str, default="", help="Warm-start from a local candle store")
+    parser.add_argument("--base-timeframe", type=str, default="", help="Resample cfg.timeframe from this base (e.g. 1m)")
+    parser.add_argument("--align-to-close", action="store_true",
+                        help="Wake just after each candle close (exchange clock) instead of sleeping")
+    parser.add_argument("--fetch-concurrency", type=int, default=8,
+                        help="Symbols fetched concurrently per iteration (asyncio); 1 = sequential")
+    parser.add_argument("--stream", action="store_true",
+                        help="React to candle closes pushed over the kline websocket instead of polling")
+    parser.add_argument("--stream-url", type=str, default=BINANCE_WS,
+                        help="Kline websocket base URL (e.g. a local bot.stream_replay server)")
     args = parser.parse_args()
 
     logger = setup_logger()
@@ -459,6 +683,12 @@ def main():
     live = bool(getattr(args, "live", False))
     dry_run = bool(getattr(args, "dry_run", False))
     iters_arg = int(getattr(args, "iterations", 0) or 0)
+    history_dir = str(getattr(args, "history_dir", "") or "")
+    history = HistoryStore(Path(history_dir)) if history_dir else None
+    base_tf = str(getattr(args, "base_timeframe", "") or "") or None
+    concurrency = int(getattr(args, "fetch_concurrency", 1) or 1)
+    align = bool(getattr(args, "align_to_close", False))
+    stream_url = str(getattr(args, "stream_url", "") or BINANCE_WS) if getattr(args, "stream", False) else None
 
     banner = (
         f"trade-bot starting | exchange={cfg.exchange} tf={cfg.timeframe} "
@@ -470,12 +700,18 @@ def main():
     iters = iters_arg if iters_arg > 0 else 3
     if paper and not live:
         try:
-            run_paper(cfg, env, max_iterations=iters, sleep_seconds=0)
+            run_paper(
+                cfg, env, max_iterations=iters, sleep_seconds=0, history=history, base_timeframe=base_tf,
+                fetch_concurrency=concurrency, align_to_close=align, stream_url=stream_url,
+            )
         except ExchangeError as e:
             logger.warning(f"paper mode aborted due to exchange error: {e}")
     elif live:
         try:
-            run_live(cfg, env, dry_run=dry_run, max_iterations=iters, sleep_seconds=0)
+            run_live(
+                cfg, env, dry_run=dry_run, max_iterations=iters, sleep_seconds=0, history=history, base_timeframe=base_tf,
+                fetch_concurrency=concurrency, align_to_close=align, stream_url=stream_url,
+            )
         except ExchangeError as e:
             logger.warning(f"live mode aborted due to exchange error: {e}")
     else:
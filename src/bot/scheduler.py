@@ -0,0 +1,128 @@
+"""Candle-close-aligned wake-ups for the runner loops.
+
+Instead of sleeping a fixed interval, the loop sleeps until just after the next
+`timeframe` boundary in *exchange* time (local clock corrected by the measured
+server offset), then polls briefly until the candle that just closed is served.
+Lateness (boundary -> wake-up, boundary -> closed candle available) is logged
+every iteration.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from .history import timeframe_to_ms
+
+
+def measure_clock_offset(
+    exchange: Any, *, samples: int = 3, clock: Callable[[], float] = time.time
+) -> int:
+    """Exchange server time minus local time in ms (0 when unavailable).
+
+    Each sample is compared against the midpoint of its request; the one with
+    the shortest round-trip is used.
+    """
+    fetch_time = getattr(exchange, "fetch_time", None)
+    if fetch_time is None:
+        return 0
+    best: Optional[tuple] = None
+    for _ in range(max(1, int(samples))):
+        t0 = clock()
+        try:
+            server_ms = int(fetch_time())
+        except Exception as e:
+            logger.warning(f"clock sync failed: {e}")
+            continue
+        t1 = clock()
+        rtt = t1 - t0
+        offset = server_ms - int((t0 + t1) / 2 * 1000)
+        if best is None or rtt < best[0]:
+            best = (rtt, offset)
+    return 0 if best is None else int(best[1])
+
+
+def last_closed_ts(candles: List[list]) -> Optional[int]:
+    """Timestamp of the last closed candle; the exchange's last row is still forming."""
+    return int(candles[-2][0]) if len(candles) >= 2 else None
+
+
+class CandleScheduler:
+    """Sleeps until just after each `timeframe` boundary in exchange time."""
+
+    def __init__(
+        self,
+        timeframe: str,
+        *,
+        offset_ms: int = 0,
+        delay_ms: int = 250,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.timeframe = timeframe
+        self.tf_ms = timeframe_to_ms(timeframe)
+        self.offset_ms = int(offset_ms)
+        self.delay_ms = int(delay_ms)
+        self._clock = clock
+        self._sleep = sleep
+        self.boundary: Optional[int] = None
+
+    def server_now_ms(self) -> int:
+        return int(self._clock() * 1000) + self.offset_ms
+
+    def next_boundary(self, now_ms: Optional[int] = None) -> int:
+        now_ms = self.server_now_ms() if now_ms is None else int(now_ms)
+        return (now_ms // self.tf_ms + 1) * self.tf_ms
+
+    def expected_closed_ts(self) -> Optional[int]:
+        """Open time of the candle that closed at the current boundary."""
+        return None if self.boundary is None else self.boundary - self.tf_ms
+
+    def wait(self) -> int:
+        """Sleep until `delay_ms` after the next boundary; returns the boundary (ms)."""
+        boundary = self.next_boundary()
+        wait_s = (boundary + self.delay_ms - self.server_now_ms()) / 1000.0
+        if wait_s > 0:
+            self._sleep(wait_s)
+        self.boundary = boundary
+        logger.info(f"candle close {self.timeframe} | boundary={boundary} woke_late_ms={self.lateness_ms()}")
+        return boundary
+
+    def lateness_ms(self) -> int:
+        """Exchange time elapsed since the current boundary."""
+        return 0 if self.boundary is None else self.server_now_ms() - self.boundary
+
+    def await_closed(
+        self,
+        fetch: Callable[[List[str]], Dict[str, List[list]]],
+        candles: Dict[str, List[list]],
+        *,
+        retries: int = 5,
+        retry_delay: float = 0.5,
+    ) -> Dict[str, List[list]]:
+        """Re-fetch symbols whose newly closed candle is not served yet.
+
+        `candles` maps symbol -> rows from the first fetch after `wait`; `fetch`
+        re-requests a list of symbols. Gives up after `retries` rounds and
+        returns what it has.
+        """
+        expected = self.expected_closed_ts()
+        if expected is None:
+            return candles
+        out = dict(candles)
+
+        def _stale(symbols: Iterable[str]) -> List[str]:
+            return [s for s in symbols if (last_closed_ts(out[s]) or -1) < expected]
+
+        stale = _stale(out)
+        for _ in range(max(0, int(retries))):
+            if not stale:
+                break
+            self._sleep(retry_delay)
+            out.update(fetch(stale))
+            stale = _stale(stale)
+        if stale:
+            logger.warning(f"candle close {self.timeframe} | closed candle {expected} still missing for {stale}")
+        logger.info(f"candle close {self.timeframe} | boundary={self.boundary} data_ready_late_ms={self.lateness_ms()}")
+        return out
@@ -5,8 +5,10 @@ on the last CLOSED candle (i.e., ignores the potentially incomplete last row).
 """
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
+from .cache import IndicatorCache, dataset_fingerprint
 from .config import AppConfig
 
 
@@ -30,12 +32,39 @@ def _rsi(series: pd.Series, period: int) -> pd.Series:
     return rsi
 
 
-def calculate_indicators(df: pd.DataFrame, cfg: AppConfig) -> pd.DataFrame:
+def _adx(high: pd.Series, low: pd.Series, close: pd.Series, period: int) -> pd.Series:
+    """Wilder ADX from high/low/close series."""
+    close_shift = close.shift(1)
+    tr = (high.combine(close_shift, lambda h, c: abs(h - c) if pd.notna(c) else 0.0))
+    tr = tr.combine(low.combine(close_shift, lambda l, c: abs(l - c) if pd.notna(c) else 0.0), max)
+    tr = tr.combine(high - low, max)
+    atr = tr.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean()
+
+    up_move = high.diff()
+    down_move = -low.diff()
+    plus_dm = up_move.mask((up_move <= down_move) | (up_move <= 0), 0.0)
+    minus_dm = down_move.mask((down_move <= up_move) | (down_move <= 0), 0.0)
+    plus_di = 100 * (plus_dm.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean() / atr)
+    minus_di = 100 * (minus_dm.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean() / atr)
+    dx = (100 * (plus_di - minus_di).abs() / (plus_di + minus_di)).fillna(0.0)
+    return dx.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean()
+
+
+def calculate_indicators(
+    df: pd.DataFrame,
+    cfg: AppConfig,
+    *,
+    cache: Optional[IndicatorCache] = None,
+    fingerprint: Optional[str] = None,
+) -> pd.DataFrame:
     """Return a copy of df with precomputed indicator columns.
 
     Inputs
     - df: DataFrame with columns: open, high, low, close, volume. Timestamp column is optional.
     - cfg: AppConfig with parameters for EMA/RSI (and optional filters).
+    - cache: optional IndicatorCache; each series is then looked up by
+      (fingerprint, indicator, parameters) and computed only on a miss.
+    - fingerprint: dataset hash for cache keys; computed from df when omitted.
 
     Outputs
     - DataFrame including the following columns:
@@ -51,37 +80,35 @@ def calculate_indicators(df: pd.DataFrame, cfg: AppConfig) -> pd.DataFrame:
     if df is None or df.empty:
         return df
 
+    if cache is not None and fingerprint is None:
+        fingerprint = dataset_fingerprint(df)
+
+    def series(name: str, param: int, compute):
+        if cache is None:
+            return compute()
+        return cache.get_or_compute((fingerprint, name, param), lambda: compute().to_numpy())
+
     out = df.copy()
     close = out["close"].astype(float)
-    out["ema_fast"] = _ema(close, cfg.ema_fast)
-    out["ema_slow"] = _ema(close, cfg.ema_slow)
-    out["rsi"] = _rsi(close, cfg.rsi_period)
+    out["ema_fast"] = series("ema", int(cfg.ema_fast), lambda: _ema(close, cfg.ema_fast))
+    out["ema_slow"] = series("ema", int(cfg.ema_slow), lambda: _ema(close, cfg.ema_slow))
+    out["rsi"] = series("rsi", int(cfg.rsi_period), lambda: _rsi(close, cfg.rsi_period))
 
     # Optional filters if exposed in config without changing existing behavior
     # ADX (Average Directional Index)
     if getattr(cfg, "enable_adx", False):
         high = out["high"].astype(float)
         low = out["low"].astype(float)
-        close_shift = close.shift(1)
-        tr = (high.combine(close_shift, lambda h, c: abs(h - c) if pd.notna(c) else 0.0))
-        tr = tr.combine(low.combine(close_shift, lambda l, c: abs(l - c) if pd.notna(c) else 0.0), max)
-        tr = tr.combine(high - low, max)
         period = int(getattr(cfg, "adx_period", 14))
-        atr = tr.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean()
-
-        up_move = high.diff()
-        down_move = -low.diff()
-        plus_dm = up_move.mask((up_move <= down_move) | (up_move <= 0), 0.0)
-        minus_dm = down_move.mask((down_move <= up_move) | (down_move <= 0), 0.0)
-        plus_di = 100 * (plus_dm.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean() / atr)
-        minus_di = 100 * (minus_dm.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean() / atr)
-        dx = (100 * (plus_di - minus_di).abs() / (plus_di + minus_di)).fillna(0.0)
-        out["adx"] = dx.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean()
+        out["adx"] = series("adx", period, lambda: _adx(high, low, close, period))
 
     # Volume SMA filter
     if getattr(cfg, "enable_vol_filter", False):
         vol_period = int(getattr(cfg, "vol_sma_period", 20))
-        out["vol_sma"] = out["volume"].astype(float).rolling(vol_period, min_periods=vol_period).mean()
+        volume = out["volume"].astype(float)
+        out["vol_sma"] = series(
+            "vol_sma", vol_period, lambda: volume.rolling(vol_period, min_periods=vol_period).mean()
+        )
 
     return out
 
@@ -171,3 +198,63 @@ def generate_signal(df: pd.DataFrame, cfg: AppConfig) -> Optional[str]:
     if pullback and cond_trend and cond_momentum and cond_close_above_fast and cond_adx and cond_vol:
         return "buy"
     return None
+
+
+def entry_signals(
+    df: pd.DataFrame,
+    cfg: AppConfig,
+    *,
+    cache: Optional[IndicatorCache] = None,
+    fingerprint: Optional[str] = None,
+) -> np.ndarray:
+    """Vectorized counterpart of `generate_signal` over a full history.
+
+    Returns a boolean array aligned with the rows of df where element j is True
+    when `generate_signal` would return "buy" with candle j as the last CLOSED
+    candle, i.e. for the frame df.iloc[: j + 2]. Indicators are computed once over
+    the whole series; all of them are causal, so the value at j never depends on
+    rows after j and the mask is lookahead-free. `cache`/`fingerprint` are passed
+    through to `calculate_indicators`.
+    """
+    n = 0 if df is None else len(df)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+
+    work = df
+    missing = not {"ema_fast", "ema_slow", "rsi"}.issubset(work.columns)
+    missing |= bool(getattr(cfg, "enable_adx", False)) and "adx" not in work.columns
+    missing |= bool(getattr(cfg, "enable_vol_filter", False)) and "vol_sma" not in work.columns
+    if missing:
+        work = calculate_indicators(work, cfg, cache=cache, fingerprint=fingerprint)
+
+    close = work["close"].to_numpy(dtype=float)
+    ema_fast = work["ema_fast"].to_numpy(dtype=float)
+    ema_slow = work["ema_slow"].to_numpy(dtype=float)
+    rsi = work["rsi"].to_numpy(dtype=float)
+
+    # Same comparisons as the scalar helpers; NaN compares False everywhere
+    pullback = np.zeros(n, dtype=bool)
+    pullback[1:] = close[:-1] > close[1:]
+    cond_trend = ema_fast > ema_slow
+    rsi_margin = 3.0
+    cond_momentum = (rsi >= float(cfg.rsi_buy_min) - rsi_margin) & (
+        rsi <= float(cfg.rsi_buy_max) + rsi_margin
+    )
+    tol = (float(cfg.slippage_bps) / 10000.0) * np.abs(close)
+    cond_close_above_fast = close + tol >= ema_fast
+
+    mask = pullback & cond_trend & cond_momentum & cond_close_above_fast
+
+    if getattr(cfg, "enable_adx", False):
+        adx_threshold = float(getattr(cfg, "adx_threshold", 20.0))
+        mask &= work["adx"].to_numpy(dtype=float) >= adx_threshold
+
+    if getattr(cfg, "enable_vol_filter", False):
+        vf = float(getattr(cfg, "volume_factor", 1.5))
+        vol = work["volume"].to_numpy(dtype=float)
+        mask &= vol >= vf * work["vol_sma"].to_numpy(dtype=float)
+
+    # generate_signal requires min_len closed bars, i.e. j >= min_len - 1
+    min_len = max(cfg.ema_slow, cfg.rsi_period) + 2
+    mask[: min(n, min_len - 1)] = False
+    return mask
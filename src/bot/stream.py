@@ -0,0 +1,220 @@
+"""Push-based kline feed for the runner loops.
+
+`KlineStream` subscribes to the exchange's combined kline stream for every
+whitelisted symbol (Binance format, one websocket) on a background thread and
+queues the decoded updates. The loop blocks in `poll()` until a candle closes,
+so a close is acted on as soon as it is pushed instead of at the next REST poll.
+Dropped connections are re-opened with exponential backoff; `reconnects` lets
+the runner backfill the missed candles over REST.
+
+`bot.stream_replay.ReplayServer` serves the same messages from recorded
+candles on localhost.
+
+Needs the optional `websockets` package (>= 13).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from loguru import logger
+
+BINANCE_WS = "wss://stream.binance.com:9443"
+
+
+def stream_name(symbol: str, timeframe: str) -> str:
+    """Binance stream name, e.g. BTC/USDT, 1h -> btcusdt@kline_1h."""
+    return f"{symbol.replace('/', '').lower()}@kline_{timeframe}"
+
+
+def stream_url(base: str, symbols: Iterable[str], timeframe: str) -> str:
+    """Combined-stream URL subscribing to the klines of all `symbols`."""
+    names = "/".join(stream_name(s, timeframe) for s in symbols)
+    return f"{base.rstrip('/')}/stream?streams={names}"
+
+
+@dataclass(frozen=True)
+class Kline:
+    """One kline update: `row` is a ccxt OHLCV row; `closed` marks the final update."""
+
+    symbol: str
+    row: tuple
+    closed: bool
+
+
+def kline_message(symbol: str, timeframe: str, row: Iterable[Any], closed: bool, tf_ms: int) -> str:
+    """Encode a candle as a combined-stream kline message (the exchange's wire format)."""
+    ts, open_, high, low, close, vol = row
+    market = symbol.replace("/", "")
+    k = {
+        "t": int(ts), "T": int(ts) + int(tf_ms) - 1, "s": market, "i": timeframe,
+        "o": str(open_), "h": str(high), "l": str(low), "c": str(close), "v": str(vol), "x": bool(closed),
+    }
+    data = {"e": "kline", "E": int(ts), "s": market, "k": k}
+    return json.dumps({"stream": stream_name(symbol, timeframe), "data": data})
+
+
+def parse_kline(message: Union[str, bytes], symbols_by_market: Dict[str, str]) -> Optional[Kline]:
+    """Decode a kline message; None for other messages and unknown markets."""
+    try:
+        msg = json.loads(message)
+    except ValueError:
+        return None
+    data = msg.get("data", msg) if isinstance(msg, dict) else None
+    if not isinstance(data, dict) or data.get("e") != "kline":
+        return None
+    k = data["k"]
+    symbol = symbols_by_market.get(k.get("s"))
+    if symbol is None:
+        return None
+    row = (int(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"]))
+    return Kline(symbol, row, bool(k["x"]))
+
+
+class KlineStream:
+    """Kline updates of `symbols` from a websocket, received on a background thread.
+
+    Usage:
+        with KlineStream(symbols, "1h") as stream:
+            events = stream.poll(timeout=3600)
+    """
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        timeframe: str,
+        *,
+        base_url: str = BINANCE_WS,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ) -> None:
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.url = stream_url(base_url, self.symbols, timeframe)
+        self.reconnect_delay = float(reconnect_delay)
+        self.max_reconnect_delay = float(max_reconnect_delay)
+        self.reconnects = 0
+        self.connected = threading.Event()
+        self._markets = {s.replace("/", ""): s for s in self.symbols}
+        self._events: "queue.Queue[Kline]" = queue.Queue()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def _run(self) -> None:
+        from websockets.asyncio.client import connect
+
+        delay = self.reconnect_delay
+        opened = 0
+        while True:
+            try:
+                async with connect(self.url) as ws:
+                    if opened:
+                        self.reconnects += 1
+                        logger.info(f"kline stream reconnected ({self.reconnects})")
+                    opened += 1
+                    delay = self.reconnect_delay
+                    self.connected.set()
+                    async for message in ws:
+                        kline = parse_kline(message, self._markets)
+                        if kline is not None:
+                            self._events.put(kline)
+                logger.warning("kline stream closed by server")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"kline stream error: {e}")
+            self.connected.clear()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _thread_main(self) -> None:
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+
+    def start(self) -> "KlineStream":
+        if self._thread is None:
+            self._loop = asyncio.new_event_loop()
+            self._task = self._loop.create_task(self._run())
+            self._thread = threading.Thread(target=self._thread_main, name="kline-stream", daemon=True)
+            self._thread.start()
+        return self
+
+    def poll(self, timeout: float, *, settle: float = 0.5) -> List[Kline]:
+        """Block until a candle closes (or `timeout` s), then return all queued updates.
+
+        After the first close, waits up to `settle` s for the other symbols'
+        closes of the same candle so they are handled in one iteration.
+        """
+        deadline = time.monotonic() + float(timeout)
+        events: List[Kline] = []
+        closed_ts: Optional[int] = None
+        closed: set = set()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                kline = self._events.get(timeout=remaining)
+            except queue.Empty:
+                break
+            events.append(kline)
+            if not kline.closed:
+                continue
+            ts = int(kline.row[0])
+            if closed_ts is None or ts > closed_ts:
+                closed_ts, closed = ts, set()
+                deadline = min(deadline, time.monotonic() + float(settle))
+            if ts == closed_ts:
+                closed.add(kline.symbol)
+            if len(closed) == len(self.symbols):
+                break
+        # Updates that arrived in the meantime are returned now rather than next time
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        self._thread.join(timeout=5)
+        self._thread = None
+        self.connected.clear()
+
+    def __enter__(self) -> "KlineStream":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def stream_rows(events: Iterable[Kline], tf_ms: int) -> Dict[str, List[list]]:
+    """Kline updates as candle rows per symbol, for `CandleCache.merge`.
+
+    Each closed candle is followed by a flat placeholder for the next (forming)
+    candle, so the newest row is still the forming one, as with `fetch_ohlcv`;
+    its first pushed update overwrites the placeholder.
+    """
+    out: Dict[str, List[list]] = {}
+    for k in events:
+        rows = out.setdefault(k.symbol, [])
+        rows.append(list(k.row))
+        if k.closed:
+            ts, close = int(k.row[0]), float(k.row[4])
+            rows.append([ts + int(tf_ms), close, close, close, close, 0.0])
+    return out
@@ -0,0 +1,164 @@
+"""Local stand-in for the exchange kline stream, replaying recorded candles.
+
+Serves the combined-stream endpoint (`/stream?streams=btcusdt@kline_1h/...`)
+on localhost. Each subscriber receives, candle by candle in timestamp order, a
+forming update and then the closed kline of every subscribed symbol, with
+`interval` seconds between candles. The replay position is shared, so a client
+that reconnects resumes where it left off; `drop_after`/`gap` close the first
+connection after that many candles and skip `gap` candles, to exercise
+reconnects and REST backfill.
+
+CLI:
+  python -m bot.stream_replay --history-dir data/history --timeframe 1h --interval 1
+  python -m bot.runner --paper --stream --stream-url ws://127.0.0.1:8765
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+from loguru import logger
+
+from .history import timeframe_to_ms
+from .stream import kline_message, stream_name
+
+
+class ReplayServer:
+    """Websocket server pushing `candles` (symbol -> ccxt OHLCV rows) as klines.
+
+    Usage:
+        with ReplayServer(candles, "1h", interval=0.05) as server:
+            KlineStream(symbols, "1h", base_url=server.url)
+    """
+
+    def __init__(
+        self,
+        candles: Dict[str, Sequence[Sequence[float]]],
+        timeframe: str,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        interval: float = 0.0,
+        drop_after: Optional[int] = None,
+        gap: int = 0,
+    ) -> None:
+        self.timeframe = timeframe
+        self.tf_ms = timeframe_to_ms(timeframe)
+        self.host = host
+        self.port = int(port)
+        self.interval = float(interval)
+        self.drop_after = drop_after
+        self.gap = int(gap)
+        self.rows = {s: {int(r[0]): list(r) for r in rows} for s, rows in candles.items()}
+        self.timestamps: List[int] = sorted({ts for rows in self.rows.values() for ts in rows})
+        self.position = 0  # next candle to replay
+        self.connections = 0
+        self._by_stream = {stream_name(s, timeframe): s for s in self.rows}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def _subscribed(self, path: str) -> List[str]:
+        names = parse_qs(urlsplit(path).query).get("streams", [""])[0].split("/")
+        return [self._by_stream[n] for n in names if n in self._by_stream]
+
+    async def _handler(self, ws) -> None:
+        from websockets.exceptions import ConnectionClosed
+
+        self.connections += 1
+        symbols = self._subscribed(ws.request.path)
+        drop = self.drop_after if self.connections == 1 else None
+        try:
+            await self._replay(ws, symbols, drop)
+        except ConnectionClosed:
+            logger.info("replay: client disconnected")
+
+    async def _replay(self, ws, symbols: List[str], drop: Optional[int]) -> None:
+        sent = 0
+        while self.position < len(self.timestamps):
+            if drop is not None and sent >= drop:
+                self.position += self.gap
+                logger.info(f"replay: dropping connection, skipping {self.gap} candles")
+                await ws.close()
+                return
+            ts = self.timestamps[self.position]
+            for s in symbols:
+                row = self.rows[s].get(ts)
+                if row is not None:
+                    await ws.send(kline_message(s, self.timeframe, row, False, self.tf_ms))
+                    await ws.send(kline_message(s, self.timeframe, row, True, self.tf_ms))
+            self.position += 1
+            sent += 1
+            await asyncio.sleep(self.interval)
+        await ws.wait_closed()
+
+    async def _serve(self) -> None:
+        from websockets.asyncio.server import serve
+
+        self._stop = asyncio.Event()
+        async with serve(self._handler, self.host, self.port) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._stop.wait()
+
+    def start(self) -> "ReplayServer":
+        """Serve on a background thread; returns once the port is bound."""
+        if self._thread is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_until_complete, args=(self._serve(),), name="kline-replay", daemon=True
+            )
+            self._thread.start()
+            self._ready.wait(timeout=5)
+        return self
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._thread = None
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    from .config import load_config
+    from .history import HistoryStore
+
+    p = argparse.ArgumentParser()
+    p.add_argument("--config", type=str, default="config/config.yaml")
+    p.add_argument("--history-dir", type=str, default="data/history")
+    p.add_argument("--timeframe", type=str, default="")
+    p.add_argument("--symbols", type=str, default="", help="Comma-separated subset of the whitelist")
+    p.add_argument("--last", type=int, default=500, help="Replay the last N stored candles per symbol")
+    p.add_argument("--interval", type=float, default=1.0, help="Seconds between candles")
+    p.add_argument("--port", type=int, default=8765)
+    args = p.parse_args()
+
+    cfg, _ = load_config(Path(args.config))
+    timeframe = args.timeframe or cfg.timeframe
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()] or list(cfg.symbols_whitelist)
+    store = HistoryStore(Path(args.history_dir))
+    candles = {s: store.frame(s, timeframe).tail(args.last).to_numpy().tolist() for s in symbols}
+    server = ReplayServer(candles, timeframe, port=args.port, interval=args.interval)
+    print(f"Replaying {timeframe} klines of {symbols} on {server.url}")
+    asyncio.run(server._serve())
+
+
+if __name__ == "__main__":
+    main()
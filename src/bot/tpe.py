@@ -0,0 +1,185 @@
+"""Tree-structured Parzen Estimator (TPE) sampler over a box of typed parameters.
+
+Observations are split into a "good" top-gamma fraction and the rest. Each group
+is modelled per dimension as a mixture of truncated Gaussians on the unit
+interval (one component per observation plus a wide prior). Candidates are drawn
+from the good model and ranked by log l(x) - log g(x). Only numpy/scipy are used.
+
+Usage:
+    sampler = TPESampler(space, seed=1)
+    for params in sampler.ask(8):
+        sampler.tell(params, score)   # higher is better
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.stats import norm
+
+
+@dataclass(frozen=True)
+class Param:
+    """One search dimension with inclusive bounds; ints are rounded when decoded."""
+
+    name: str
+    low: float
+    high: float
+    kind: str = "float"  # "int" or "float"
+    log: bool = False
+
+    def __post_init__(self) -> None:
+        if self.kind not in ("int", "float"):
+            raise ValueError(f"Unsupported kind for {self.name}: {self.kind}")
+        if not self.high > self.low:
+            raise ValueError(f"Empty range for {self.name}: [{self.low}, {self.high}]")
+        if self.log and self.low <= 0:
+            raise ValueError(f"Log-scaled {self.name} needs a positive lower bound")
+
+    def _lo_hi(self) -> Tuple[float, float]:
+        if self.log:
+            return math.log(self.low), math.log(self.high)
+        return float(self.low), float(self.high)
+
+    def to_unit(self, value: float) -> float:
+        lo, hi = self._lo_hi()
+        v = math.log(value) if self.log else float(value)
+        return min(1.0, max(0.0, (v - lo) / (hi - lo)))
+
+    def from_unit(self, u: float):
+        lo, hi = self._lo_hi()
+        v = lo + min(1.0, max(0.0, float(u))) * (hi - lo)
+        if self.log:
+            v = math.exp(v)
+        if self.kind == "int":
+            return int(min(self.high, max(self.low, round(v))))
+        return float(min(self.high, max(self.low, v)))
+
+    @property
+    def min_bandwidth(self) -> float:
+        # Integer dims: about one step, so neighbouring values stay distinguishable
+        if self.kind == "int":
+            return 0.5 / max(1.0, self.high - self.low)
+        return 0.01
+
+
+class _Parzen:
+    """1-D mixture of Gaussians truncated to [0, 1]."""
+
+    def __init__(self, points: np.ndarray, min_bw: float) -> None:
+        mus = np.sort(np.asarray(points, dtype=float))
+        # Bandwidth per point: the larger gap to its neighbours (bounds count as neighbours)
+        padded = np.concatenate(([0.0], mus, [1.0]))
+        sig = np.maximum(padded[1:-1] - padded[:-2], padded[2:] - padded[1:-1])
+        sig = np.clip(sig, min_bw, 1.0)
+        # Wide prior component keeps every region reachable
+        self.mus = np.concatenate((mus, [0.5]))
+        self.sig = np.concatenate((sig, [1.0]))
+        self.w = np.full(len(self.mus), 1.0 / len(self.mus))
+        self._mass = norm.cdf((1.0 - self.mus) / self.sig) - norm.cdf((0.0 - self.mus) / self.sig)
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        comp = rng.choice(len(self.mus), size=n, p=self.w)
+        # Inverse-CDF draw from the chosen truncated component
+        a = norm.cdf((0.0 - self.mus[comp]) / self.sig[comp])
+        b = norm.cdf((1.0 - self.mus[comp]) / self.sig[comp])
+        u = a + rng.uniform(size=n) * (b - a)
+        x = self.mus[comp] + self.sig[comp] * norm.ppf(np.clip(u, 1e-12, 1 - 1e-12))
+        return np.clip(x, 0.0, 1.0)
+
+    def logpdf(self, x: np.ndarray) -> np.ndarray:
+        z = (np.asarray(x, dtype=float)[:, None] - self.mus[None, :]) / self.sig[None, :]
+        dens = norm.pdf(z) / (self.sig * self._mass)[None, :]
+        return np.log(np.maximum((dens * self.w[None, :]).sum(axis=1), 1e-300))
+
+
+class TPESampler:
+    """Batch ask/tell TPE over `space`; `constraint(params)` rejects invalid combos."""
+
+    def __init__(
+        self,
+        space: Sequence[Param],
+        *,
+        gamma: float = 0.25,
+        n_startup: int = 10,
+        n_candidates: int = 64,
+        constraint: Optional[Callable[[Dict[str, float]], bool]] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.space = list(space)
+        self.gamma = float(gamma)
+        self.n_startup = int(n_startup)
+        self.n_candidates = int(n_candidates)
+        self.constraint = constraint
+        self.rng = np.random.default_rng(seed)
+        self._x: List[np.ndarray] = []
+        self._y: List[float] = []
+        self._seen: set = set()
+
+    def _decode(self, u: np.ndarray) -> Dict[str, float]:
+        return {p.name: p.from_unit(v) for p, v in zip(self.space, u)}
+
+    def _key(self, params: Dict[str, float]) -> Tuple:
+        return tuple(params[p.name] for p in self.space)
+
+    def _accept(self, params: Dict[str, float], taken: set) -> bool:
+        key = self._key(params)
+        if key in self._seen or key in taken:
+            return False
+        return self.constraint is None or bool(self.constraint(params))
+
+    def _random(self, n: int, taken: set, max_tries: int = 1000) -> List[Dict[str, float]]:
+        out = []
+        for _ in range(max_tries):
+            if len(out) >= n:
+                break
+            params = self._decode(self.rng.uniform(size=len(self.space)))
+            if self._accept(params, taken):
+                taken.add(self._key(params))
+                out.append(params)
+        return out
+
+    def ask(self, n: int = 1) -> List[Dict[str, float]]:
+        """Propose up to n distinct, not yet evaluated parameter dicts."""
+        taken: set = set()
+        if len(self._y) < self.n_startup:
+            return self._random(n, taken)
+
+        y = np.asarray(self._y)
+        x = np.vstack(self._x)
+        order = np.argsort(-y, kind="stable")
+        n_good = max(1, int(math.ceil(self.gamma * len(y))))
+        good, bad = x[order[:n_good]], x[order[n_good:]]
+
+        m = max(n, 1) * self.n_candidates
+        cand = np.empty((m, len(self.space)))
+        score = np.zeros(m)
+        for d, p in enumerate(self.space):
+            l_model = _Parzen(good[:, d], p.min_bandwidth)
+            g_model = _Parzen(bad[:, d] if len(bad) else np.zeros(0), p.min_bandwidth)
+            cand[:, d] = l_model.sample(self.rng, m)
+            score += l_model.logpdf(cand[:, d]) - g_model.logpdf(cand[:, d])
+
+        out = []
+        for i in np.argsort(-score, kind="stable"):
+            params = self._decode(cand[i])
+            if self._accept(params, taken):
+                taken.add(self._key(params))
+                out.append(params)
+                if len(out) >= n:
+                    break
+        if len(out) < n:
+            out.extend(self._random(n - len(out), taken))
+        return out
+
+    def tell(self, params: Dict[str, float], score: float) -> None:
+        """Record an evaluated point; non-finite scores are treated as the worst seen."""
+        self._x.append(np.array([p.to_unit(params[p.name]) for p in self.space]))
+        self._y.append(float(score) if math.isfinite(score) else -1e300)
+        self._seen.add(self._key(params))
+
+    @property
+    def n_observed(self) -> int:
+        return len(self._y)
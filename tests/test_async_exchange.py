@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import ccxt
+import pytest
+
+from bot.config import AppConfig, EnvVars
+from bot.exchange import AsyncExchange, ConcurrentFetcher, ExchangeError
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT", "BNB/USDT", "SOL/USDT", "XRP/USDT", "ADA/USDT"]
+
+
+class FakeAsyncClient:
+    def __init__(self, delay=0.05, fail_first=0, bad=None):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.bad = bad
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.closed = False
+
+    async def fetch_ohlcv(self, symbol, timeframe, limit=500, since=None):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                raise ccxt.NetworkError("transient")
+            if symbol == self.bad:
+                raise ccxt.BadSymbol("unknown")
+            return [[1, 1.0, 1.0, 1.0, float(len(symbol)), 1.0]] * limit
+        finally:
+            self.in_flight -= 1
+
+    async def close(self):
+        self.closed = True
+
+
+def make(client, **kw):
+    cfg = AppConfig(symbols_whitelist=SYMBOLS)
+    return AsyncExchange(cfg, EnvVars(), client=client, backoff_base_delay=0.0, **kw)
+
+
+def test_fetch_many_is_concurrent_and_bounded():
+    client = FakeAsyncClient(delay=0.05)
+    fetcher = ConcurrentFetcher(make(client), concurrency=3)
+    t0 = time.perf_counter()
+    out = fetcher.fetch_many(SYMBOLS, "1h", limit=2)
+    elapsed = time.perf_counter() - t0
+    fetcher.close()
+    assert list(out) == SYMBOLS and all(len(v) == 2 for v in out.values())
+    assert client.max_in_flight == 3
+    assert elapsed < 0.05 * len(SYMBOLS) * 0.75  # two waves instead of six round-trips
+    assert client.closed
+
+
+def test_retries_and_error_normalization():
+    client = FakeAsyncClient(delay=0.0, fail_first=2)
+    aex = make(client)
+    assert len(asyncio.run(aex.fetch_ohlcv("BTC/USDT", "1h", limit=3))) == 3
+    assert client.calls == 3
+
+    with pytest.raises(ExchangeError):
+        asyncio.run(make(FakeAsyncClient(delay=0.0, fail_first=5)).fetch_ohlcv("BTC/USDT", "1h"))
+    with pytest.raises(ExchangeError, match="whitelist"):
+        asyncio.run(aex.fetch_ohlcv("DOGE/USDT", "1h"))
+    with pytest.raises(ExchangeError, match="unknown"):
+        asyncio.run(make(FakeAsyncClient(delay=0.0, bad="ETH/USDT")).fetch_ohlcv_many(SYMBOLS, "1h"))
+
+
+def test_runner_uses_concurrent_fetcher(monkeypatch):
+    from bot.runner import run_paper
+
+    class SyncDummy:
+        def fetch_ohlcv(self, *a, **k):
+            raise AssertionError("market data must come from the async fetcher")
+
+    candles = [[i * 3_600_000, 100.0, 101.0, 99.0, 100.0, 1.0] for i in range(200)]
+
+    class Client(FakeAsyncClient):
+        async def fetch_ohlcv(self, symbol, timeframe, limit=500, since=None):
+            await super().fetch_ohlcv(symbol, timeframe, limit, since)
+            return candles
+
+    client = Client(delay=0.0)
+    monkeypatch.setattr("bot.runner.Exchange", lambda cfg, env: SyncDummy())
+    monkeypatch.setattr(
+        "bot.runner.AsyncExchange", lambda cfg, env: AsyncExchange(cfg, env, client=client)
+    )
+    cfg = AppConfig(symbols_whitelist=SYMBOLS[:3], max_open_trades=3, timeframe="1h")
+    run_paper(cfg, EnvVars(BASE_EQUITY=1000.0), max_iterations=2, fetch_concurrency=4)
+    assert client.calls == 6 and client.closed
@@ -55,3 +55,19 @@ def test_backtest_csv_includes_n_trades(tmp_path):
     assert isinstance(res, list) and len(res) == 1
     item = res[0]
     assert "n_trades" in item
+
+
+def test_backtest_bar_timestamps_are_ms(tmp_path, monkeypatch):
+    from bot.backtest import _default_loader, _simulate_combo
+    from bot.paper import DAY_MS
+
+    df = _default_loader("BTC/USDT", "1h", 1)
+    assert df["timestamp"].iloc[1] - df["timestamp"].iloc[0] == 3_600_000
+    assert df["timestamp"].iloc[0] == 1_577_836_800_000
+    assert (df["timestamp"].iloc[-1] - df["timestamp"].iloc[0]) // DAY_MS == 364
+
+    # Frames without a timestamp column still run (ledger days fall back to now)
+    monkeypatch.chdir(tmp_path)
+    params = {"ema_fast": 3, "ema_slow": 5, "rsi_period": 3, "rsi_buy_min": 0, "rsi_buy_max": 100}
+    rec = _simulate_combo(df.drop(columns="timestamp"), "BTC/USDT", 1, AppConfig(), params, 8760.0, 0)
+    assert rec["n_trades"] > 0
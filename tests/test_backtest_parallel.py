@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from bot.backtest import run_backtest, _share_frame, _attach_frame
+from bot.config import AppConfig
+
+
+def loader(symbol, timeframe, years):
+    rng = np.random.default_rng(5)
+    n = 800
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame(
+        {
+            "timestamp": np.arange(n, dtype=np.int64) * 3_600_000,
+            "open": close,
+            "high": close + rng.uniform(0, 2, n),
+            "low": close - rng.uniform(0, 2, n),
+            "close": close,
+            "volume": rng.uniform(1, 3, n),
+        }
+    )
+
+
+def _strip(results):
+    return [{k: v for k, v in r.items() if k not in ("run_id", "equity")} for r in results]
+
+
+def test_parallel_matches_serial_in_order(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    grid = {"ema_fast": [5, 8], "ema_slow": [20, 30], "rsi_period": [14], "rsi_buy_min": [30], "rsi_buy_max": [70]}
+    serial = run_backtest("BTC/USDT", "1h", 1, AppConfig(), grid, data_loader=loader)
+    parallel = run_backtest("BTC/USDT", "1h", 1, AppConfig(), grid, data_loader=loader, jobs=2)
+    assert _strip(serial) == _strip(parallel)
+    for a, b in zip(serial, parallel):
+        np.testing.assert_array_equal(np.asarray(a["equity"]), np.asarray(b["equity"]))
+
+    rows = pd.read_csv(tmp_path / "data/artifacts/backtest_results.csv")
+    assert list(rows["ema_fast"]) == [5, 5, 8, 8] * 2
+    assert list(rows["ema_slow"]) == [20, 30, 20, 30] * 2
+
+
+def test_shared_frame_round_trip():
+    df = loader("BTC/USDT", "1h", 1)
+    shm, spec = _share_frame(df)
+    try:
+        shm2, out = _attach_frame(spec)
+        pd.testing.assert_frame_equal(out, df)
+        shm2.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_records_hold_lazy_equity_handles(tmp_path, monkeypatch):
+    from bot.results import EquityHandle
+
+    monkeypatch.chdir(tmp_path)
+    grid = {"ema_fast": [5, 8], "ema_slow": [20], "rsi_period": [14], "rsi_buy_min": [30], "rsi_buy_max": [70]}
+    spilled = run_backtest("BTC/USDT", "1h", 1, AppConfig(), grid, data_loader=loader)
+    sampled = run_backtest(
+        "BTC/USDT", "1h", 1, AppConfig(), grid, data_loader=loader, equity_mode="downsample", equity_points=50
+    )
+    for full, small in zip(spilled, sampled):
+        assert isinstance(full["equity"], EquityHandle)
+        assert full["equity"].path.exists() and full["equity"].load().dtype == np.float32
+        assert len(full["equity"]) == full["equity"].bars == 800 - 200 + 1
+        assert len(small["equity"]) == 50 and small["equity"].bars == 601
+        assert full["sharpe"] == small["sharpe"]
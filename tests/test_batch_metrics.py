@@ -0,0 +1,65 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from bot.metrics import (
+    avg_trade, batch_metrics, cagr, cagr_batch, expectancy, max_drawdown, max_drawdown_batch,
+    profit_factor, returns_batch, sharpe, sharpe_batch, trade_metrics_batch, winrate,
+)
+from bot.paper import Trade
+
+
+def trade(pnl):
+    return Trade(symbol="X", side="buy", entry_price=1, stop_price=0, take_profit=0, qty=1, entry_time=None, pnl=pnl)
+
+
+def same(a, b):
+    return (math.isnan(a) and math.isnan(b)) or a == b
+
+
+def test_equity_metrics_match_scalar_exactly():
+    rng = np.random.default_rng(0)
+    eq = 1000 * np.cumprod(1 + rng.normal(0, 0.01, (40, 1500)), axis=1)
+    eq[3] = 1000.0  # flat curve
+    dd = max_drawdown_batch(eq)
+    cg = cagr_batch(eq, 2.0)
+    sh = sharpe_batch(returns_batch(eq), 8760)
+    for i, row in enumerate(eq):
+        assert dd[i] == max_drawdown(row.tolist())
+        assert cg[i] == cagr(row.tolist(), 2.0)
+        assert sh[i] == sharpe(pd.Series(row).pct_change().dropna().values, periods_per_year=8760)
+
+
+def test_sharpe_rows_with_nan_fall_back_to_scalar():
+    r = np.array([[0.01, np.nan, -0.02, 0.03], [0.01, 0.02, -0.01, 0.0]])
+    out = sharpe_batch(r, 252)
+    assert out[0] == sharpe([0.01, -0.02, 0.03], 252)
+    assert out[1] == sharpe(r[1], 252)
+
+
+def test_trade_metrics_match_scalar_exactly():
+    rng = np.random.default_rng(1)
+    groups = [rng.normal(0.3, 4, rng.integers(1, 60)).tolist() for _ in range(30)]
+    groups[5] = []
+    groups[6] = [2.0, 3.0]  # no losses
+    groups[7] = [0.0, 0.0]  # no profits, no losses
+    groups[8] = [1e16, 1.0, -1e16, 1.0]  # compensated summation (sum() on 3.12+) would give 2.0
+    pnl = np.concatenate([np.asarray(g, dtype=float) for g in groups])
+    combo = np.concatenate([np.full(len(g), i) for i, g in enumerate(groups)])
+    out = trade_metrics_batch(pnl, combo, len(groups))
+    for i, g in enumerate(groups):
+        tr = [trade(p) for p in g]
+        assert out["n_trades"][i] == len(tr)
+        assert same(out["winrate"][i], winrate(tr))
+        assert same(out["pf"][i], profit_factor(tr))
+        assert same(out["expectancy"][i], expectancy(tr))
+        assert same(out["avg_trade"][i], avg_trade(tr))
+    assert out["expectancy"][8] == expectancy([trade(p) for p in groups[8]]) == 0.25
+
+
+def test_batch_metrics_keys():
+    eq = np.full((3, 10), 1000.0)
+    out = batch_metrics(eq, [1.0, -1.0], [0, 2], years=1.0)
+    assert set(out) == {"cagr", "max_dd", "winrate", "pf", "expectancy", "avg_trade", "sharpe", "n_trades"}
+    assert list(out["n_trades"]) == [1, 0, 1]
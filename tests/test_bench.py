@@ -0,0 +1,34 @@
+import json
+
+import pandas as pd
+
+from bot.bench import CASES, compare, run_benchmarks, synthetic_ohlcv, write_json
+
+
+def test_synthetic_ohlcv_is_seeded_and_consistent():
+    a = synthetic_ohlcv(500, seed=1)
+    pd.testing.assert_frame_equal(a, synthetic_ohlcv(500, seed=1))
+    assert not a.equals(synthetic_ohlcv(500, seed=2))
+    assert (a["high"] >= a[["open", "close"]].max(axis=1)).all()
+    assert (a["low"] <= a[["open", "close"]].min(axis=1)).all()
+
+
+def test_run_benchmarks_reports_every_case_and_size(tmp_path):
+    report = run_benchmarks(sizes=[300], repeat=1, isolate=False, log=None)
+    assert [r["case"] for r in report["results"]] == list(CASES)
+    for r in report["results"]:
+        assert r["size"] == 300 and r["bars"] == 300
+        assert r["bars_per_sec"] > 0
+        assert r["alloc_peak_bytes"] >= 0
+
+    path = write_json(report, tmp_path / "bench.json")
+    loaded = json.loads(path.read_text())
+    rows = compare(loaded, loaded)
+    assert len(rows) == len(CASES)
+    assert all(abs(r["speedup"] - 1.0) < 1e-12 for r in rows)
+
+
+def test_isolated_run_reports_peak_rss():
+    report = run_benchmarks(["max_drawdown"], sizes=[1000], repeat=1, log=None)
+    (rec,) = report["results"]
+    assert rec["peak_rss_bytes"] is None or rec["peak_rss_bytes"] > 0
@@ -0,0 +1,93 @@
+import time
+
+import numpy as np
+
+from bot.candle_cache import CandleCache, CandleRing
+from bot.config import AppConfig, EnvVars
+
+H = 3_600_000
+
+
+def rows(start, n, price=100.0):
+    return [[(start + i) * H, price + i, price + i + 1, price + i - 1, price + i, 1.0] for i in range(n)]
+
+
+def test_ring_keeps_newest_in_order_after_wraparound():
+    ring = CandleRing(4)
+    for r in rows(0, 7):
+        ring.push(r)
+    w = ring.window()
+    assert len(ring) == 4
+    assert w["timestamp"].tolist() == [3 * H, 4 * H, 5 * H, 6 * H]
+    assert w["close"].tolist() == [103.0, 104.0, 105.0, 106.0]
+    assert ring.window(2)["timestamp"].tolist() == [5 * H, 6 * H]
+
+
+def test_forming_candle_is_overwritten_and_older_rows_ignored():
+    ring = CandleRing(3)
+    for r in rows(0, 3):
+        ring.push(r)
+    ring.push([2 * H, 102.0, 110.0, 90.0, 107.5, 5.0])  # forming candle updated
+    ring.push([0, 0.0, 0.0, 0.0, 0.0, 0.0])  # stale, closed candles are final
+    w = ring.window()
+    assert w["timestamp"].tolist() == [0, H, 2 * H]
+    assert w["close"].tolist() == [100.0, 101.0, 107.5]
+    assert w["high"][-1] == 110.0
+
+
+def test_frame_is_a_view_of_the_ring():
+    cache = CandleCache("1h", capacity=5, clock=lambda: 0.0)
+    cache.ingest("BTC/USDT", rows(0, 8))
+    df = cache.frame("BTC/USDT")
+    ring = cache.rings["BTC/USDT"]
+    assert df["timestamp"].tolist() == [3 * H, 4 * H, 5 * H, 6 * H, 7 * H]
+    assert all(np.shares_memory(df[c].to_numpy(), ring._cols[c]) for c in ("timestamp", "close"))
+    assert "BTC/USDT" in cache and "ETH/USDT" not in cache
+
+
+def test_fetch_limit_is_small_after_backfill_and_gaps_backfill_again():
+    now = {"t": 10 * H / 1000 + 60}
+    cache = CandleCache("1h", capacity=50, clock=lambda: now["t"])
+    calls = []
+
+    def fetch(symbols, limit):
+        calls.append((list(symbols), limit))
+        end = int(now["t"] * 1000) // H + 1
+        return {s: rows(end - limit, limit) for s in symbols}
+
+    cache.refresh(fetch, ["BTC/USDT"])
+    assert calls[-1] == (["BTC/USDT"], 50)
+    assert cache.rings["BTC/USDT"].last_ts == 10 * H
+
+    now["t"] += 3600  # one candle closed, a new one forming
+    assert cache.fetch_limit("BTC/USDT") == 3
+    cache.refresh(fetch, ["BTC/USDT"])
+    assert calls[-1] == (["BTC/USDT"], 3)
+    assert cache.frame("BTC/USDT")["timestamp"].iloc[-1] == 11 * H
+    assert len(cache.frame("BTC/USDT")) == 50  # full, oldest candle dropped
+
+    # A short answer that skips candles leaves a gap: the symbol is backfilled
+    now["t"] += 5 * 3600
+    gap = cache.merge({"BTC/USDT": rows(15, 2)}, fetch)
+    assert calls[-1] == (["BTC/USDT"], 50)
+    assert len(gap["BTC/USDT"]) == 50
+    ts = cache.frame("BTC/USDT")["timestamp"].to_numpy()
+    assert ts[-1] == 16 * H and (np.diff(ts) == H).all()
+
+
+def test_runner_fetches_only_new_candles_after_backfill(monkeypatch):
+    from bot.runner import run_paper
+
+    limits = []
+
+    class Dummy:
+        def fetch_ohlcv(self, symbol, timeframe, limit=200, since=None):
+            limits.append(limit)
+            end = int(time.time() * 1000) // H + 1
+            return rows(end - limit, limit)
+
+    monkeypatch.setattr("bot.runner.Exchange", lambda cfg, env: Dummy())
+    cfg = AppConfig(symbols_whitelist=["BTC/USDT", "ETH/USDT"], max_open_trades=2, timeframe="1h")
+    run_paper(cfg, EnvVars(BASE_EQUITY=1000.0), max_iterations=3, sleep_seconds=0)
+    assert limits[:2] == [200, 200]
+    assert limits[2:] and max(limits[2:]) <= 3
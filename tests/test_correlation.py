@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from bot.config import AppConfig, EnvVars
+from bot.correlation import RollingCorrelation
+
+SYMS = ["BTC/USDT", "ETH/USDT", "BNB/USDT"]
+
+
+def prices(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    common = rng.normal(0, 0.01, n)
+    close = np.empty((n, 3))
+    close[:, 0] = 100 * np.cumprod(1 + common)
+    close[:, 1] = 50 * np.cumprod(1 + 0.9 * common + rng.normal(0, 0.004, n))
+    close[:, 2] = 10 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    return close
+
+
+def test_matches_pandas_over_the_rolling_window_with_gaps():
+    close = prices()
+    close[50:60, 2] = np.nan  # BNB not listed for a while
+    rc = RollingCorrelation(SYMS, window=100)
+    for t, row in enumerate(close):
+        rc.push(t * 1000, {s: c for s, c in zip(SYMS, row) if c == c})
+
+    # Reference: returns against the last seen close, last 100 rows, pairwise complete
+    df = pd.DataFrame(close, columns=SYMS).ffill()
+    rets = df.pct_change().where(~np.isnan(close)).tail(100)
+    expected = rets.corr(min_periods=10).to_numpy()
+    assert len(rc) == 100
+    np.testing.assert_allclose(rc.matrix(), expected, atol=1e-9)
+    assert rc.corr("BTC/USDT", "ETH/USDT") > 0.85 > abs(rc.corr("BTC/USDT", "BNB/USDT"))
+    assert rc.count_correlated("BTC/USDT", SYMS, 0.85) == 1
+
+
+def test_update_aligns_frames_and_waits_for_late_symbols():
+    close = prices(n=30)
+    frames = {
+        s: pd.DataFrame({"timestamp": np.arange(30) * 1000, "close": close[:, j]}) for j, s in enumerate(SYMS)
+    }
+    rc = RollingCorrelation(SYMS, window=20)
+    late = {**frames, "BNB/USDT": frames["BNB/USDT"].iloc[:25]}
+    assert rc.update(late) == 25
+    assert rc.last_ts == 24_000
+    assert rc.update(frames) == 5  # BNB caught up; nothing was skipped
+
+    ref = RollingCorrelation(SYMS, window=20)
+    for t, row in enumerate(close):
+        ref.push(t * 1000, dict(zip(SYMS, row)))
+    np.testing.assert_allclose(rc.matrix(), ref.matrix())
+    assert np.isnan(RollingCorrelation(SYMS).corr("BTC/USDT", "DOGE/USDT"))
+
+
+def test_guard_reads_correlations_without_fetching(monkeypatch):
+    from bot.runner import run_paper
+
+    close = prices(n=250)
+    calls = []
+
+    class Dummy:
+        def fetch_ohlcv(self, symbol, timeframe, limit=200):
+            calls.append(symbol)
+            j = SYMS.index(symbol)
+            return [[i * 1000, c, c * 1.001, c * 0.999, c, 1.0] for i, c in enumerate(close[:, j])][-limit:]
+
+    monkeypatch.setattr("bot.runner.Exchange", lambda cfg, env: Dummy())
+    monkeypatch.setattr("bot.runner.generate_signal", lambda df, cfg: "buy")
+    cfg = AppConfig(
+        symbols_whitelist=SYMS, timeframe="1h", max_open_trades=3, max_correlated_trades=1,
+        correlation_threshold=0.85, max_notional_usdt_per_pair=50,
+    )
+    broker = run_paper(cfg, EnvVars(BASE_EQUITY=1000.0, RISK_PER_TRADE_PCT=0.1), max_iterations=1)
+    assert set(broker.open_positions) == {"BTC/USDT", "BNB/USDT"}  # ETH blocked by BTC
+    assert calls == SYMS  # one fetch per symbol; the guard itself fetched nothing
@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+
+from bot.download import Checkpoint, RateLimiter, download_history
+from bot.history import HistoryStore
+
+M = 60_000
+
+
+class FakeExchange:
+    """Serves 1m candles per symbol from a fixed range, paging by `since`."""
+
+    def __init__(self, n, fail_after=None, max_page=None):
+        self.n = n
+        self.calls = 0
+        self.fail_after = fail_after
+        self.max_page = max_page
+        self.lock = threading.Lock()
+
+    def fetch_ohlcv(self, symbol, timeframe, limit=500, since=None):
+        with self.lock:
+            self.calls += 1
+            if self.fail_after is not None and self.calls > self.fail_after:
+                raise RuntimeError("connection dropped")
+        start = max(0, (since or 0) // M - 2)  # overlap two candles with the previous page
+        size = min(limit, self.max_page or limit)
+        base = 100.0 if symbol.startswith("BTC") else 10.0
+        return [[i * M, base + i, base + i + 1, base + i - 1, base + i, 1.0] for i in range(start, min(self.n, start + size))]
+
+
+def test_pages_all_symbols_without_duplicates(tmp_path):
+    store = HistoryStore(tmp_path)
+    ex = FakeExchange(n=250)
+    counts = download_history(
+        ex, store, ["BTC/USDT", "ETH/USDT"], "1m", 0, end_ms=250 * M, page_limit=40, jobs=2, rate_per_sec=1e6
+    )
+    assert counts == {"BTC/USDT": 250, "ETH/USDT": 250}
+    for sym in ("BTC/USDT", "ETH/USDT"):
+        ts = store.open(sym, "1m")["timestamp"]
+        assert list(ts // M) == list(range(250))
+
+
+def test_resumes_after_interruption(tmp_path):
+    store = HistoryStore(tmp_path)
+    flaky = FakeExchange(n=300, fail_after=3)
+    with pytest.raises(RuntimeError):
+        download_history(flaky, store, ["BTC/USDT"], "1m", 0, end_ms=300 * M, page_limit=50, jobs=1, rate_per_sec=1e6)
+    done = store.count("BTC/USDT", "1m")
+    assert 0 < done < 300
+    assert Checkpoint(tmp_path / "download_checkpoint.json").get("BTC/USDT", "1m") == done * M
+
+    ex = FakeExchange(n=300)
+    download_history(ex, store, ["BTC/USDT"], "1m", 0, end_ms=300 * M, page_limit=50, jobs=1, rate_per_sec=1e6)
+    assert list(store.open("BTC/USDT", "1m")["timestamp"] // M) == list(range(300))
+    # Resumed run only asks for what was missing
+    assert ex.calls <= (300 - done) // 48 + 2
+
+
+def test_exchange_page_cap_below_requested_limit(tmp_path):
+    store = HistoryStore(tmp_path)
+    ex = FakeExchange(n=120, max_page=30)
+    download_history(ex, store, ["BTC/USDT"], "1m", 0, end_ms=120 * M, page_limit=1000, rate_per_sec=1e6)
+    assert store.count("BTC/USDT", "1m") == 120
+
+
+def test_rate_limiter_spaces_requests():
+    now = [0.0]
+    slept = []
+
+    def sleep(dt):
+        slept.append(dt)
+
+    limiter = RateLimiter(4.0, clock=lambda: now[0], sleep=sleep)
+    for _ in range(3):
+        limiter.acquire()
+    assert slept == [0.25, 0.5]
+
+
+def test_resume_fetches_the_candle_that_was_forming(tmp_path):
+    store = HistoryStore(tmp_path)
+    ex = FakeExchange(n=30)  # the exchange already has candles past end_ms
+    download_history(ex, store, ["BTC/USDT"], "1m", 0, end_ms=int(10.5 * M), page_limit=50, rate_per_sec=1e6)
+    assert list(store.open("BTC/USDT", "1m")["timestamp"] // M) == list(range(10))
+    assert Checkpoint(tmp_path / "download_checkpoint.json").get("BTC/USDT", "1m") == 10 * M
+
+    download_history(ex, store, ["BTC/USDT"], "1m", 0, end_ms=int(20.5 * M), page_limit=50, rate_per_sec=1e6)
+    assert list(store.open("BTC/USDT", "1m")["timestamp"] // M) == list(range(20))
+
+
+def test_checkpoint_never_skips_past_the_store(tmp_path):
+    store = HistoryStore(tmp_path)
+    Checkpoint(tmp_path / "download_checkpoint.json").set("BTC/USDT", "1m", 25 * M)  # stale, ahead of the store
+    download_history(FakeExchange(n=40), store, ["BTC/USDT"], "1m", 0, end_ms=40 * M, page_limit=50, rate_per_sec=1e6)
+    assert list(store.open("BTC/USDT", "1m")["timestamp"] // M) == list(range(40))
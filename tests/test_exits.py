@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from bot.config import AppConfig
+from bot.paper import PaperBroker, resolve_exits
+
+
+def make_bars(n=500, seed=9):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.uniform(0, 1.5, n)
+    low = close - rng.uniform(0, 1.5, n)
+    return pd.DataFrame({"open": close, "high": high, "low": low, "close": close, "volume": 1.0})
+
+
+def broker_exit(df, cfg, j, entry, stop, tp, qty):
+    # Reference: per-bar PaperBroker loop starting at the entry bar
+    broker = PaperBroker(cfg, equity=1000.0)
+    broker.buy("X", entry, qty, stop, tp)
+    for i in range(j, len(df)):
+        broker.update_prices(df.iloc[i : i + 1])
+        if broker.trade_log:
+            t = broker.trade_log[0]
+            return i, t.exit_price, t.pnl, t.entry_price
+    return -1, None, None, broker.open_positions["X"].entry_price
+
+
+def test_resolve_exits_matches_paper_broker():
+    df = make_bars()
+    cfg = AppConfig(slippage_bps=7, fees=dict(maker=0.001, taker=0.002))
+    rng = np.random.default_rng(1)
+    entry_idx = np.sort(rng.choice(np.arange(1, len(df)), size=40, replace=False))
+    entry = df["close"].to_numpy()[entry_idx - 1]
+    stop = entry - rng.uniform(0.5, 6.0, len(entry_idx))
+    tp = entry + rng.uniform(0.5, 12.0, len(entry_idx))
+    qty = rng.uniform(0.1, 2.0, len(entry_idx))
+
+    expected = [broker_exit(df, cfg, int(j), float(e), float(s), float(t), float(q)) for j, e, s, t, q in zip(entry_idx, entry, stop, tp, qty)]
+    fills = np.array([e[3] for e in expected])
+
+    res = resolve_exits(df["high"], df["low"], entry_idx, fills, stop, tp, qty, cfg, chunk=4)
+    assert (res.exit_idx >= 0).any() and (res.exit_idx < 0).any()
+    for k, (idx, price, pnl, _) in enumerate(expected):
+        assert res.exit_idx[k] == idx
+        if idx >= 0:
+            assert res.exit_price[k] == price
+            assert res.pnl[k] == pnl
+        else:
+            assert np.isnan(res.pnl[k])
+
+
+def test_stop_checked_before_tp_on_same_bar():
+    high = np.array([110.0])
+    low = np.array([90.0])
+    res = resolve_exits(high, low, [0], [100.0], [95.0], [105.0], [1.0], AppConfig(slippage_bps=0, fees=dict(maker=0, taker=0)))
+    assert res.exit_idx[0] == 0 and res.is_stop[0]
+    assert res.pnl[0] == -5.0
@@ -0,0 +1,89 @@
+import numpy as np
+
+from bot.config import AppConfig, EnvVars
+from bot.history import HistoryStore, history_loader, timeframe_to_ms
+from bot.backtest import run_backtest
+from bot.runner import run_paper
+
+H = 3_600_000
+
+
+def candles(start, n, base=100.0):
+    return [[(start + i) * H, base + i, base + i + 1, base + i - 1, base + i, 1.0] for i in range(n)]
+
+
+class FakeExchange:
+    def __init__(self, data):
+        self.data = data
+        self.limits = []
+
+    def fetch_ohlcv(self, symbol, timeframe, limit=500, since=None):
+        self.limits.append(limit)
+        if since is None:
+            return self.data[-limit:]
+        return [c for c in self.data if c[0] >= since][:limit]
+
+
+def test_append_dedupes_and_maps_zero_copy(tmp_path):
+    store = HistoryStore(tmp_path)
+    assert store.append("BTC/USDT", "1h", candles(0, 5)) == 5
+    # Overlapping page: only strictly newer rows are written
+    assert store.append("BTC/USDT", "1h", candles(3, 5)) == 3
+    arr = store.open("BTC/USDT", "1h")
+    assert isinstance(arr, np.memmap)
+    assert list(arr["timestamp"] // H) == list(range(8))
+
+    # A torn trailing record is ignored and then overwritten
+    with store.path("BTC/USDT", "1h").open("ab") as f:
+        f.write(b"\x00" * 7)
+    assert store.count("BTC/USDT", "1h") == 8
+    assert store.append("BTC/USDT", "1h", candles(8, 1)) == 1
+    assert store.count("BTC/USDT", "1h") == 9
+
+
+def test_sync_fetches_only_the_gap_and_skips_forming_candle(tmp_path):
+    store = HistoryStore(tmp_path)
+    ex = FakeExchange(candles(0, 300))
+    assert store.sync(ex, "BTC/USDT", "1h", max_limit=1000) == 299
+    assert store.last_timestamp("BTC/USDT", "1h") == 298 * H
+
+    ex.data = candles(0, 303)
+    added = store.sync(ex, "BTC/USDT", "1h", now_ms=302 * H)
+    assert ex.limits[-1] == 6  # 4 bars since last stored + 2
+    assert added == 3
+    assert store.last_timestamp("BTC/USDT", "1h") == 301 * H
+    assert timeframe_to_ms("15m") == 900_000
+
+
+def test_sync_pages_forward_over_gaps_longer_than_max_limit(tmp_path):
+    store = HistoryStore(tmp_path)
+    store.append("BTC/USDT", "1h", candles(0, 10))
+    ex = FakeExchange(candles(0, 2600))  # candle 2599 is still forming
+    added = store.sync(ex, "BTC/USDT", "1h", max_limit=1000, now_ms=2599 * H + 1)
+    ts = store.open("BTC/USDT", "1h")["timestamp"]
+    assert added == 2589 and ts[-1] == 2598 * H
+    assert (np.diff(ts) == H).all()
+    assert len(ex.limits) == 3
+
+
+def test_history_loader_feeds_backtest(tmp_path, monkeypatch):
+    store = HistoryStore(tmp_path / "history")
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, 400))
+    store.append("BTC/USDT", "1h", [[i * H, c, c + 1, c - 1, c, 1.0] for i, c in enumerate(close)])
+    monkeypatch.chdir(tmp_path)
+    grid = {"ema_fast": [3], "ema_slow": [10], "rsi_period": [3], "rsi_buy_min": [0], "rsi_buy_max": [100]}
+    res = run_backtest("BTC/USDT", "1h", 1, AppConfig(), grid, data_loader=history_loader(store))
+    assert len(res) == 1 and len(res[0]["equity"]) == 400 - 200 + 1
+
+
+def test_runner_warm_starts_from_store(tmp_path, monkeypatch):
+    store = HistoryStore(tmp_path)
+    data = candles(0, 260)
+    store.append("BTC/USDT", "1h", data[:250])
+    ex = FakeExchange(data)
+    monkeypatch.setattr("bot.runner.Exchange", lambda cfg, env: ex)
+    cfg = AppConfig(ema_fast=3, ema_slow=5, rsi_period=3, symbols_whitelist=["BTC/USDT"], max_open_trades=1)
+    env = EnvVars(BASE_EQUITY=1000.0)
+    run_paper(cfg, env, max_iterations=1, history=store)
+    assert store.last_timestamp("BTC/USDT", "1h") == 258 * H
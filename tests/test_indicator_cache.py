@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from bot.cache import IndicatorCache, dataset_fingerprint
+from bot.config import AppConfig
+from bot.strategy import calculate_indicators
+
+
+def make_df(n=300, seed=2):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": rng.uniform(1, 5, n),
+        }
+    )
+
+
+def test_cached_indicators_match_uncached_and_are_shared():
+    df = make_df()
+    cache = IndicatorCache()
+    fp = dataset_fingerprint(df)
+    cfg_a = AppConfig(ema_fast=10, ema_slow=30, rsi_period=14, enable_adx=True, enable_vol_filter=True)
+    cfg_b = AppConfig(ema_fast=10, ema_slow=50, rsi_period=14, enable_adx=True, enable_vol_filter=True)
+
+    for cfg in (cfg_a, cfg_b):
+        plain = calculate_indicators(df, cfg)
+        cached = calculate_indicators(df, cfg, cache=cache, fingerprint=fp)
+        pd.testing.assert_frame_equal(plain, cached)
+
+    stats = cache.stats()
+    # cfg_a: ema10, ema30, rsi14, adx14, vol_sma20 all miss; cfg_b only misses ema50
+    assert stats["misses"] == 6
+    assert stats["hits"] == 4
+    assert stats["entries"] == 6
+
+
+def test_fingerprint_changes_with_data():
+    df = make_df()
+    other = df.copy()
+    other.loc[10, "close"] += 0.5
+    assert dataset_fingerprint(df) == dataset_fingerprint(df.copy())
+    assert dataset_fingerprint(df) != dataset_fingerprint(other)
+
+
+def test_lru_eviction_respects_byte_budget():
+    cache = IndicatorCache(max_bytes=3 * 800)  # room for three 100-element float arrays
+    for i in range(5):
+        cache.get_or_compute(("fp", "ema", i), lambda: np.zeros(100))
+    cache.get_or_compute(("fp", "ema", 2), lambda: np.zeros(100))  # touch -> most recent
+    cache.get_or_compute(("fp", "ema", 5), lambda: np.zeros(100))
+    stats = cache.stats()
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= cache.max_bytes
+    assert stats["evictions"] == 3
+    before = cache.stats()["hits"]
+    cache.get_or_compute(("fp", "ema", 2), lambda: np.zeros(100))
+    assert cache.stats()["hits"] == before + 1
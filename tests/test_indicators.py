@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from bot.config import AppConfig
+from bot.indicators import IndicatorState
+from bot.strategy import calculate_indicators, generate_signal
+from bot.runner import _stream_indicators
+
+
+def make_df(n=300, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    close[40:50] = close[40]  # flat stretch exercises zero-move branches
+    return pd.DataFrame(
+        {
+            "timestamp": np.arange(n) * 60,
+            "open": close,
+            "high": close + rng.uniform(0, 1, n),
+            "low": close - rng.uniform(0, 1, n),
+            "close": close,
+            "volume": rng.uniform(1, 5, n),
+        }
+    )
+
+
+def make_cfg():
+    return AppConfig(ema_fast=5, ema_slow=20, rsi_period=7, enable_adx=True, enable_vol_filter=True)
+
+
+def test_streaming_matches_batch():
+    df = make_df()
+    cfg = make_cfg()
+    batch = calculate_indicators(df, cfg)
+    state = IndicatorState(cfg)
+    rows = [state.update(tuple(r)) for r in df.itertuples(index=False)]
+    stream = pd.DataFrame(rows)
+    for col in ["ema_fast", "ema_slow", "rsi", "adx", "vol_sma"]:
+        np.testing.assert_allclose(stream[col].to_numpy(), batch[col].to_numpy(), rtol=1e-12, equal_nan=True)
+
+
+def test_warmup_and_serialization_round_trip():
+    df = make_df()
+    cfg = make_cfg()
+    full = IndicatorState.from_history(df, cfg)
+
+    half = IndicatorState.from_history(df.iloc[:150], cfg)
+    restored = IndicatorState.from_dict(json.loads(json.dumps(half.to_dict())))
+    restored.warmup(df.iloc[150:])
+
+    assert restored.last_ts == full.last_ts
+    assert restored.values() == full.values()
+
+
+def test_runner_stream_helper_preserves_signal():
+    df = make_df()
+    cfg = AppConfig(ema_fast=5, ema_slow=20, rsi_period=7, rsi_buy_min=0, rsi_buy_max=100, slippage_bps=200)
+    states = {}
+    for end in range(100, 140):
+        frame = df.iloc[:end]
+        work, cols = _stream_indicators(states, "BTC/USDT", frame, cfg)
+        assert "ema_fast" in cols
+        ohlcv = frame[["open", "high", "low", "close", "volume"]]
+        assert generate_signal(work[cols], cfg) == generate_signal(ohlcv, cfg)
+    assert states["BTC/USDT"].last_ts == df["timestamp"].iloc[137]
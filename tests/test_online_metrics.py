@@ -0,0 +1,90 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bot.metrics import OnlineMetrics, avg_trade, cagr, expectancy, max_drawdown, profit_factor, sharpe, winrate
+from bot.paper import Trade
+
+
+def trade(pnl):
+    return Trade(symbol="X", side="buy", entry_price=1, stop_price=0, take_profit=0, qty=1, entry_time=None, pnl=pnl)
+
+
+def batch(equity, pnls, years=1.0, ppy=8760.0):
+    trades = [trade(p) for p in pnls]
+    returns = pd.Series(equity).pct_change().dropna().values
+    return {
+        "cagr": cagr(equity, years),
+        "max_dd": max_drawdown(equity),
+        "winrate": winrate(trades),
+        "pf": profit_factor(trades),
+        "expectancy": expectancy(trades),
+        "avg_trade": avg_trade(trades),
+        "sharpe": sharpe(returns, periods_per_year=ppy),
+        "n_trades": len(trades),
+    }
+
+
+def assert_matches(online, ref):
+    for k, v in ref.items():
+        if k == "sharpe":
+            assert math.isclose(online[k], v, rel_tol=1e-9, abs_tol=1e-12), k
+        elif isinstance(v, float) and math.isnan(v):
+            assert math.isnan(online[k]), k
+        else:
+            assert online[k] == v, k
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_online_matches_batch(seed):
+    rng = np.random.default_rng(seed)
+    equity = (1000 * np.cumprod(1 + rng.normal(0, 0.01, 2000))).tolist()
+    pnls = rng.normal(0.5, 5, 150).tolist() + [0.0]
+    acc = OnlineMetrics()
+    for x in equity:
+        acc.update_equity(x)
+    for p in pnls:
+        acc.update_trade(p)
+    assert_matches(acc.result(1.0, 8760.0), batch(equity, pnls))
+
+
+def test_trade_sums_follow_scalar_order():
+    pnls = [1e16, 1.0, -1e16, 1.0, -3.0]  # compensated summation would round differently
+    acc = OnlineMetrics()
+    for p in pnls:
+        acc.update_trade(p)
+    assert_matches(acc.result(1.0), batch([1000.0], pnls))
+    assert acc.result(1.0)["expectancy"] == -0.4  # math.fsum would give -0.2
+
+
+def test_flat_runs_match_per_bar_updates():
+    runs = [(1000.0, 1), (1000.0, 50), (990.0, 1), (990.0, 300), (1012.5, 1), (1012.5, 7)]
+    equity = [v for v, k in runs for _ in range(k)]
+    acc = OnlineMetrics()
+    for v, k in runs:
+        acc.update_equity_flat(v, k)
+    assert acc.n_returns == len(equity) - 1
+    assert_matches(acc.result(1.0, 8760.0), batch(equity, []))
+
+
+def test_edge_cases_follow_batch_functions():
+    empty = OnlineMetrics().result(1.0)
+    assert_matches(empty, {"cagr": 0.0, "max_dd": 0.0, "winrate": 0.0, "pf": 0.0, "expectancy": 0.0,
+                           "avg_trade": 0.0, "sharpe": 0.0, "n_trades": 0})
+    acc = OnlineMetrics()
+    acc.update_trade(5.0)
+    assert acc.result(1.0)["pf"] == profit_factor([trade(5.0)]) == 1e9
+    acc = OnlineMetrics()
+    acc.update_trade(0.0)
+    assert math.isnan(acc.result(1.0)["pf"])
+    # Zero equity: 0/0 returns are dropped, x/0 is inf, as with pct_change().dropna()
+    acc = OnlineMetrics()
+    acc.update_equity_flat(0.0, 5)
+    assert acc.n_returns == 0
+
+
+def test_sharpe_accepts_iterators_and_arrays():
+    r = [0.01, -0.02, 0.015, 0.0]
+    assert sharpe(iter(r)) == sharpe(np.asarray(r)) == sharpe(r)
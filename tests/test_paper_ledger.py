@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+
+from bot.config import AppConfig
+from bot.paper import DAY_MS, PaperBroker, utc_day
+from bot.risk import kill_switch, ledger_daily_loss_guard, ledger_kill_switch, max_daily_loss_guard
+
+
+def make_broker():
+    return PaperBroker(AppConfig(slippage_bps=5, fees=dict(maker=0.001, taker=0.001)), equity=1000.0)
+
+
+def test_utc_day_from_ms_and_datetime():
+    ts = 19_000 * DAY_MS + 123
+    assert utc_day(ts) == 19_000
+    assert utc_day(datetime.fromtimestamp(ts / 1000, tz=timezone.utc)) == 19_000
+    assert utc_day(datetime.utcfromtimestamp(ts / 1000)) == 19_000
+
+
+def test_ledger_tracks_running_totals_by_day():
+    broker = make_broker()
+    day0 = 20_000 * DAY_MS
+    broker.buy("A", 100.0, 1.0, 90.0, 120.0, ts=day0)
+    broker.buy("B", 50.0, 2.0, 45.0, 60.0, ts=day0)
+    opened = sum(t.entry_price * t.qty for t in broker.open_positions.values())
+    assert broker.ledger.open_notional == pytest.approx(opened)
+
+    broker.sell("A", 90.0, 1.0, ts=day0 + 3_600_000)
+    broker.sell("B", 60.0, 2.0, ts=day0 + DAY_MS + 5)
+    a, b = broker.trade_log
+    assert broker.ledger.daily_pnl == {20_000: a.pnl, 20_001: b.pnl}
+    assert broker.ledger.total_pnl == sum(t.pnl for t in broker.trade_log)
+    assert broker.ledger.day_pnl() == b.pnl  # current day is the last close
+    assert broker.ledger.day_pnl(day0) == a.pnl
+    assert broker.ledger.day_pnl(day0 + 2 * DAY_MS) == 0.0
+    assert broker.ledger.open_notional == 0.0
+    assert broker.ledger.n_closed == 2
+
+
+def test_update_prices_books_on_bar_day():
+    broker = make_broker()
+    ts = 20_000 * DAY_MS + 5
+    broker.buy("A", 100.0, 1.0, 95.0, 110.0, ts=ts)
+    bar = pd.DataFrame([{"timestamp": ts + DAY_MS, "open": 100, "high": 111, "low": 99, "close": 110, "volume": 1}])
+    broker.update_prices(bar)
+    assert broker.ledger.day_pnl(ts + DAY_MS) == broker.trade_log[0].pnl > 0
+
+
+def test_ledger_guards_match_list_guards():
+    broker = make_broker()
+    day0 = 20_000 * DAY_MS
+    for d, exit_price in enumerate([80.0, 85.0, 70.0]):
+        broker.buy("A", 100.0, 1.0, 50.0, 200.0, ts=day0 + d * DAY_MS)
+        broker.sell("A", exit_price, 1.0, ts=day0 + d * DAY_MS)
+    pnls = [t.pnl for t in broker.trade_log]
+    for base, pct in [(1000.0, 0.02), (1000.0, 0.05), (1000.0, 0.1)]:
+        assert ledger_kill_switch(broker.ledger, base, pct) == kill_switch(pnls, base, pct)
+        for d in range(3):
+            got = ledger_daily_loss_guard(broker.ledger, base, pct, day0 + d * DAY_MS)
+            assert got == max_daily_loss_guard([pnls[d]], base, pct)
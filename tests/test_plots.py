@@ -0,0 +1,46 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bot.backtest import run_backtest
+from bot.config import AppConfig
+from bot.plots import select_combos, render_equity_plots
+
+
+def loader(symbol, timeframe, years):
+    rng = np.random.default_rng(4)
+    n = 400
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({"timestamp": np.arange(n), "open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1.0})
+
+
+def test_select_combos_by_metric_and_hash():
+    df = pd.DataFrame({"param_hash": ["a", "b", "c"], "sharpe": [0.5, 2.0, 1.0], "max_dd": [0.3, 0.1, 0.2]})
+    assert list(select_combos(df, top_n=2, metric="sharpe")["param_hash"]) == ["b", "c"]
+    assert list(select_combos(df, top_n=1, metric="max_dd")["param_hash"]) == ["b"]
+    assert list(select_combos(df, hashes=["c"])["param_hash"]) == ["c"]
+
+
+def test_backtest_saves_equity_arrays_without_plotting(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delitem(sys.modules, "matplotlib", raising=False)
+    grid = {"ema_fast": [3, 5], "ema_slow": [10], "rsi_period": [3], "rsi_buy_min": [0], "rsi_buy_max": [100]}
+    res = run_backtest("BTC/USDT", "1h", 1, AppConfig(), grid, data_loader=loader)
+    assert "matplotlib" not in sys.modules
+    assert not list(tmp_path.glob("data/artifacts/*.png"))
+
+    run_dir = tmp_path / "data/artifacts/equity" / f"run_id={res[0]['run_id']}"
+    saved = sorted(run_dir.glob("*.npy"))
+    assert len(saved) == 2
+    assert any(np.array_equal(np.load(p), np.asarray(r["equity"])) for p in saved for r in res)
+
+
+def test_render_top_n(tmp_path, monkeypatch):
+    pytest.importorskip("matplotlib")
+    monkeypatch.chdir(tmp_path)
+    grid = {"ema_fast": [3, 5, 7], "ema_slow": [10], "rsi_period": [3], "rsi_buy_min": [0], "rsi_buy_max": [100]}
+    run_backtest("BTC/USDT", "1h", 1, AppConfig(), grid, data_loader=loader)
+    paths = render_equity_plots(top_n=2, artifacts_dir=tmp_path / "data/artifacts")
+    assert len(paths) == 2 and all(p.exists() for p in paths)
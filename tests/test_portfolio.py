@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from bot.backtest import _simulate_combo
+from bot.config import AppConfig, EnvVars
+from bot.correlation import RollingCorrelation
+from bot.paper import DAY_MS
+from bot.portfolio import AlignedBars, run_portfolio_backtest
+
+
+def frame(seed, n=900, start=0, base=None):
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 1, n) if base is None else base + rng.normal(0, 0.05, n)
+    close = 100 + np.cumsum(steps)
+    return pd.DataFrame(
+        {
+            "timestamp": (start + np.arange(n, dtype=np.int64)) * 3_600_000,
+            "open": close,
+            "high": close + rng.uniform(0, 2, n),
+            "low": close - rng.uniform(0, 2, n),
+            "close": close,
+            "volume": 1.0,
+        }
+    )
+
+
+def cfg(**kw):
+    base = dict(ema_fast=3, ema_slow=12, rsi_period=5, rsi_buy_min=0, rsi_buy_max=100)
+    base.update(kw)
+    return AppConfig(**base)
+
+
+def test_alignment_on_union_of_timestamps():
+    a = frame(1, n=5)
+    b = frame(2, n=5, start=3)
+    bars = AlignedBars({"A": a, "B": b})
+    assert len(bars) == 8
+    assert list(bars.rows[1]) == [3, 4, 5, 6, 7]
+    assert np.isnan(bars.close[:3, 1]).all()
+    assert np.isnan(bars.returns[3, 1]) and np.isfinite(bars.returns[4, 1])
+
+
+def test_single_symbol_matches_single_backtest():
+    df = frame(3)
+    c = cfg(max_notional_usdt_per_pair=1e12)
+    env = EnvVars(BASE_EQUITY=1000.0, MAX_DAILY_LOSS_PCT=0.2, RISK_PER_TRADE_PCT=0.01)
+    res = run_portfolio_backtest(c, "1h", 1, env=env, symbols=["BTC/USDT"], data_loader=lambda *_: df)
+    ref = _simulate_combo(df, "BTC/USDT", 1, c, {}, 8760, 0)
+    assert res["metrics"]["n_trades"] == ref["n_trades"] > 0
+    np.testing.assert_allclose(res["equity"][-1], ref["equity"][-1])
+    np.testing.assert_allclose(res["equity"][199:], ref["equity"][: len(df) - 199])
+
+
+def test_portfolio_rules_limit_entries():
+    base = np.random.default_rng(9).normal(0, 1, 900)
+    data = {"BTC/USDT": frame(4, base=base), "ETH/USDT": frame(5, base=base), "BNB/USDT": frame(6)}
+
+    def loader(sym, *_):
+        return data[sym]
+
+    env = EnvVars(BASE_EQUITY=1000.0, MAX_DAILY_LOSS_PCT=1.0)
+
+    one = run_portfolio_backtest(cfg(max_open_trades=1), "1h", 1, env=env, data_loader=loader)
+    many = run_portfolio_backtest(cfg(max_open_trades=3, max_correlated_trades=5), "1h", 1, env=env, data_loader=loader)
+    guarded = run_portfolio_backtest(
+        cfg(max_open_trades=3, max_correlated_trades=1, correlation_threshold=0.8), "1h", 1, env=env, data_loader=loader
+    )
+    assert one["skipped"]["max_open_trades"] > 0
+    assert many["metrics"]["n_trades"] > one["metrics"]["n_trades"]
+    assert guarded["skipped"]["correlation"] > 0
+    assert len(one["equity"]) == 900
+
+
+def test_rolling_corr_pairwise_complete():
+    r = np.column_stack([np.arange(30.0), 2 * np.arange(30.0) + 1, np.r_[np.full(25, np.nan), np.ones(5)]])
+    rc = RollingCorrelation(["A", "B", "C"], window=100)
+    for t, row in enumerate(r):
+        rc.push_returns(t, row)
+    assert abs(rc.corr("A", "B") - 1.0) < 1e-12
+    assert np.isnan(rc.corr("A", "C"))
+
+    # Pushing a full window replaces everything older
+    rng = np.random.default_rng(1)
+    fresh = rng.normal(0, 1, (100, 3))
+    for t, row in enumerate(fresh, start=1000):
+        rc.push_returns(t, row)
+    np.testing.assert_allclose(rc.matrix(), np.corrcoef(fresh.T), atol=1e-12)
+
+
+def test_daily_loss_guard_halts_entries_for_the_day():
+    df = frame(1, base=0.08)
+    env = EnvVars(BASE_EQUITY=1000.0, MAX_DAILY_LOSS_PCT=0.01, RISK_PER_TRADE_PCT=0.01)
+    res = run_portfolio_backtest(
+        cfg(max_notional_usdt_per_pair=1e12), "1h", 1, env=env, symbols=["BTC/USDT"], data_loader=lambda *_: df
+    )
+    # A losing day blocks entries although total realized PnL stays above the kill switch
+    assert res["skipped"]["daily_loss"] > 0 and res["skipped"]["kill_switch"] == 0
+    assert res["broker"].ledger.total_pnl > 0
+
+    log, day = res["trades"], res["timestamps"] // DAY_MS
+    entry, exit_, pnl = log.column("entry_bar"), log.column("exit_bar"), log.pnl
+    for t in entry:
+        realized = pnl[(exit_ < t) & (day[exit_] == day[t])].sum()
+        assert realized > -1000.0 * 0.01
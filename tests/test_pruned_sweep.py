@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from bot.backtest import _rung_sizes, run_backtest, run_pruned_backtest
+from bot.config import AppConfig
+from bot.optimize import optimize_from_csv
+from bot.results import completed_rows, load_results
+
+
+def loader(symbol, timeframe, years):
+    rng = np.random.default_rng(11)
+    n = 2000
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame(
+        {
+            "timestamp": np.arange(n, dtype=np.int64) * 3_600_000,
+            "open": close,
+            "high": close + rng.uniform(0, 2, n),
+            "low": close - rng.uniform(0, 2, n),
+            "close": close,
+            "volume": rng.uniform(1, 3, n),
+        }
+    )
+
+
+GRID = {"ema_fast": [3, 5, 8], "ema_slow": [10, 20, 30], "rsi_period": [5], "rsi_buy_min": [0], "rsi_buy_max": [100]}
+
+
+def test_rung_sizes_grow_by_eta_to_full_history():
+    assert _rung_sizes(2000, 3, 3) == [200 + 200, 200 + 600, 2000]
+    assert _rung_sizes(150, 3, 3) == [150]
+    assert _rung_sizes(1000, 2, 1) == [1000]
+
+
+def test_survivors_match_full_sweep_and_pruning_is_recorded(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    full = run_backtest("BTC/USDT", "1h", 1, AppConfig(), GRID, data_loader=loader)
+    pruned = run_pruned_backtest("BTC/USDT", "1h", 1, AppConfig(), GRID, data_loader=loader, eta=3, rungs=3)
+
+    assert len(pruned) == len(full) == 9
+    survivors = [r for r in pruned if not r["pruned"]]
+    assert len(survivors) == 1  # 9 -> 3 -> 1
+    for rec in survivors:
+        assert rec["bars"] == 2000 and rec["rung"] == 2
+        ref = next(f for f in full if f["ema_fast"] == rec["ema_fast"] and f["ema_slow"] == rec["ema_slow"])
+        np.testing.assert_array_equal(np.asarray(rec["equity"]), np.asarray(ref["equity"]))
+        assert rec["sharpe"] == ref["sharpe"]
+    dropped = [r for r in pruned if r["pruned"]]
+    assert dropped and all(r["bars"] < 2000 and r["prune_reason"] for r in dropped)
+
+    store = load_results(tmp_path / "data/artifacts/results")
+    run = store[store["run_id"] == pruned[0]["run_id"]]
+    assert list(run["pruned"].astype(bool)) == [r["pruned"] for r in pruned]
+    assert set(run["prune_reason"]) - {""} <= {"rank:sharpe", "kill_switch"}
+    assert len(completed_rows(run)) == len(survivors)
+
+    # Only survivors keep equity arrays
+    equity_dir = tmp_path / f"data/artifacts/equity/run_id={pruned[0]['run_id']}"
+    assert len(list(equity_dir.glob("*.npy"))) == len(survivors)
+
+
+def test_optimizer_ignores_pruned_rows(tmp_path):
+    df = pd.DataFrame(
+        {
+            "ema_fast": [5, 50], "ema_slow": [20, 200], "rsi_period": [14, 14],
+            "rsi_buy_min": [40, 40], "rsi_buy_max": [60, 60], "atr_k": [1.5, 1.5], "risk_rr": [2.0, 2.0],
+            "pf": [2.0, 9.0], "cagr": [0.2, 3.0], "max_dd": [0.1, 0.01], "n_trades": [80, 80], "sharpe": [1.0, 9.0],
+            "pruned": [False, True],
+        }
+    )
+    csv = tmp_path / "r.csv"
+    df.to_csv(csv, index=False)
+    rec = optimize_from_csv(csv, tmp_path / "out.yaml")
+    assert rec["ema_fast"] == 5
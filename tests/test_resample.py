@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bot.history import OHLCV_DTYPE, HistoryStore, to_records
+from bot.resample import ResampledFeed, Resampler, bucket_starts, resample, resample_frame, resampled_loader
+
+M = 60_000
+H = 60 * M
+DAY = 24 * H
+
+
+def minutes(start_min, n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, n))
+    ts = (start_min + np.arange(n, dtype=np.int64)) * M
+    return [
+        [int(t), float(c), float(c + h), float(c - lo), float(c), float(v)]
+        for t, c, h, lo, v in zip(ts, close, rng.uniform(0, 1, n), rng.uniform(0, 1, n), rng.uniform(1, 5, n))
+    ]
+
+
+def pandas_resample(rows, rule):
+    df = pd.DataFrame(rows, columns=list(OHLCV_DTYPE.names))
+    df.index = pd.to_datetime(df["timestamp"], unit="ms")
+    agg = df.resample(rule, label="left", closed="left").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    ).dropna()
+    agg["timestamp"] = (agg.index - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)
+    return agg.reset_index(drop=True)[list(OHLCV_DTYPE.names)]
+
+
+@pytest.mark.parametrize("tf,rule", [("5m", "5min"), ("15m", "15min"), ("1h", "1h"), ("4h", "4h"), ("1d", "1D")])
+def test_resample_matches_pandas(tf, rule):
+    rows = minutes(0, 3 * 1440)  # three full UTC days
+    del rows[700:760]  # an outage inside one bucket
+    out = resample(to_records(rows), tf)
+    ref = pandas_resample(rows, rule)
+    pd.testing.assert_frame_equal(pd.DataFrame({n: out[n] for n in OHLCV_DTYPE.names}), ref, check_dtype=False)
+
+
+def test_trailing_partial_bucket_is_held_back():
+    out = resample(to_records(minutes(0, 150)), "1h")
+    assert list(out["timestamp"]) == [0, H]  # 02:00-02:29 is still forming
+    assert bucket_starts(np.array([5 * DAY + 3]), "1w")[0] == 4 * DAY  # Monday
+    with pytest.raises(ValueError):
+        resample(to_records(minutes(0, 10)), "1m", base="5m")
+
+
+def test_incremental_matches_batch():
+    rows = minutes(0, 1000, seed=3)
+    r = Resampler("15m")
+    parts = [r.update(rows[i : i + 37]) for i in range(0, len(rows), 37)]
+    got = np.concatenate(parts)
+    np.testing.assert_array_equal(got, resample(to_records(rows), "15m"))
+    assert len(r.pending) == 1000 % 15
+    forming = r.forming()
+    assert forming["timestamp"][0] == 990 * M and forming["close"][0] == rows[-1][4]
+
+
+def test_resampled_loader_serves_any_timeframe(tmp_path):
+    store = HistoryStore(tmp_path)
+    rows = minutes(17, 2 * 1440)
+    store.append("BTC/USDT", "1m", rows)
+    df = resampled_loader(store, "1m")("BTC/USDT", "4h", 1)
+    assert df["timestamp"].iloc[0] == 4 * H  # partial 00:00 bucket skipped
+    full = resample_frame(store.frame("BTC/USDT", "1m"), "4h")
+    pd.testing.assert_frame_equal(df, full.iloc[1:].reset_index(drop=True))
+
+
+class MinuteExchange:
+    def __init__(self, rows, now):
+        self.rows = rows
+        self.now = now
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe, limit=500, since=None):
+        assert timeframe == "1m"
+        self.calls.append(since)
+        # Candles up to the current (forming) minute
+        return [r for r in self.rows if since <= r[0] <= self.now["t"]][:limit]
+
+
+def test_feed_fetches_only_new_base_candles(tmp_path):
+    rows = minutes(0, 600, seed=5)
+    now = {"t": 300 * M + 30_000}  # halfway through minute 300
+    ex = MinuteExchange(rows, now)
+    store = HistoryStore(tmp_path)
+    feed = ResampledFeed(ex, "1m", store=store, page_limit=100, clock=lambda: now["t"] / 1000)
+    first = feed.fetch_ohlcv("X", "1h", limit=3)
+    assert [c[0] for c in first] == [3 * H, 4 * H, 5 * H]
+    assert first[-1][4] == rows[300][4]  # forming hour includes the forming minute
+    assert store.count("X", "1m") == 300 - 2 * 60  # closed minutes since the 02:00 bucket
+
+    now["t"] = 421 * M
+    n_calls = len(ex.calls)
+    second = feed.fetch_ohlcv("X", "1h", limit=3)
+    assert ex.calls[n_calls:] == [300 * M, 400 * M]  # resumes at the forming minute, then pages
+    ref = resample(to_records(rows[:421]), "1h")
+    assert second[:2] == [[int(r[0]), *map(float, list(r)[1:])] for r in ref[-2:]]
+    assert second[-1][0] == 7 * H
+
+
+def test_feed_starts_from_stored_base_candles(tmp_path):
+    rows = minutes(0, 600, seed=5)
+    now = {"t": 300 * M + 30_000}
+    store = HistoryStore(tmp_path)
+    store.append("X", "1m", rows[30:300])  # synced up to the forming minute, from 00:30
+    ex = MinuteExchange(rows, now)
+    feed = ResampledFeed(ex, "1m", store=store, page_limit=100, clock=lambda: now["t"] / 1000)
+    out = feed.fetch_ohlcv("X", "1h", limit=5)
+    assert ex.calls == [300 * M]  # only the forming minute was requested
+    assert [c[0] for c in out] == [H, 2 * H, 3 * H, 4 * H, 5 * H]  # partial 00:00 bucket left out
+    ref = resample(to_records(rows[:300]), "1h")
+    assert out[:-1] == [[int(r[0]), *map(float, list(r)[1:])] for r in ref[1:]]
+    assert out[-1][4] == rows[300][4]
@@ -0,0 +1,109 @@
+import pandas as pd
+import pytest
+
+from bot.results import ResultsSink, append_csv, export_csv, import_legacy_csv, load_results, next_run_id
+from bot.optimize import optimize_from_csv
+from bot.ci_regression import evaluate
+
+
+def row(ema_fast, sharpe, **extra):
+    return {
+        "ema_fast": ema_fast, "ema_slow": 2 * ema_fast, "rsi_period": 14, "rsi_buy_min": 40, "rsi_buy_max": 60,
+        "atr_k": 1.5, "risk_rr": 2.0, "cagr": 0.1, "max_dd": 0.1, "winrate": 0.5, "pf": 1.5,
+        "expectancy": 1.0, "avg_trade": 1.0, "sharpe": sharpe, "n_trades": 60, "valid_row": True, **extra,
+    }
+
+
+KEYS = ["ema_fast", "ema_slow", "rsi_period", "rsi_buy_min", "rsi_buy_max", "atr_k", "risk_rr"]
+
+
+def test_batched_partitions_and_csv_export(tmp_path):
+    root = tmp_path / "results"
+    with ResultsSink(1, KEYS, root, batch_size=2, fmt="npz") as sink:
+        for i in range(5):
+            sink.append(row(10 + i, float(i), run_id=1))
+    assert len(list((root / "run_id=1").glob("part-*.npz"))) == 3
+
+    # A later run with an extra parameter key gets its own schema
+    with ResultsSink(2, KEYS + ["adx_threshold"], root, fmt="npz") as sink:
+        sink.append(row(30, 9.0, adx_threshold=25.0, run_id=2))
+
+    df = load_results(root)
+    assert len(df) == 6
+    assert list(df["run_id"]) == [1] * 5 + [2]
+    assert df["adx_threshold"].isna().sum() == 5
+
+    out = export_csv(root, tmp_path / "backtest_results.csv")
+    csv = pd.read_csv(out)
+    assert list(csv.columns[: len(KEYS)]) == KEYS
+    assert len(csv) == 6
+    assert next_run_id(root) >= 3
+
+
+def test_csv_gets_only_the_new_run_and_keeps_legacy_rows(tmp_path, monkeypatch):
+    root = tmp_path / "results"
+    csv_path = tmp_path / "backtest_results.csv"
+    pd.DataFrame([row(5, 0.5, run_id=0), row(6, 0.6, run_id=0)]).to_csv(csv_path, index=False)  # written before the store
+    assert import_legacy_csv(csv_path, root)
+    assert not import_legacy_csv(csv_path, root)  # only into an empty store
+
+    with ResultsSink(1, KEYS, root, fmt="npz") as sink:
+        sink.append(row(10, 1.0, run_id=1))
+    read = []
+    real_load = load_results
+
+    def counting(root, run_ids=None):
+        read.append(run_ids)
+        return real_load(root, run_ids)
+
+    monkeypatch.setattr("bot.results.load_results", counting)
+    append_csv(root, 1, csv_path)
+    assert read == [[1]]  # no other partition was read
+    assert list(pd.read_csv(csv_path)["ema_fast"]) == [5, 6, 10]
+
+    # A run with a new column rewrites the CSV from the store, legacy rows included
+    with ResultsSink(2, KEYS + ["adx_threshold"], root, fmt="npz") as sink:
+        sink.append(row(30, 9.0, adx_threshold=25.0, run_id=2))
+    append_csv(root, 2, csv_path)
+    csv = pd.read_csv(csv_path)
+    assert list(csv["ema_fast"]) == [5, 6, 10, 30]
+    assert csv["adx_threshold"].notna().sum() == 1
+
+
+def test_unknown_column_and_schema_mismatch_rejected(tmp_path):
+    root = tmp_path / "results"
+    sink = ResultsSink(7, KEYS, root, fmt="npz")
+    with pytest.raises(ValueError):
+        sink.append(row(10, 1.0, run_id=7, surprise=1))
+    with pytest.raises(ValueError):
+        ResultsSink(7, KEYS[:3], root, fmt="npz")
+
+
+def test_readers_accept_store_directory(tmp_path):
+    root = tmp_path / "results"
+    with ResultsSink(1, KEYS, root, fmt="npz") as sink:
+        for i in range(4):
+            sink.append(row(10 + i, 1.0 + i, run_id=1))
+
+    rec = optimize_from_csv(root, tmp_path / "opt.yaml")
+    assert rec["ema_fast"] >= 10
+
+    regression = evaluate(str(root), str(tmp_path / "summary.json"))
+    assert regression is False
+
+
+def test_equity_writer_spills_float32_and_downsamples(tmp_path):
+    import numpy as np
+    from bot.results import EquityWriter
+
+    curve = np.linspace(1000.0, 1100.0, 10_001)
+    full = EquityWriter(tmp_path / "full").write("abc", curve)
+    loaded = full.load()
+    assert isinstance(loaded, np.memmap) and loaded.dtype == np.float32
+    assert len(full) == full.bars == 10_001
+    np.testing.assert_allclose(np.asarray(full), curve, rtol=1e-6)
+
+    small = EquityWriter(tmp_path / "small", points=100).write("abc", curve)
+    arr = np.asarray(small)
+    assert len(arr) == len(small) == 100 and small.bars == 10_001
+    assert arr[0] == np.float32(1000.0) and arr[-1] == np.float32(1100.0)
@@ -0,0 +1,95 @@
+from bot.scheduler import CandleScheduler, last_closed_ts, measure_clock_offset
+
+H = 3_600_000
+
+
+class FakeClock:
+    def __init__(self, t):
+        self.t = t  # seconds
+        self.sleeps = []
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, s):
+        self.sleeps.append(s)
+        self.t += s
+
+
+def test_clock_offset_uses_request_midpoint():
+    clock = FakeClock(1000.0)
+
+    class Ex:
+        def fetch_time(self):
+            clock.t += 0.2  # 200 ms round-trip, answered halfway
+            return int((clock.t - 0.1) * 1000) + 1500
+
+    assert measure_clock_offset(Ex(), clock=clock) == 1500
+    assert measure_clock_offset(object()) == 0
+
+
+def test_wait_wakes_just_after_boundary_in_exchange_time():
+    clock = FakeClock(10 * H / 1000 + 1234.5)  # 20m34.5s into the hour (local)
+    sched = CandleScheduler("1h", offset_ms=-2000, delay_ms=300, clock=clock, sleep=clock.sleep)
+    boundary = sched.wait()
+    assert boundary == 11 * H
+    assert sched.server_now_ms() == 11 * H + 300
+    assert sched.expected_closed_ts() == 10 * H
+    assert sched.lateness_ms() == 300
+
+
+def test_await_closed_refetches_only_stale_symbols():
+    clock = FakeClock(11 * H / 1000 - 1.0)
+    sched = CandleScheduler("1h", clock=clock, sleep=clock.sleep)
+    sched.wait()
+    fresh = [[9 * H, 1, 1, 1, 1, 1], [10 * H, 1, 1, 1, 1, 1], [11 * H, 1, 1, 1, 1, 1]]
+    stale = fresh[:-1]  # exchange has not rolled the candle over yet
+    calls = []
+
+    def fetch(symbols):
+        calls.append(list(symbols))
+        return {s: fresh if len(calls) >= 2 else stale for s in symbols}
+
+    out = sched.await_closed(fetch, {"A": fresh, "B": stale}, retry_delay=0.1)
+    assert calls == [["B"], ["B"]]
+    assert last_closed_ts(out["A"]) == last_closed_ts(out["B"]) == 10 * H
+
+    # Gives up after the retry budget
+    out = sched.await_closed(lambda syms: {s: stale for s in syms}, {"B": stale}, retries=2, retry_delay=0.1)
+    assert last_closed_ts(out["B"]) == 9 * H
+
+
+def test_runner_skips_signal_work_without_new_closed_candle(monkeypatch):
+    from bot.config import AppConfig, EnvVars
+    from bot.runner import run_paper
+
+    clock = FakeClock(5 * H / 1000 + 10.0)
+    snapshots = [
+        [[i * H, 100.0, 101.0, 99.0, 100.0, 1.0] for i in range(n - 200, n)] for n in (6, 6, 7)
+    ]
+
+    class Ex:
+        calls = 0
+
+        def fetch_ohlcv(self, symbol, timeframe, limit=200):
+            Ex.calls += 1
+            return snapshots[min(Ex.calls - 1, len(snapshots) - 1)]
+
+    evaluated = []
+    monkeypatch.setattr("bot.runner.Exchange", lambda cfg, env: Ex())
+    monkeypatch.setattr(
+        "bot.runner._candle_scheduler",
+        lambda ex, cfg, logger: CandleScheduler("1h", clock=clock, sleep=clock.sleep),
+    )
+    monkeypatch.setattr("bot.runner.generate_signal", lambda df, cfg: evaluated.append(df.index[-1]) or "hold")
+    run_paper(AppConfig(timeframe="1h"), EnvVars(), max_iterations=2, align_to_close=True)
+    # Iteration 2 woke at 06:00; the first fetch still ended at 05:00, the retry had the new candle
+    assert Ex.calls == 3 and len(evaluated) == 2
+    assert clock.sleeps[0] == (6 * H + 250) / 1000 - (5 * H / 1000 + 10.0)
+
+    # Without a new closed candle the signal is not recomputed
+    evaluated.clear()
+    Ex.calls = 0
+    snapshots[:] = snapshots[:1]
+    run_paper(AppConfig(timeframe="1h"), EnvVars(), max_iterations=3)
+    assert Ex.calls == 3 and len(evaluated) == 1
@@ -0,0 +1,71 @@
+import math
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from bot.config import AppConfig
+from bot.optimize import SEARCH_SPACE, _search_score, search_params
+from bot.results import load_results
+from bot.tpe import Param, TPESampler
+
+
+def test_param_round_trip_and_bounds():
+    p = Param("ema_fast", 5, 100, "int")
+    assert p.from_unit(0.0) == 5 and p.from_unit(1.0) == 100
+    assert p.from_unit(p.to_unit(37)) == 37
+    lg = Param("lr", 1e-3, 1.0, log=True)
+    assert math.isclose(lg.from_unit(lg.to_unit(0.05)), 0.05)
+
+
+def test_tpe_concentrates_on_optimum_and_respects_constraint():
+    space = [Param("x", 0.0, 10.0), Param("n", 1, 50, "int")]
+
+    def f(p):
+        return -((p["x"] - 7.0) ** 2) - 0.01 * (p["n"] - 20) ** 2
+
+    sampler = TPESampler(space, n_startup=10, seed=3, constraint=lambda p: p["n"] % 2 == 0)
+    seen = []
+    for _ in range(12):
+        for params in sampler.ask(5):
+            assert params["n"] % 2 == 0
+            assert params not in seen
+            seen.append(params)
+            sampler.tell(params, f(params))
+    best = max(seen, key=f)
+    assert abs(best["x"] - 7.0) < 1.0
+    # Model-guided rounds beat the random start-up rounds on average
+    assert np.mean([f(p) for p in seen[-20:]]) > np.mean([f(p) for p in seen[:10]])
+
+
+def test_search_score_applies_optimizer_constraints():
+    ok = {"sharpe": 1.5, "pf": 1.2, "cagr": 0.1, "max_dd": 0.2, "n_trades": 60}
+    assert _search_score(ok, 1.0, 0.0, 0.4, 50) == 1.5
+    bad = {**ok, "n_trades": 10, "sharpe": 9.0}
+    assert _search_score(bad, 1.0, 0.0, 0.4, 50) < _search_score({**ok, "sharpe": -5.0}, 1.0, 0.0, 0.4, 50)
+
+
+def loader(symbol, timeframe, years):
+    rng = np.random.default_rng(21)
+    n = 1200
+    close = 100 + np.cumsum(rng.normal(0.05, 1, n))
+    return pd.DataFrame(
+        {"timestamp": np.arange(n), "open": close, "high": close + 1.5, "low": close - 1.5, "close": close, "volume": 1.0}
+    )
+
+
+def test_search_params_uses_budget_and_records_trials(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    out = tmp_path / "best.yaml"
+    res = search_params(
+        "BTC/USDT", "1h", 1, AppConfig(), out, budget=14, batch=4, seed=1,
+        pf_min=0.0, cagr_min=-1.0, max_dd_max=1.0, ntrades_min=1, data_loader=loader,
+    )
+    assert res["evaluations"] == 14
+    store = load_results(tmp_path / "data/artifacts/results")
+    assert len(store) == 14
+    assert set(p.name for p in SEARCH_SPACE) <= set(store.columns)
+    assert (store["ema_fast"] < store["ema_slow"]).all()
+    assert res["params"]
+    assert yaml.safe_load(out.read_text()) == res["params"]
+    assert res["metrics"]["sharpe"] == store["sharpe"].max()
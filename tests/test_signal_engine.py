@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from bot.strategy import entry_signals, generate_signal
+from bot.config import AppConfig
+
+
+def make_df(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0.02, 0.5, n))
+    open_ = close + rng.normal(0, 0.1, n)
+    high = np.maximum(open_, close) + rng.uniform(0.0, 0.5, n)
+    low = np.minimum(open_, close) - rng.uniform(0.0, 0.5, n)
+    vol = rng.uniform(50, 250, n)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": vol})
+
+
+def reference_mask(df, cfg):
+    # Slow path: one generate_signal call per closed candle j using frame df[: j + 2]
+    out = np.zeros(len(df), dtype=bool)
+    for j in range(len(df) - 1):
+        out[j] = generate_signal(df.iloc[: j + 2], cfg) == "buy"
+    return out
+
+
+def test_entry_signals_match_generate_signal_bar_for_bar():
+    df = make_df()
+    cfgs = [
+        AppConfig(ema_fast=5, ema_slow=12, rsi_period=6, rsi_buy_min=40, rsi_buy_max=65, slippage_bps=20),
+        AppConfig(ema_fast=5, ema_slow=12, rsi_period=6, rsi_buy_min=30, rsi_buy_max=70, enable_adx=True, adx_threshold=15.0),
+        AppConfig(ema_fast=4, ema_slow=9, rsi_period=5, rsi_buy_min=0, rsi_buy_max=100, enable_vol_filter=True, volume_factor=1.1),
+    ]
+    for cfg in cfgs:
+        mask = entry_signals(df, cfg)
+        ref = reference_mask(df, cfg)
+        assert mask.dtype == bool and len(mask) == len(df)
+        assert mask.any()
+        # Last row is never a closed candle inside df, so compare up to -1
+        np.testing.assert_array_equal(mask[:-1], ref[:-1])
+
+
+def test_entry_signals_short_and_empty_inputs():
+    cfg = AppConfig(ema_fast=3, ema_slow=5, rsi_period=3)
+    assert entry_signals(make_df(n=0), cfg).shape == (0,)
+    assert not entry_signals(make_df(n=6), cfg).any()
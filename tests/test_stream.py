@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+pytest.importorskip("websockets")
+
+from bot.config import AppConfig, EnvVars
+from bot.stream import KlineStream, kline_message, parse_kline, stream_rows, stream_url
+from bot.stream_replay import ReplayServer
+
+H = 3_600_000
+SYMS = ["BTC/USDT", "ETH/USDT"]
+
+
+def candles(start, n, base=100.0):
+    return [[(start + i) * H, base + i, base + i + 2, base + i - 2, base + i + 1, 10.0] for i in range(n)]
+
+
+def wait_for(cond, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not cond() and time.monotonic() < end:
+        time.sleep(0.01)
+    return cond()
+
+
+def test_kline_messages_round_trip():
+    assert stream_url("wss://x:9443/", SYMS, "1h") == "wss://x:9443/stream?streams=btcusdt@kline_1h/ethusdt@kline_1h"
+    row = candles(5, 1)[0]
+    k = parse_kline(kline_message("ETH/USDT", "1h", row, True, H), {"ETHUSDT": "ETH/USDT"})
+    assert k.symbol == "ETH/USDT" and k.closed and list(k.row) == row
+    assert parse_kline(kline_message("ETH/USDT", "1h", row, True, H), {}) is None
+    assert parse_kline('{"result": null, "id": 1}', {"ETHUSDT": "ETH/USDT"}) is None
+
+    rows = stream_rows([k], H)["ETH/USDT"]
+    assert rows[0] == row and rows[1] == [6 * H, 101.0, 101.0, 101.0, 101.0, 0.0]
+
+
+def test_poll_returns_each_close_of_all_symbols_together():
+    data = {s: candles(0, 3, base=100.0 * (j + 1)) for j, s in enumerate(SYMS)}
+    with ReplayServer(data, "1h", interval=0.3) as server, KlineStream(SYMS, "1h", base_url=server.url) as stream:
+        for i in range(3):
+            events = stream.poll(timeout=5)
+            closed = {(k.symbol, k.row[0]) for k in events if k.closed}
+            assert closed == {(s, i * H) for s in SYMS}
+
+
+def test_reconnects_after_a_drop_and_resumes():
+    data = {s: candles(0, 6) for s in SYMS}
+    server = ReplayServer(data, "1h", interval=0.02, drop_after=2, gap=2)
+    with server, KlineStream(SYMS, "1h", base_url=server.url, reconnect_delay=0.05) as stream:
+        assert wait_for(lambda: server.position == 6 and stream.reconnects == 1)
+        time.sleep(0.1)
+        events = stream.poll(timeout=0.1)
+    closed_ts = sorted({k.row[0] for k in events if k.closed})
+    assert closed_ts == [0, H, 4 * H, 5 * H]  # candles 2 and 3 were missed while disconnected
+    assert server.connections == 2
+
+
+def test_paper_loop_reacts_to_pushed_closes(monkeypatch):
+    from bot.runner import run_paper
+
+    history = {s: candles(0, 200) for s in SYMS}
+    live = {s: candles(199, 4) for s in SYMS}  # closes the forming candle 199, then 200..202
+    rest_calls = []
+    evaluated = []
+
+    class Dummy:
+        def fetch_ohlcv(self, symbol, timeframe, limit=200):
+            rest_calls.append((symbol, limit))
+            return history[symbol][-limit:]
+
+    import bot.runner as runner
+
+    indicators = runner._stream_indicators
+
+    def recording(states, symbol, df, cfg):
+        evaluated.append(int(df["timestamp"].iloc[-2]))
+        return indicators(states, symbol, df, cfg)
+
+    monkeypatch.setattr("bot.runner.Exchange", lambda cfg, env: Dummy())
+    monkeypatch.setattr("bot.runner._stream_indicators", recording)
+    monkeypatch.setattr("bot.runner.generate_signal", lambda df, cfg: "hold")
+    cfg = AppConfig(symbols_whitelist=SYMS, timeframe="1h", max_open_trades=2)
+    with ReplayServer(live, "1h", interval=0.2) as server:
+        t0 = time.monotonic()
+        run_paper(cfg, EnvVars(BASE_EQUITY=1000.0), max_iterations=5, sleep_seconds=60, stream_url=server.url)
+        elapsed = time.monotonic() - t0
+    assert evaluated == [t * H for t in (198, 198, 199, 199, 200, 200, 201, 201, 202, 202)]
+    assert rest_calls == [(s, 200) for s in SYMS]  # only the initial backfill went over REST
+    assert elapsed < 10  # woken by the stream, not sleep_seconds
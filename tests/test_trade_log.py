@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import numpy as np
+
+from bot.config import AppConfig
+from bot.metrics import avg_trade, expectancy, profit_factor, winrate
+from bot.paper import PaperBroker, Trade, TradeLog
+
+
+def trade(symbol, pnl, entry_time=None):
+    return Trade(
+        symbol=symbol, side="buy", entry_price=10.0, stop_price=9.0, take_profit=12.0, qty=2.0,
+        entry_time=entry_time, exit_price=11.0, exit_time=None, pnl=pnl,
+    )
+
+
+def test_log_grows_and_gives_trade_views():
+    log = TradeLog(capacity=2)
+    t0 = datetime(2024, 1, 2, 3, 4, 5)
+    pnls = [1.5, -2.0, 0.0, 3.25, -0.5]
+    for i, p in enumerate(pnls):
+        log.append(trade("A" if i % 2 else "B", p, entry_time=t0), entry_bar=i, exit_bar=i + 3)
+    assert len(log) == 5 and bool(log)
+    assert list(log.pnl) == pnls
+    assert list(log.column("exit_bar")) == [3, 4, 5, 6, 7]
+    first = log[0]
+    assert isinstance(first, Trade)
+    assert (first.symbol, first.pnl, first.entry_time, first.exit_time) == ("B", 1.5, t0, None)
+    assert [t.pnl for t in log[-2:]] == pnls[-2:]
+    assert log.counts_by_symbol() == {"B": 3, "A": 2}
+    assert list(log.to_frame()["symbol"]) == ["B", "A", "B", "A", "B"]
+    assert not TradeLog()
+
+
+def test_metrics_on_log_match_trade_lists():
+    rng = np.random.default_rng(4)
+    log = TradeLog(capacity=8)
+    objs = []
+    for p in rng.normal(0.2, 3.0, 500):
+        t = trade("X", float(p))
+        log.append(t)
+        objs.append(t)
+    for fn in (winrate, profit_factor, expectancy, avg_trade):
+        assert fn(log) == fn(objs)
+    assert profit_factor(TradeLog()) == 0.0
+
+
+def test_broker_records_bar_indices():
+    broker = PaperBroker(AppConfig(), equity=1000.0)
+    broker.buy("A", 100.0, 1.0, 90.0, 120.0, bar=7)
+    closed = broker.sell("A", 120.0, 1.0, bar=19)
+    log = broker.trade_log
+    assert len(log) == 1 and log[0].pnl == closed.pnl
+    assert (log.column("entry_bar")[0], log.column("exit_bar")[0]) == (7, 19)
+
+
+def test_broker_logs_bar_timestamps():
+    broker = PaperBroker(AppConfig(), equity=1000.0)
+    t_in, t_out = 1_704_164_645_123, 1_704_200_000_007  # ms, not on whole seconds
+    opened = broker.buy("A", 100.0, 1.0, 90.0, 120.0, ts=t_in, bar=3)
+    closed = broker.sell("A", 120.0, 1.0, ts=t_out, bar=8)
+    log = broker.trade_log
+    assert (log.column("entry_ts")[0], log.column("exit_ts")[0]) == (t_in, t_out)
+    assert opened.entry_time == log[0].entry_time == datetime(2024, 1, 2, 3, 4, 5, 123000)
+    assert closed.exit_time == log[0].exit_time
+
+    # Without a bar timestamp the wall clock is used
+    before = datetime.utcnow()
+    broker.buy("B", 100.0, 1.0, 90.0, 120.0)
+    broker.sell("B", 120.0, 1.0)
+    assert log[1].entry_time >= before.replace(microsecond=0)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bot.backtest import _simulate_combo
+from bot.cache import get_cache
+from bot.config import AppConfig
+from bot.optimize import stitch_equity, walk_forward, walk_forward_folds
+
+
+def loader(symbol, timeframe, years):
+    rng = np.random.default_rng(8)
+    n = 1400
+    close = 100 + np.cumsum(rng.normal(0.02, 1, n))
+    return pd.DataFrame(
+        {
+            "timestamp": np.arange(n, dtype=np.int64) * 3_600_000,
+            "open": close,
+            "high": close + rng.uniform(0, 2, n),
+            "low": close - rng.uniform(0, 2, n),
+            "close": close,
+            "volume": 1.0,
+        }
+    )
+
+
+GRID = {"ema_fast": [3, 6], "ema_slow": [12, 24], "rsi_period": [5], "rsi_buy_min": [0], "rsi_buy_max": [100]}
+LOOSE = dict(pf_min=0.0, cagr_min=-1.0, max_dd_max=1.0, ntrades_min=0)
+
+
+def test_rolling_and_anchored_folds():
+    rolling = walk_forward_folds(1200, 4, train_bars=300, test_bars=100)
+    assert rolling[0] == (200, 500, 500, 600)
+    assert rolling[-1] == (500, 800, 800, 900)
+    anchored = walk_forward_folds(1200, 4, train_bars=300, test_bars=100, anchored=True)
+    assert all(f[0] == 200 for f in anchored) and anchored[-1][1] == 800
+    # Defaults: train = 3 x test, test windows back to back
+    folds = walk_forward_folds(1000, 5)
+    assert all(b[2] == a[3] for a, b in zip(folds, folds[1:]))
+    assert folds[0][1] - folds[0][0] == 3 * (folds[0][3] - folds[0][2])
+    with pytest.raises(ValueError):
+        walk_forward_folds(500, 10, train_bars=300, test_bars=100)
+
+
+def test_window_uses_full_history_indicators():
+    df = loader("BTC/USDT", "1h", 1)
+    params = {"ema_fast": 3, "ema_slow": 12, "rsi_period": 5, "rsi_buy_min": 0, "rsi_buy_max": 100}
+    full = _simulate_combo(df, "BTC/USDT", 1, AppConfig(), params, 8760, 0, "fp", window=(200, len(df)))
+    ref = _simulate_combo(df, "BTC/USDT", 1, AppConfig(), params, 8760, 0, "fp")
+    np.testing.assert_array_equal(full["equity"], ref["equity"])
+    part = _simulate_combo(df, "BTC/USDT", 1, AppConfig(), params, 8760, 0, "fp", window=(600, 800))
+    assert len(part["equity"]) == 201
+
+
+def test_stitch_compounds_fold_returns():
+    eq = stitch_equity([[1000, 1100], [1000, 900, 950]])
+    np.testing.assert_allclose(eq, [1000, 1100, 990, 1045])
+
+
+def test_walk_forward_parallel_matches_serial(tmp_path):
+    get_cache().clear()
+    serial = walk_forward("BTC/USDT", "1h", 1, AppConfig(), GRID, n_folds=3, data_loader=loader, out_dir=tmp_path / "s", **LOOSE)
+    parallel = walk_forward(
+        "BTC/USDT", "1h", 1, AppConfig(), GRID, n_folds=3, jobs=3, data_loader=loader, out_dir=tmp_path / "p", **LOOSE
+    )
+    pd.testing.assert_frame_equal(serial["folds"], parallel["folds"])
+    np.testing.assert_array_equal(serial["equity"], parallel["equity"])
+
+    folds = pd.read_csv(tmp_path / "s" / "folds.csv")
+    assert list(folds["fold"]) == [0, 1, 2]
+    assert {"ema_fast", "ema_slow", "oos_sharpe", "train_score", "test_start", "test_end"} <= set(folds.columns)
+    oos_bars = int((folds["test_hi"] - folds["test_lo"]).sum())
+    assert len(np.load(tmp_path / "s" / "oos_equity.npy")) == oos_bars + 1
+    # Every fold's series come from one full-history computation per process
+    assert get_cache().stats()["hits"] > 0